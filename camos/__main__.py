@@ -1,6 +1,6 @@
 # -*- coding: utf-8 -*-
 # Created on Sat Jun 05 2021
-# Last modified on Sun Jul 11 2021
+# Last modified on Sun Oct 18 2026
 # Copyright (c) CaMOS Development Team. All Rights Reserved.
 # Distributed under a MIT License. See LICENSE for more info.
 
@@ -17,6 +17,7 @@ import pyqtgraph as pg
 from camos.app import camosApp
 import camos.utils.settings as settings
 import camos.utils.apptools
+from camos.model.scratch import get_scratch
 from camos.gui.notification import CaMOSQtNotification
 from camos.gui.styles import notification_style
 from camos.utils.notifications import Notification
@@ -26,6 +27,7 @@ _I18N_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "i18n")
 
 def sigint_handler(*args):
     """Handler for the SIGINT signal."""
+    get_scratch().cleanup()
     pg.exit()
     exit(0)
 
@@ -1,11 +1,11 @@
 # -*- coding: utf-8 -*-
 # Created on Sat Jun 05 2021
-# Last modified on Thu Jul 15 2021
+# Last modified on Sun Oct 18 2026
 # Copyright (c) CaMOS Development Team. All Rights Reserved.
 # Distributed under a MIT License. See LICENSE for more info.
 
 from PyQt5 import QtCore, QtWidgets, QtGui
-from PyQt5.QtGui import QIcon
+from PyQt5.QtGui import QIcon, QPixmap, QColor
 from PyQt5.QtWidgets import (
     QListWidgetItem,
     QInputDialog,
@@ -30,6 +30,7 @@ from camos.viewport.tableviewer import TableViewer
 from camos.resources import resources
 
 MAXNAMELEN = 30
+ICONSIZE = 128
 
 
 class FrameContainer(QtWidgets.QWidget):
@@ -109,10 +110,28 @@ class FrameContainer(QtWidgets.QWidget):
         name = self.parent.model.names[layer]
         _s_name = name if len(name) < MAXNAMELEN else name[0:MAXNAMELEN] + "..."
         item = QListWidgetItem(_s_name)
-        item.setIcon(QIcon(self.parent.model.get_icon(layer)))
+        # The thumbnail is created in the background; meanwhile, a placeholder is shown
+        placeholder = QPixmap(ICONSIZE, ICONSIZE)
+        placeholder.fill(QColor(128, 128, 128))
+        item.setIcon(QIcon(placeholder))
         item.setToolTip(name + " (double click to toggle visibility)")
         self.opened_layers_widget.addItem(item)
         self.opened_layers_widget.setCurrentItem(item)
+        self.parent.model.request_icon(layer)
+
+    def _update_layer_icon(self, image, icon):
+        """When the thumbnail of a layer is ready, it replaces the placeholder icon
+
+        Args:
+            image (InputData): the layer the thumbnail belongs to
+            icon (QImage): the thumbnail
+        """
+        for row, _image in enumerate(self.parent.model.images):
+            if _image is image:
+                item = self.opened_layers_widget.item(row)
+                if item is not None:
+                    item.setIcon(QIcon(QPixmap.fromImage(icon)))
+                return
 
     def add_data_layer(self, name):
         """When the ImageViewModel has updates in any of the elements, the layers list is updated
@@ -408,6 +427,13 @@ layer, and returns a new layer with all pixels that are 'True' under that filter
         idx = self.currentlayer
         self.parent.signalmodel.duplicate_data(idx)
 
+    def _layer_materialize(self):
+        """Handles the call to ImageViewModel.materialize_layer in the parent image model, so the frames of the currently selected (virtual) layer are computed and stored
+        """
+        self.currentlayer = self.opened_layers_widget.currentRow()
+        idx = self.currentlayer
+        self.parent.model.materialize_layer(idx)
+
     def _crop_layer(self):
         """Handles the call to ImageViewModel.crop_image in the parent image model, so it can crop the currently selected layer in self.currentlayer
         """
@@ -532,6 +558,16 @@ layer, and returns a new layer with all pixels that are 'True' under that filter
             prefsAct.setStatusTip("Preferences of the current layer")
             prefsAct.triggered.connect(self._layer_prefs)
             menu.addAction(prefsAct)
+
+            idx = self.opened_layers_widget.currentRow()
+            if 0 <= idx < len(self.parent.model.images):
+                if self.parent.model.images[idx].virtual:
+                    materializeAct = QAction("Materialize", self)
+                    materializeAct.setStatusTip(
+                        "Computes and stores all the frames of the current layer"
+                    )
+                    materializeAct.triggered.connect(self._layer_materialize)
+                    menu.addAction(materializeAct)
             menu.exec_(event.globalPos())
 
             return True
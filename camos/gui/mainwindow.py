@@ -1,6 +1,6 @@
 # -*- coding: utf-8 -*-
 # Created on Sat Jun 05 2021
-# Last modified on Wed Jul 07 2021
+# Last modified on Sun Oct 18 2026
 # Copyright (c) CaMOS Development Team. All Rights Reserved.
 # Distributed under a MIT License. See LICENSE for more info.
 
@@ -12,6 +12,7 @@ import os
 
 from camos.model.imageviewmodel import ImageViewModel
 from camos.model.signalviewmodel import SignalViewModel
+from camos.model.scratch import get_scratch
 from camos.viewport.imageviewport import ImageViewPort
 from camos.gui.preferencespanel import CAMOSPreferences
 from camos.utils.settings import Config
@@ -85,6 +86,7 @@ class MainWindow(QtWidgets.QMainWindow):
         self.container = FrameContainer(self)
         self.setCentralWidget(self.container)
         self.model.newdata.connect(self.container._update_layer_elements)
+        self.model.iconready.connect(self.container._update_layer_icon)
         self.model.removedata.connect(self.viewport.remove_image)
         self.model.updatepos.connect(self._update_statusbar)
 
@@ -259,6 +261,8 @@ class MainWindow(QtWidgets.QMainWindow):
         if reply == QMessageBox.Yes:
             # Save all the configuration to the file
             self.configuration.saveConfiguration()
+            # pg.exit skips the atexit handlers, so temporary files are removed here
+            get_scratch().cleanup()
             pg.exit()
             event.accept()
         else:
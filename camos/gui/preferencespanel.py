@@ -1,11 +1,12 @@
 from PyQt5 import QtGui, QtWidgets
-from PyQt5.QtWidgets import QLabel, QComboBox, QCheckBox
+from PyQt5.QtWidgets import QLabel, QComboBox, QCheckBox, QLineEdit, QSpinBox
 import warnings
 
 import camos.utils.apptools as apptools
 from camos.utils.settings import Config
 from camos.utils.cmaps import bg_colors as colors
 from camos.utils.units import length, time
+from camos.model.chunkstore import LAYOUTS
 
 
 class CAMOSPreferences(QtWidgets.QDialog):
@@ -29,6 +30,9 @@ class CAMOSPreferences(QtWidgets.QDialog):
         self.lengthUnitsUI(layout)
         self.timeUnitsUI(layout)
         self.memoryPersistentLoading(layout)
+        self.scratchSpaceUI(layout)
+        self.chunkLayoutUI(layout)
+        self.workersUI(layout)
 
         # Creates the Accept/Cancel buttons
         box = QtWidgets.QDialogButtonBox(
@@ -129,6 +133,84 @@ class CAMOSPreferences(QtWidgets.QDialog):
         except Exception as e:
             warnings.warn(str(e))
 
+    def scratchSpaceUI(self, layout):
+        """Creates the UI elements for setting the location and
+        quota of the temporary files of the stacks not in RAM
+
+        Args:
+            layout (QtGui.QGridLayout): where the widgets should
+                be attached.
+        """
+        try:
+            current_location = self.current_config["Performance/Scratch_location"]
+            current_quota = self.current_config["Performance/Scratch_quota"]
+
+            # Creates the UI elements (Labels, LineEdit and SpinBox)
+            label_location = QLabel("Scratch folder")
+            widget_location = QLineEdit(current_location)
+            widget_location.textChanged[str].connect(self.setupScratchLocation)
+            label_quota = QLabel("Scratch quota (GB, 0 for no limit)")
+            widget_quota = QSpinBox()
+            widget_quota.setRange(0, 100000)
+            widget_quota.setValue(current_quota)
+            widget_quota.valueChanged[int].connect(self.setupScratchQuota)
+
+            # Add the widgets to the layout
+            layout.addWidget(label_location)
+            layout.addWidget(widget_location)
+            layout.addWidget(label_quota)
+            layout.addWidget(widget_quota)
+        except Exception as e:
+            warnings.warn(str(e))
+
+    def chunkLayoutUI(self, layout):
+        """Creates the UI elements for setting the chunk layout
+        of the stacks not in RAM (None for flat files)
+
+        Args:
+            layout (QtGui.QGridLayout): where the widgets should
+                be attached.
+        """
+        try:
+            current_layout = self.current_config["Performance/Chunk_layout"]
+
+            # Creates the UI elements (Label and ComboBox)
+            label_layout = QLabel("Disk chunks (frame: playback, pixel: traces)")
+            widget_layout = QComboBox()
+            widget_layout.addItems(["None"] + LAYOUTS)
+            widget_layout.setCurrentIndex((["None"] + LAYOUTS).index(current_layout))
+            widget_layout.currentTextChanged[str].connect(self.setupChunkLayout)
+
+            # Add the widgets to the layout
+            layout.addWidget(label_layout)
+            layout.addWidget(widget_layout)
+        except Exception as e:
+            warnings.warn(str(e))
+
+    def workersUI(self, layout):
+        """Creates the UI elements for setting the number of
+        processes of parallel tasks (0 for all the cores)
+
+        Args:
+            layout (QtGui.QGridLayout): where the widgets should
+                be attached.
+        """
+        try:
+            current_workers = self.current_config["Performance/Workers"]
+
+            # Creates the UI elements (Label and SpinBox)
+            label_workers = QLabel("Worker processes (0 for all the cores)")
+            widget_workers = QSpinBox()
+            widget_workers.setRange(0, 1024)
+            widget_workers.setValue(current_workers)
+            widget_workers.valueChanged[int].connect(self.setupWorkers)
+
+            # Add the widgets to the layout
+            layout.addWidget(label_workers)
+            layout.addWidget(widget_workers)
+        except Exception as e:
+            warnings.warn(str(e))
+
     def setupViewportColor(self, c):
         """Updates the current config variable,
         with the selected color in the ComboBox (UI)
@@ -163,6 +245,18 @@ class CAMOSPreferences(QtWidgets.QDialog):
         r = True if r == 2 else False
         self.current_config["Performance/RAM_persistence"] = r
 
+    def setupScratchLocation(self, l):
+        self.current_config["Performance/Scratch_location"] = l
+
+    def setupScratchQuota(self, q):
+        self.current_config["Performance/Scratch_quota"] = q
+
+    def setupChunkLayout(self, l):
+        self.current_config["Performance/Chunk_layout"] = l
+
+    def setupWorkers(self, w):
+        self.current_config["Performance/Workers"] = w
+
     def accept(self):
         # Sends the changes to the viewport
         self.apply_changes_viewport()
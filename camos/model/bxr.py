@@ -0,0 +1,246 @@
+# -*- coding: utf-8 -*-
+# Created on Sun Oct 18 2026
+# Last modified on Sun Oct 18 2026
+# Copyright (c) CaMOS Development Team. All Rights Reserved.
+# Distributed under a MIT License. See LICENSE for more info.
+
+import os
+
+import numpy as np
+
+from camos.model.filepool import get_pool
+from camos.model.events import CompactEvents
+
+# Number of events read at once, rounded to whole chunks of the datasets
+BLOCK_EVENTS = 2 ** 22
+
+# Location of the spikes in the results of a BXR file
+EVENTS_GROUP = "3BResults/3BChEvents"
+
+# Location of the raw samples of a BRW file, interleaved frame by frame
+RAW_DATASET = "3BData/Raw"
+
+
+def _searchsorted(dataset, value, side="left"):
+    """np.searchsorted on a sorted 1D dataset, reading the first value of O(log n)
+    chunks, and then a single chunk
+    """
+    n = len(dataset)
+    chunk = dataset.chunks[0] if dataset.chunks is not None else BLOCK_EVENTS
+    # Last chunk whose first value is before the searched one, where the position is
+    lo, hi = 0, (n + chunk - 1) // chunk
+    while hi - lo > 1:
+        mid = (lo + hi) // 2
+        first = dataset[mid * chunk]
+        if first < value or (side == "right" and first == value):
+            lo = mid
+        else:
+            hi = mid
+    a = lo * chunk
+    return a + int(np.searchsorted(dataset[a : min(n, a + chunk)], value, side=side))
+
+
+class BXRFile:
+    """Reader of the spikes of a BXR file (3Brain). The metadata is read when opened;
+    spikes are read on demand, a block of chunks at a time, restricted to a time window
+    (found by binary search on the spike times, which are sorted) and to a subset of
+    channels, so only the spikes of the window are read from disk.
+    """
+
+    def __init__(self, path, pool=None):
+        """Initialization of the object
+
+        Args:
+            path (str): route to the BXR file
+            pool (FilePool, optional): pool holding the open files. Defaults to the shared pool.
+        """
+        self.path = os.path.abspath(path)
+        self.pool = get_pool() if pool is None else pool
+        # The file stays open while the reader uses it, even if the pool is full
+        f = self.pool.acquire(self.path)
+        self._closed = False
+        info = f["3BRecInfo"]
+        self.sampling_rate = float(np.asarray(info["3BRecVars"]["SamplingRate"])[0])
+        self.n_cols = int(np.asarray(info["3BMeaChip"]["NCols"]).ravel()[0])
+        self.n_rows = int(np.asarray(info["3BMeaChip"]["NRows"]).ravel()[0])
+        try:
+            last_frame = int(np.asarray(f["3BUserInfo"]["TimeIntervals"])[0][3][0][1])
+        except (KeyError, IndexError):
+            last_frame = int(np.asarray(info["3BRecVars"]["NRecFrames"])[0])
+        self.frames = last_frame
+        self.duration = last_frame / self.sampling_rate
+        self.n_spikes = len(f[EVENTS_GROUP]["SpikeTimes"])
+
+    @property
+    def _file(self):
+        return self.pool.open(self.path)
+
+    @property
+    def spike_times(self):
+        """Dataset of the frame of every spike, read lazily
+        """
+        return self._file[EVENTS_GROUP]["SpikeTimes"]
+
+    @property
+    def spike_channels(self):
+        """Dataset of the channel of every spike, read lazily
+        """
+        return self._file[EVENTS_GROUP]["SpikeChIDs"]
+
+    def span(self, start=None, end=None):
+        """Positions of the first and after the last spike of a time window
+
+        Args:
+            start (float, optional): beginning of the window, in seconds. Defaults to the beginning.
+            end (float, optional): end of the window (exclusive), in seconds. Defaults to the end.
+
+        Returns:
+            tuple: positions of the spikes, for the datasets
+        """
+        times = self.spike_times
+        a = 0 if start is None else _searchsorted(times, start * self.sampling_rate)
+        b = len(times) if end is None else _searchsorted(times, end * self.sampling_rate)
+        return a, max(a, b)
+
+    def blocks(self, a, b, channels=None):
+        """Reads the channels and frames of the spikes from a to b, in blocks of whole chunks.
+        With a subset of channels, only the frames of their spikes are read from the file.
+
+        Args:
+            a (int): position of the first spike
+            b (int): position after the last spike
+            channels (np.ndarray, optional): sorted channels to keep. Defaults to all of them.
+
+        Yields:
+            tuple: position after the last spike of the block, and the channels and frames of its spikes
+        """
+        ids, times = self.spike_channels, self.spike_times
+        chunk = times.chunks[0] if times.chunks is not None else 1
+        step = max(chunk, BLOCK_EVENTS // chunk * chunk)
+        # Blocks start at chunk boundaries, except the first one
+        bounds = [a] + list(range((a // step + 1) * step, b, step)) + [b]
+        for b0, b1 in zip(bounds[:-1], bounds[1:]):
+            if b1 <= b0:
+                continue
+            block_ids = ids[b0:b1]
+            if channels is None:
+                yield b1, block_ids, times[b0:b1]
+                continue
+            keep = np.flatnonzero(np.isin(block_ids, channels))
+            if len(keep) == 0:
+                yield b1, block_ids[keep], np.zeros(0, dtype=times.dtype)
+            else:
+                # Point selection of the positions, which h5py reads in increasing order
+                yield b1, block_ids[keep], times[b0 + keep]
+
+    def read(self, start=None, end=None, channels=None, progress=None):
+        """Reads the spikes of a time window, and of a subset of channels
+
+        Args:
+            start (float, optional): beginning of the window, in seconds. Defaults to the beginning.
+            end (float, optional): end of the window (exclusive), in seconds. Defaults to the end.
+            channels (list, optional): channels to keep. Defaults to all of them.
+            progress (callable, optional): receives the percentage of spikes read. Defaults to None.
+
+        Returns:
+            CompactEvents: the spikes, with their frames in the recording
+        """
+        a, b = self.span(start, end)
+        if channels is not None:
+            channels = np.unique(np.asarray(channels).ravel())
+
+        ids, frames = [], []
+        for b1, block_ids, block_frames in self.blocks(a, b, channels):
+            done = b1 - a
+            ids.append(block_ids)
+            frames.append(block_frames)
+            if progress is not None:
+                progress(int(done * 100 / (b - a)))
+
+        if len(ids) == 0:
+            ids, frames = [np.zeros(0, np.uint32)], [np.zeros(0, np.int64)]
+        return CompactEvents(
+            np.concatenate(ids), np.concatenate(frames), self.sampling_rate
+        )
+
+    def close(self):
+        if not self._closed:
+            self._closed = True
+            self.pool.release(self.path)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+
+class BRWFile:
+    """Reader of the raw samples of a BRW file (3Brain). The metadata is read when opened;
+    samples are stored frame by frame (all the channels of a frame are consecutive), and
+    are read on demand, a range of frames at a time.
+    """
+
+    def __init__(self, path, pool=None):
+        """Initialization of the object
+
+        Args:
+            path (str): route to the BRW file
+            pool (FilePool, optional): pool holding the open files. Defaults to the shared pool.
+        """
+        self.path = os.path.abspath(path)
+        self.pool = get_pool() if pool is None else pool
+        # The file stays open while the reader uses it, even if the pool is full
+        f = self.pool.acquire(self.path)
+        self._closed = False
+        info = f["3BRecInfo"]
+        variables = info["3BRecVars"]
+        self.sampling_rate = float(np.asarray(variables["SamplingRate"]).ravel()[0])
+        self.frames = int(np.asarray(variables["NRecFrames"]).ravel()[0])
+        self.duration = self.frames / self.sampling_rate
+        self.n_cols = int(np.asarray(info["3BMeaChip"]["NCols"]).ravel()[0])
+        self.n_channels = len(f[RAW_DATASET]) // max(1, self.frames)
+        self.bit_depth = int(np.asarray(variables["BitDepth"]).ravel()[0])
+        self.inversion = float(np.asarray(variables["SignalInversion"]).ravel()[0])
+
+    @property
+    def _file(self):
+        return self.pool.open(self.path)
+
+    @property
+    def raw(self):
+        """Dataset of the samples, read lazily
+        """
+        return self._file[RAW_DATASET]
+
+    def read(self, start, stop, dtype=np.float32):
+        """Reads the samples of a range of frames, centered at zero and with the polarity
+        of the recording; they are kept in ADC counts
+
+        Args:
+            start (int): first frame
+            stop (int): frame after the last one
+            dtype (np.dtype, optional): type of the result. Defaults to np.float32.
+
+        Returns:
+            np.ndarray: samples, with shape (frames, channels)
+        """
+        start, stop = max(0, start), min(self.frames, stop)
+        n = self.n_channels
+        samples = self.raw[start * n : max(start, stop) * n].reshape(-1, n)
+        out = samples.astype(dtype)
+        out -= 2 ** (self.bit_depth - 1)
+        if self.inversion < 0:
+            out *= -1
+        return out
+
+    def close(self):
+        if not self._closed:
+            self._closed = True
+            self.pool.release(self.path)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
@@ -0,0 +1,319 @@
+# -*- coding: utf-8 -*-
+# Created on Sun Oct 18 2026
+# Last modified on Sun Oct 18 2026
+# Copyright (c) CaMOS Development Team. All Rights Reserved.
+# Distributed under a MIT License. See LICENSE for more info.
+
+import os
+import threading
+
+import h5py
+import numpy as np
+
+from camos.model.scratch import get_scratch
+
+# Name of the dataset holding the stack in the HDF5 file, and attribute marking the
+# files written by the store, which are the only ones opened as images
+DATASET = "stack"
+MARKER = "camos_stack"
+
+# Approximate size of a chunk, of the HDF5 chunk cache, and of the blocks read at once
+CHUNK_BYTES = 2 ** 20
+CACHE_BYTES = 2 ** 26
+BLOCK_BYTES = 2 ** 26
+
+# Chunk layouts: frame-major chunks hold tiles of a single frame (playback),
+# pixel-major chunks hold many frames of a small patch (time series of pixels)
+LAYOUTS = ["frame", "pixel"]
+
+
+def chunk_shape(shape, dtype, layout="frame", target=CHUNK_BYTES):
+    """Chooses the shape of the chunks of a stack, for the given access pattern
+
+    Args:
+        shape (tuple): shape of the stack, (frames, height, width[, channels])
+        dtype (np.dtype): type of the pixels
+        layout (str, optional): "frame" or "pixel", see LAYOUTS. Defaults to "frame".
+        target (int, optional): approximate size of a chunk, in bytes. Defaults to CHUNK_BYTES.
+
+    Returns:
+        tuple: shape of the chunks
+    """
+    if layout not in LAYOUTS:
+        raise ValueError("The chunk layout must be one of {}".format(LAYOUTS))
+    n, h, w = shape[0:3]
+    rest = tuple(shape[3:])
+    pixel = np.dtype(dtype).itemsize * int(np.prod(rest, dtype=np.int64))
+    if layout == "frame":
+        side = max(1, int(np.sqrt(target / pixel)))
+        return (1, min(h, side), min(w, side)) + rest
+
+    # As many frames as fit in a block while writing, in patches of at least 16x16 pixels
+    t = max(1, min(n, BLOCK_BYTES // (pixel * h * w), target // (pixel * 16 * 16)))
+    side = max(16, int(np.sqrt(target / (pixel * t))))
+    return (t, min(h, side), min(w, side)) + rest
+
+
+def _open_file(path, mode):
+    return h5py.File(path, mode, rdcc_nbytes=CACHE_BYTES, rdcc_nslots=10007)
+
+
+def create_store(
+    path, shape, dtype, layout="frame", compression=None, temporary=False
+):
+    """Creates an empty chunked stack in an HDF5 file
+
+    Args:
+        path (str): route to the file, which is overwritten
+        shape (tuple): shape of the stack, (frames, height, width[, channels])
+        dtype (np.dtype): type of the pixels
+        layout (str, optional): "frame" or "pixel", see chunk_shape. Defaults to "frame".
+        compression (str, optional): HDF5 filter, e.g. "lzf" or "gzip". Defaults to None.
+        temporary (bool, optional): whether the file belongs to the scratch space. Defaults to False.
+
+    Returns:
+        ChunkedStack: the writable stack
+    """
+    with _open_file(path, "w") as f:
+        f.create_dataset(
+            DATASET,
+            shape=shape,
+            dtype=dtype,
+            chunks=chunk_shape(shape, dtype, layout),
+            compression=compression,
+            shuffle=compression is not None,
+        )
+        f[DATASET].attrs[MARKER] = 1
+    return ChunkedStack(path, DATASET, mode="r+", temporary=temporary)
+
+
+def open_store(path):
+    """Opens an HDF5 file written by create_store (or rechunk) as a ChunkedStack.
+    Other HDF5 files, even with datasets of three or four dimensions, are not images.
+
+    Args:
+        path (str): route to the file
+
+    Returns:
+        ChunkedStack: the read-only stack, or None if the file is not a store
+    """
+    try:
+        if not h5py.is_hdf5(path):
+            return None
+        with h5py.File(path, "r") as f:
+            dataset = f.get(DATASET)
+            if not isinstance(dataset, h5py.Dataset) or MARKER not in dataset.attrs:
+                return None
+    except OSError:
+        return None
+    return ChunkedStack(path, DATASET)
+
+
+def _positive(index, n):
+    """Converts a slice with a negative step into one with a positive step,
+    as HDF5 only reads forward. Returns the slice, and whether to flip the result.
+    """
+    if index.step is None or index.step > 0:
+        return index, False
+    indices = range(n)[index]
+    if len(indices) == 0:
+        return slice(0, 0), False
+    return slice(indices[-1], indices[0] + 1, -index.step), True
+
+
+class ChunkedStack:
+    """Array-like view of a stack stored in chunks of an HDF5 file.
+    Chunks span frames, rows and columns, and can be compressed; reading along
+    the shape of the chunks (see blocks) only touches the chunks needed.
+
+    It behaves as a numpy array of shape (frames, height, width[, channels]):
+    it can be indexed, iterated, and converted with np.asarray (which reads everything).
+    """
+
+    def __init__(self, path, name=DATASET, mode="r", temporary=False):
+        """Initialization of the object
+
+        Args:
+            path (str): route to the HDF5 file
+            name (str, optional): name of the dataset in the file. Defaults to DATASET.
+            mode (str, optional): "r" for read-only, "r+" for writing. Defaults to "r".
+            temporary (bool, optional): whether the file belongs to the scratch space, and
+                has to be copied when pickled. Defaults to False.
+        """
+        self.path = path
+        self.filename = os.path.abspath(path)
+        self.name = name
+        self.mode = mode
+        self.temporary = temporary
+        self._file = _open_file(path, mode)
+        self._dataset = self._file[name]
+        self.dtype = self._dataset.dtype
+        self.chunks = self._dataset.chunks or (1,) + self.shape[1:]
+        self._lock = threading.Lock()
+        self._pending = {}
+        if temporary:
+            # The file is closed before the scratch space removes it
+            get_scratch().attach(path, self)
+
+    @property
+    def shape(self):
+        return self._dataset.shape
+
+    @property
+    def ndim(self):
+        return len(self.shape)
+
+    @property
+    def size(self):
+        return int(np.prod(self.shape))
+
+    @property
+    def nbytes(self):
+        return self.size * self.dtype.itemsize
+
+    def __len__(self):
+        return self.shape[0]
+
+    def __iter__(self):
+        for _, block in self.blocks():
+            for frame in block:
+                yield frame
+
+    def __array__(self, dtype=None, copy=None):
+        out = np.empty(self.shape, dtype=self.dtype)
+        for start, block in self.blocks():
+            out[start : start + len(block)] = block
+        return out if dtype is None else out.astype(dtype)
+
+    def __getitem__(self, key):
+        if not isinstance(key, tuple):
+            key = (key,)
+        ellipsis = [i for i, k in enumerate(key) if k is Ellipsis]
+        if len(ellipsis) > 0:
+            i = ellipsis[0]
+            key = key[:i] + (slice(None),) * (self.ndim - len(key) + 1) + key[i + 1 :]
+        if not all(isinstance(k, (int, np.integer, slice)) for k in key):
+            # Fancy indexing is done in memory
+            return np.asarray(self)[key]
+
+        key = list(key) + [slice(None)] * (self.ndim - len(key))
+        flip = []
+        for axis, k in enumerate(key):
+            if isinstance(k, slice):
+                key[axis], reverse = _positive(k, self.shape[axis])
+                if reverse:
+                    flip.append(axis)
+            elif k < 0:
+                key[axis] = int(k) + self.shape[axis]
+
+        out = self._dataset[tuple(key)]
+        if len(flip) > 0:
+            # Integer indices drop their axis, so the flipped axes are renumbered
+            dropped = [a for a, k in enumerate(key) if not isinstance(k, slice)]
+            axes = [a - sum(d < a for d in dropped) for a in flip]
+            out = np.flip(out, axis=axes)
+        return out
+
+    def __setitem__(self, key, value):
+        """Frames written one by one are gathered into blocks as long as the chunks,
+        so every chunk is written (and compressed) once, whatever the order of the frames
+        """
+        t = self.chunks[0]
+        if not isinstance(key, (int, np.integer)) or t == 1:
+            self.flush()
+            self._dataset[key] = value
+            return
+
+        i = int(key) + (len(self) if key < 0 else 0)
+        b = i - i % t
+        with self._lock:
+            if b not in self._pending:
+                n = min(t, len(self) - b)
+                self._pending[b] = (np.empty((n,) + self.shape[1:], self.dtype), set())
+            block, written = self._pending[b]
+            block[i - b] = value
+            written.add(i - b)
+            if len(written) < len(block):
+                return
+            del self._pending[b]
+        self._dataset[b : b + len(block)] = block
+
+    def blocks(self, start=0, stop=None):
+        """Reads consecutive frames, a whole number of chunks at a time
+
+        Args:
+            start (int, optional): first frame. Defaults to 0.
+            stop (int, optional): frame after the last one. Defaults to the number of frames.
+
+        Yields:
+            tuple: index of the first frame of the block, and the block of frames
+        """
+        stop = len(self) if stop is None else stop
+        frame = self.nbytes // max(1, len(self))
+        step = self.chunks[0] * max(1, BLOCK_BYTES // max(1, frame * self.chunks[0]))
+        # Blocks start at chunk boundaries, except the first one
+        first = min(stop, (start // step + 1) * step)
+        bounds = [start] + list(range(first, stop, step)) + [stop]
+        for b0, b1 in zip(bounds[:-1], bounds[1:]):
+            if b1 > b0:
+                yield b0, self._dataset[b0:b1]
+
+    def max(self, axis=None, out=None, keepdims=False, **kwargs):
+        return self._reduce(np.maximum, "max", axis, out, keepdims, **kwargs)
+
+    def min(self, axis=None, out=None, keepdims=False, **kwargs):
+        return self._reduce(np.minimum, "min", axis, out, keepdims, **kwargs)
+
+    def _reduce(self, ufunc, name, axis, out, keepdims, **kwargs):
+        """Reductions over all pixels, or along the frames, are computed block by block
+        """
+        if axis not in (None, 0) or out is not None or keepdims or kwargs:
+            return getattr(np.asarray(self), name)(
+                axis=axis, out=out, keepdims=keepdims, **kwargs
+            )
+
+        acc = None
+        for _, block in self.blocks():
+            value = getattr(block, name)(axis=axis)
+            acc = value if acc is None else ufunc(acc, value)
+        return acc
+
+    def flush(self):
+        """Writes the frames of incomplete blocks, and flushes the file
+        """
+        with self._lock:
+            pending, self._pending = self._pending, {}
+        for b, (block, written) in pending.items():
+            for j in sorted(written):
+                self._dataset[b + j] = block[j]
+        if self.mode != "r":
+            self._file.flush()
+
+    def close(self):
+        try:
+            self.flush()
+            self._file.close()
+        except (ValueError, RuntimeError):
+            pass
+
+    def reopen(self, mode="r"):
+        """Closes the file and opens it again, i.e., read-only once it has been written
+
+        Returns:
+            ChunkedStack: the reopened stack
+        """
+        self.close()
+        return ChunkedStack(self.path, self.name, mode=mode, temporary=self.temporary)
+
+    def __deepcopy__(self, memo):
+        """Copies (e.g., of a duplicated layer) read the same file with their own handle,
+        as it is not modified once written
+        """
+        self.flush()
+        return ChunkedStack(self.path, self.name, temporary=self.temporary)
+
+    def __reduce__(self):
+        # Files of the scratch space do not outlive the session, so their pixels are pickled
+        if self.temporary:
+            return (np.array, (np.asarray(self),))
+        return (ChunkedStack, (self.path, self.name))
@@ -0,0 +1,270 @@
+# -*- coding: utf-8 -*-
+# Created on Sun Oct 18 2026
+# Last modified on Sun Oct 18 2026
+# Copyright (c) CaMOS Development Team. All Rights Reserved.
+# Distributed under a MIT License. See LICENSE for more info.
+
+import numpy as np
+
+# Field of the tables of events holding the time of every event
+TIME_FIELD = "Active"
+
+# Layout of the tables of events: the cell (or electrode), and the time of the event
+EVENT_TYPE = [("CellID", "int"), (TIME_FIELD, "float")]
+
+
+class EventIndex:
+    """Index of a table of events (or any table keyed by CellID), built once when the
+    dataset is added. Rows are sorted by cell and, for tables of events, by time, and
+    grouped in CSR form: the rows of the k-th cell are order[offsets[k]:offsets[k + 1]],
+    and their times are times[offsets[k]:offsets[k + 1]], in increasing order. The table
+    itself is not modified.
+    """
+
+    def __init__(self, data):
+        """Initialization of the object
+
+        Args:
+            data (np.ndarray): structured array with a CellID field, with shape (rows, 1) or (rows,), or CompactEvents
+        """
+        # Columns are read by name, so compact tables (see CompactEvents) are not expanded
+        cells = np.asarray(data[:]["CellID"]).ravel()
+        self.rows = len(cells)
+
+        if TIME_FIELD in data.dtype.names:
+            times = np.asarray(data[:][TIME_FIELD], dtype=np.float64).ravel()
+        else:
+            times = None
+
+        # Tables coming from another index (e.g., a filtered dataset) are already sorted
+        if _is_sorted(cells, times):
+            self.order = np.arange(self.rows)
+        elif times is None or np.all(times[1:] >= times[:-1]):
+            # Events in time order (i.e., from recordings) only need a stable sort by cell
+            self.order = np.argsort(cells, kind="stable")
+        else:
+            self.order = np.lexsort((times, cells))
+
+        cells = cells[self.order]
+        if self.rows > 0:
+            starts = np.flatnonzero(np.r_[True, cells[1:] != cells[:-1]])
+        else:
+            starts = np.zeros(0, dtype=np.intp)
+        self.cells = cells[starts]
+        self.offsets = np.r_[starts, self.rows].astype(np.intp)
+        self.counts = np.diff(self.offsets)
+        self.times = times[self.order] if times is not None else None
+
+    def __len__(self):
+        return len(self.cells)
+
+    def __contains__(self, cell):
+        return self.position(cell) is not None
+
+    def position(self, cell):
+        """Position of a cell in the sorted cells, or None if it has no rows
+        """
+        k = int(np.searchsorted(self.cells, cell))
+        if k < len(self.cells) and self.cells[k] == cell:
+            return k
+        return None
+
+    def _position(self, cell):
+        k = self.position(cell)
+        if k is None:
+            raise KeyError("The cell {} is not in the dataset".format(cell))
+        return k
+
+    def _segment(self, cell):
+        k = self._position(cell)
+        return slice(self.offsets[k], self.offsets[k + 1])
+
+    def rows_of(self, cell):
+        """Rows of the table that belong to a cell, in time order
+        """
+        return self.order[self._segment(cell)]
+
+    def events(self, cell):
+        """Times of the events of a cell, in increasing order
+        """
+        return self.times[self._segment(cell)]
+
+    def count(self, cell):
+        return int(self.counts[self._position(cell)])
+
+    def window(self, cell, start, end):
+        """Rows of the table of the events of a cell with start <= time < end
+
+        Args:
+            cell (int): CellID
+            start (float): beginning of the window
+            end (float): end of the window (exclusive)
+
+        Returns:
+            np.ndarray: rows of the table, in time order
+        """
+        segment = self._segment(cell)
+        times = self.times[segment]
+        a, b = np.searchsorted(times, [start, end], side="left")
+        return self.order[segment][a:b]
+
+    def positions(self, IDs):
+        """Positions of the cells of a list that have rows, in the sorted cells
+        """
+        IDs = np.asarray(IDs).ravel()
+        if len(self.cells) == 0:
+            return np.zeros(0, dtype=np.intp)
+        k = np.minimum(np.searchsorted(self.cells, IDs), len(self.cells) - 1)
+        return np.unique(k[self.cells[k] == IDs])
+
+    def select(self, IDs):
+        """Rows of the table that belong to any cell of a list, in their order in the
+        table (as a boolean mask of the CellID column would give them)
+
+        Args:
+            IDs (list): CellID of the cells to keep
+
+        Returns:
+            np.ndarray: rows of the table, in increasing order
+        """
+        k = self.positions(IDs)
+        return np.sort(self.order[_ranges(self.offsets[k], self.counts[k])])
+
+    def event_cells(self):
+        """CellID of every row, in the sorted order
+        """
+        return np.repeat(self.cells, self.counts)
+
+
+def _is_sorted(cells, times):
+    """Whether rows are sorted by cell and, within a cell, by time
+    """
+    if len(cells) < 2:
+        return True
+    # Compared rather than subtracted, as compact CellIDs may be unsigned
+    if np.any(cells[1:] < cells[:-1]):
+        return False
+    if times is None:
+        return True
+    return bool(np.all((cells[1:] > cells[:-1]) | (times[1:] >= times[:-1])))
+
+
+def _ranges(starts, counts):
+    """Concatenation of the ranges starts[i]:starts[i] + counts[i]
+    """
+    total = int(counts.sum())
+    if total == 0:
+        return np.zeros(0, dtype=np.intp)
+    # Every range continues the previous index, except at the start of each range
+    steps = np.ones(total, dtype=np.intp)
+    ends = np.cumsum(counts)[:-1]
+    nonempty = counts > 0
+    first = starts[nonempty]
+    steps[0] = first[0]
+    jumps = np.r_[0, ends][nonempty][1:]
+    prev_end = (starts + counts - 1)[nonempty][:-1]
+    steps[jumps] = first[1:] - prev_end
+    return np.cumsum(steps)
+
+
+def narrowest_dtype(values):
+    """Narrowest integer type holding all the values, i.e., unsigned for non-negative ones
+    """
+    values = np.asarray(values)
+    if values.size == 0:
+        return np.dtype(np.uint8)
+    lo, hi = int(values.min()), int(values.max())
+    if lo >= 0:
+        return np.min_scalar_type(hi)
+    for dtype in (np.int8, np.int16, np.int32):
+        info = np.iinfo(dtype)
+        if info.min <= lo and hi <= info.max:
+            return np.dtype(dtype)
+    return np.dtype(np.int64)
+
+
+class CompactEvents:
+    """Table of events stored compactly: the CellID and the frame (sample index) of every
+    event, each with the narrowest integer type that fits, and the sampling rate of the
+    recording. Times in seconds are only computed when the Active column is read.
+
+    It reads as a table with the EVENT_TYPE layout and shape (rows, 1): data[:]["CellID"]
+    and data[:]["Active"] return columns (with the types of EVENT_TYPE, so arithmetic on
+    the CellIDs does not wrap around), rows are selected with indices, slices or boolean
+    masks, and np.asarray(data) builds the structured array, i.e., to export it.
+    """
+
+    def __init__(self, cells, frames, sampling):
+        """Initialization of the object
+
+        Args:
+            cells (np.ndarray): CellID of every event
+            frames (np.ndarray): frame of every event, at the sampling rate
+            sampling (float): sampling rate, in frames per second
+        """
+        cells = np.asarray(cells).ravel()
+        frames = np.asarray(frames).ravel()
+        if len(cells) != len(frames):
+            raise ValueError("There must be one CellID for every event")
+        self.cells = cells.astype(narrowest_dtype(cells), copy=False)
+        self.frames = frames.astype(narrowest_dtype(frames), copy=False)
+        self.sampling = float(sampling)
+
+    @property
+    def dtype(self):
+        return np.dtype(EVENT_TYPE)
+
+    @property
+    def shape(self):
+        return (len(self.cells), 1)
+
+    @property
+    def ndim(self):
+        return 2
+
+    @property
+    def size(self):
+        return len(self.cells)
+
+    @property
+    def nbytes(self):
+        return self.cells.nbytes + self.frames.nbytes
+
+    def __len__(self):
+        return len(self.cells)
+
+    def times(self):
+        """Time of every event, in seconds
+        """
+        return self.frames / self.sampling
+
+    def __getitem__(self, key):
+        if isinstance(key, str):
+            if key == "CellID":
+                return self.cells.astype(self.dtype["CellID"]).reshape(-1, 1)
+            if key == "Active":
+                return self.times().reshape(-1, 1)
+            raise ValueError("no field of name {}".format(key))
+        if isinstance(key, tuple):
+            # Rows of the single column, i.e., data[rows, 0] or data[rows, :]
+            key = key[0]
+        if isinstance(key, (int, np.integer)):
+            row = range(len(self))[key]
+            return self[row : row + 1].to_array()[0]
+        key = np.asarray(key).reshape(-1) if not isinstance(key, slice) else key
+        return CompactEvents(self.cells[key], self.frames[key], self.sampling)
+
+    def to_array(self):
+        """Structured array with the EVENT_TYPE layout, i.e., at the export boundary
+
+        Returns:
+            np.ndarray: structured array with shape (rows, 1)
+        """
+        out = np.zeros(shape=self.shape, dtype=self.dtype)
+        out[:, 0]["CellID"] = self.cells
+        out[:, 0]["Active"] = self.times()
+        return out
+
+    def __array__(self, dtype=None, copy=None):
+        out = self.to_array()
+        return out if dtype is None else out.astype(dtype)
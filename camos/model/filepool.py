@@ -0,0 +1,115 @@
+# -*- coding: utf-8 -*-
+# Created on Sun Oct 18 2026
+# Last modified on Sun Oct 18 2026
+# Copyright (c) CaMOS Development Team. All Rights Reserved.
+# Distributed under a MIT License. See LICENSE for more info.
+
+import atexit
+import os
+import threading
+from collections import OrderedDict
+
+import h5py
+
+# Maximum number of files kept open by the pool
+MAX_FILES = 8
+
+
+class FilePool:
+    """Pool of read-only HDF5 files, shared by the readers of the same path. Readers
+    register while they use a file (see acquire and release), so it is never closed
+    under them; files without readers are kept open for reuse, and the least recently
+    used of them are closed when more than max_files are idle. Every file is closed
+    when the application exits.
+    """
+
+    def __init__(self, max_files=MAX_FILES):
+        self.max_files = max_files
+        self._files = {}
+        self._users = {}
+        self._idle = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _get(self, path):
+        f = self._files.get(path)
+        if f is None or not f.id.valid:
+            f = h5py.File(path, "r")
+            self._files[path] = f
+        return f
+
+    def acquire(self, path):
+        """Registers a reader of a file, which is kept open until it is released
+
+        Args:
+            path (str): route to the file
+
+        Returns:
+            h5py.File: the file, opened read-only
+        """
+        path = os.path.abspath(path)
+        with self._lock:
+            f = self._get(path)
+            self._users[path] = self._users.get(path, 0) + 1
+            self._idle.pop(path, None)
+        return f
+
+    def release(self, path):
+        """Unregisters a reader of a file; once it has none, the file can be closed
+        """
+        path = os.path.abspath(path)
+        with self._lock:
+            if path not in self._users:
+                return
+            self._users[path] -= 1
+            if self._users[path] > 0:
+                return
+            del self._users[path]
+            self._idle[path] = True
+            closing = self._evict()
+        for f in closing:
+            f.close()
+
+    def _evict(self):
+        """Takes the least recently used idle files out of the pool, above max_files
+        """
+        closing = []
+        while len(self._idle) > self.max_files:
+            path, _ = self._idle.popitem(last=False)
+            closing.append(self._files.pop(path))
+        return closing
+
+    def open(self, path):
+        """Open handle of a file, which must not be closed by the caller. Unless the
+        caller has acquired the file, the handle may be closed once other files are released.
+
+        Args:
+            path (str): route to the file
+
+        Returns:
+            h5py.File: the file, opened read-only
+        """
+        path = os.path.abspath(path)
+        with self._lock:
+            f = self._get(path)
+            if path not in self._users:
+                self._idle[path] = True
+                self._idle.move_to_end(path)
+            closing = self._evict()
+        for old in closing:
+            old.close()
+        return f
+
+    def close_all(self):
+        with self._lock:
+            files = list(self._files.values())
+            self._files, self._users, self._idle = {}, {}, OrderedDict()
+        for f in files:
+            f.close()
+
+
+_pool = FilePool()
+atexit.register(_pool.close_all)
+
+
+def get_pool():
+    return _pool
@@ -1,106 +1,255 @@
 # -*- coding: utf-8 -*-
 # Created on Sat Jun 05 2021
-# Last modified on Mon Jun 07 2021
+# Last modified on Sun Oct 18 2026
 # Copyright (c) CaMOS Development Team. All Rights Reserved.
 # Distributed under a MIT License. See LICENSE for more info.
 
 # Derived from multipagetiff, credits to mpascucci
 
-from tempfile import mkdtemp
-import os.path as _path
+from concurrent.futures import ThreadPoolExecutor, as_completed, wait
+import mmap
+import uuid
 
 from collections.abc import Sequence
 from PIL import Image
 import numpy as np
 
-import copy
+from camos.model.tiffstack import open_tiff
+from camos.model.statistics import LayerStatistics
+from camos.model.labels import LabelIndex
+from camos.model.scratch import get_scratch
+from camos.model.chunkstore import ChunkedStack, create_store, open_store
+from camos.model.virtual import VirtualStack
 
 
-def tiff2nparray(path, persistence=True):
-    im = Image.open(path)
-    i = 0
-    frames = []
-    try:
-        while True:
-            im.seek(i)
-            frames.append(np.array(im))
-            i += 1
-    except EOFError:
-        pass
+def _allocate(shape, dtype, persistence=True, layout=None, compression=None):
+    """Preallocates the array the frames of a stack are written into.
+
+    Args:
+        shape (tuple): shape of the whole stack
+        dtype (np.dtype): type of the pixels
+        persistence (bool, optional): the array is created in RAM (True), or as
+            a memory map in the scratch space on disk (False). Defaults to True.
+        layout (str, optional): if not persistent, chunk layout ("frame" or "pixel")
+            of an HDF5 store used instead of the memory map. Defaults to None.
+        compression (str, optional): HDF5 filter of the chunks, e.g. "lzf". Defaults to None.
 
-    frames = np.array(frames)
+    Returns:
+        np.ndarray: the preallocated array, np.memmap or ChunkedStack if not persistent
+    """
     if persistence:
-        return frames, im.info
+        return np.empty(shape, dtype=dtype)
 
-    path = _path.join(mkdtemp(), "memmap.dat")
-    out_mmap = np.memmap(path, dtype=frames.dtype, mode="w+", shape=frames.shape,)
+    if layout is not None:
+        nbytes = int(np.prod(shape)) * np.dtype(dtype).itemsize
+        path = get_scratch().new_file(nbytes)
+        return create_store(path, shape, dtype, layout, compression, temporary=True)
 
-    out_mmap[:] = frames
+    return get_scratch().allocate(shape, dtype)
 
-    out = np.memmap(path, dtype=frames.dtype, mode="r", shape=frames.shape,)
-    return out, im.info
 
+def _finalize(out):
+    """Once all frames are written, a disk stack is reopened as read-only
+    """
+    if isinstance(out, ChunkedStack):
+        return out.reopen("r")
+    if not isinstance(out, np.memmap):
+        return out
 
-def list2stack(paths, persistence=True):
-    frames = []
-    for path in paths:
-        im = Image.open(path)
-        i = 0
-        try:
-            while True:
-                im.seek(i)
-                frames.append(np.array(im))
-                i += 1
-        except EOFError:
-            pass
-
-    frames = np.array(frames)
-    if persistence:
-        return frames, im.info
+    out.flush()
+    return np.memmap(out.filename, dtype=out.dtype, mode="r", shape=out.shape)
 
-    path = _path.join(mkdtemp(), "memmap.dat")
-    out_mmap = np.memmap(path, dtype=frames.dtype, mode="w+", shape=frames.shape,)
 
-    out_mmap[:] = frames
+def _discard(out):
+    """Gives back the file of the scratch space of a stack that could not be loaded
+    """
+    if out is not None:
+        get_scratch().release(get_scratch().acquire(out))
+
 
-    out = np.memmap(path, dtype=frames.dtype, mode="r", shape=frames.shape,)
-    return out, im.info
+def _report(progress, i, total, previous=None):
+    """Reports the progress of the ingest as a percentage, only when it changes
+    since the previous count (by default, i - 1)
+    """
+    if progress is None or total == 0:
+        return
+    if previous is None:
+        previous = i - 1
+    if i == 0 or (i * 100) // total != (previous * 100) // total:
+        progress(int(i * 100 / total))
 
 
-def nparray(arr, persistence=True):
-    i = 0
-    frames = []
+def _pil_frames(im, first=0):
+    """Iterates over the pages of an opened PIL image, from the page first on
+    """
+    i = first
     try:
         while True:
-            if len(arr.shape) == 3:
-                if (arr.shape[2]) <= 3:
-                    frames.append(np.array(arr))
-                    break
-                frames.append(np.array(arr[i, :, :]))
-                i += 1
-            elif len(arr.shape) == 2:
-                frames.append(np.array(arr[:, :]))
-                break
-            elif len(arr.shape) == 4:
-                frames.append(np.array(arr[i, :, :, :]))
-                i += 1
-            else:
-                raise NotImplementedError("Image shape is not valid")
-    except:
+            im.seek(i)
+            yield np.array(im)
+            i += 1
+    except EOFError:
         pass
 
-    frames = np.array(frames)
-    if persistence:
-        return frames
 
-    path = _path.join(mkdtemp(), "memmap.dat")
-    out_mmap = np.memmap(path, dtype=frames.dtype, mode="w+", shape=frames.shape,)
+def _n_frames(im):
+    return getattr(im, "n_frames", 1)
+
 
-    out_mmap[:] = frames
+def tiff2nparray(path, persistence=True, progress=None, layout=None, compression=None):
+    im = Image.open(path)
+    total = _n_frames(im)
+    out = None
+    try:
+        for i, frame in enumerate(_pil_frames(im)):
+            if out is None:
+                shape = (total,) + frame.shape
+                out = _allocate(shape, frame.dtype, persistence, layout, compression)
+            out[i] = frame
+            _report(progress, i, total)
+    except BaseException:
+        _discard(out)
+        raise
 
-    out = np.memmap(path, dtype=frames.dtype, mode="r", shape=frames.shape,)
+    return _finalize(out), im.info
 
-    return out
+
+def _count_frames(path):
+    with Image.open(path) as im:
+        return _n_frames(im)
+
+
+def _decode_into(out, path, start, first=0):
+    """Decodes the pages of a file, from the page first on, into their slots of
+    the stack, starting at index start. Returns the number of frames written.
+    """
+    with Image.open(path) as im:
+        n = 0
+        for frame in _pil_frames(im, first):
+            if frame.shape != out.shape[1:] or frame.dtype != out.dtype:
+                raise ValueError("All the images in a stack must have the same shape")
+            out[start + n] = frame
+            n += 1
+    return n
+
+
+def list2stack(
+    paths, persistence=True, progress=None, workers=None, layout=None, compression=None
+):
+    """Loads a list of image files into a single stack. Files are decoded
+    concurrently, and every frame is written into its own slot, so the order of
+    the frames follows the order of the paths.
+
+    Args:
+        paths (list): routes to the files
+        persistence (bool, optional): the stack is created in RAM (True) or on disk (False). Defaults to True.
+        progress (callable, optional): receives the percentage of frames loaded. Defaults to None.
+        workers (int, optional): number of decoding threads. Defaults to the number of CPUs.
+        layout (str, optional): chunk layout of a disk stack, see _allocate. Defaults to None.
+        compression (str, optional): HDF5 filter of the chunks. Defaults to None.
+
+    Returns:
+        tuple: the stack, as np.ndarray or np.memmap, and the metadata of the first file
+    """
+    if len(paths) == 0:
+        raise ValueError("No images to be loaded")
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        # The number of pages is read from the headers, before decoding anything
+        counts = list(pool.map(_count_frames, paths))
+        starts = np.concatenate(([0], np.cumsum(counts)[:-1]))
+        total = int(sum(counts))
+
+        # The first page gives the shape and type of the stack; it is decoded once
+        with Image.open(paths[0]) as im:
+            info = im.info
+            first = np.array(im)
+        out = _allocate(
+            (total,) + first.shape, first.dtype, persistence, layout, compression
+        )
+        jobs = []
+        try:
+            out[0] = first
+            if counts[0] > 1:
+                jobs.append(pool.submit(_decode_into, out, paths[0], 1, 1))
+            jobs += [
+                pool.submit(_decode_into, out, path, int(start))
+                for path, start in zip(paths[1:], starts[1:])
+            ]
+            done = 1
+            _report(progress, done, total, previous=0)
+            for job in as_completed(jobs):
+                previous = done
+                done += job.result()
+                _report(progress, done, total, previous)
+        except BaseException:
+            # The pending files are not decoded, and the partial stack is given back
+            for job in jobs:
+                job.cancel()
+            wait(jobs)
+            _discard(out)
+            raise
+
+    return _finalize(out), info
+
+
+def _stack_shape(shape):
+    """Shape of the stack built from an array: single images (grayscale,
+    or with up to 3 channels) become stacks of one frame.
+    """
+    if len(shape) == 2:
+        return (1,) + shape
+    elif len(shape) == 3:
+        if shape[2] <= 3:
+            return (1,) + shape
+        return shape
+    elif len(shape) == 4:
+        return shape
+    raise NotImplementedError("Image shape is not valid")
+
+
+def on_disk(arr):
+    """Whether the buffer of an array (or of the array it is a view of) is a memory map
+    """
+    while arr is not None:
+        if isinstance(arr, (np.memmap, mmap.mmap)):
+            return True
+        arr = getattr(arr, "base", None)
+    return False
+
+
+def nparray(
+    arr, persistence=True, progress=None, copy=False, layout=None, compression=None
+):
+    """Creates a stack from an array. Unless a copy is requested, the array (or a view of
+    it with the stack shape) is wrapped without copying, as a read-only view; for a disk
+    stack, this only happens if the array is already backed by a file.
+
+    Args:
+        arr (np.ndarray): the image or stack
+        persistence (bool, optional): the stack is kept in RAM (True) or on disk (False). Defaults to True.
+        progress (callable, optional): receives the percentage of frames copied. Defaults to None.
+        copy (bool, optional): whether the pixels must be copied into a new buffer. Defaults to False.
+        layout (str, optional): chunk layout of a disk stack, see _allocate. Defaults to None.
+        compression (str, optional): HDF5 filter of the chunks. Defaults to None.
+
+    Returns:
+        tuple: the stack, and whether it shares its buffer with arr
+    """
+    arr = np.asarray(arr)
+    arr = arr.reshape(_stack_shape(arr.shape))
+    if not copy and (persistence or (on_disk(arr) and layout is None)):
+        out = arr.view()
+        out.flags.writeable = False
+        return out, True
+
+    out = _allocate(arr.shape, arr.dtype, persistence, layout, compression)
+    total = len(arr)
+    for i in range(total):
+        out[i] = arr[i]
+        _report(progress, i, total)
+
+    return _finalize(out), False
 
 
 class Stack(Sequence):
@@ -110,7 +259,19 @@ class Stack(Sequence):
     """
 
     def __init__(
-        self, path, dx, dz, title="", z_label="depth", units="", persistence=True
+        self,
+        path,
+        dx,
+        dz,
+        title="",
+        z_label="depth",
+        units="",
+        persistence=True,
+        lazy=None,
+        progress=None,
+        copy=False,
+        layout=None,
+        compression=None,
     ):
         """
         :param path: path to the tiff file
@@ -120,28 +281,60 @@ class Stack(Sequence):
         :param z_label: label used for the color coding
         :param cmap: colormap used to repsresent the
         :param title:
+        :param persistence: whether the stack is loaded into RAM (True) or read from disk (False)
+        :param lazy: whether TIFF files are read page by page, as requested; defaults to not persistence
+        :param progress: callable receiving the percentage of frames loaded, e.g. BaseTask.progress
+        :param copy: whether an array passed as path is copied, instead of shared as read-only
+        :param layout: if not persistence, the stack is written in chunks of an HDF5 file,
+            for playback ("frame") or for time series of pixels ("pixel"); None for a flat memory map
+        :param compression: HDF5 filter of the chunks, e.g. "lzf"
         properties:
         these properties can be modified
         - crop: [x0,y0,x1,y1] defines a rectangle which crops the stack when plotting
         - start_frame, end_frame : int, defines the first and last frame to use
         - keyframe: the frame at which z=0
+        - shared: whether the pixels are a read-only view of the array passed as path
+        - virtual: whether the pixels are computed on demand from other stacks
+        - uid: identifier of the pixels, renewed when they are replaced
         """
         self.dx = dx
+        self._stats = None
+        self._labels = None
+        self._scratch = None
+        self.shared = False
         self.dz = dz
+        if lazy is None:
+            lazy = not persistence
         if type(path) == str:
-            self._imgs, info = tiff2nparray(path, persistence)
+            store = open_store(path)
+            lazy_imgs = open_tiff(path) if lazy and store is None else None
+            if store is not None:
+                self._imgs, info = (store if lazy else np.asarray(store)), {}
+            elif lazy_imgs is not None:
+                self._imgs, info = lazy_imgs, lazy_imgs.info
+            else:
+                self._imgs, info = tiff2nparray(
+                    path, persistence, progress, layout, compression
+                )
             try:
                 self.dx = info["resolution"][0]
             except:
                 pass
         elif type(path) == list:
-            self._imgs, info = list2stack(path, persistence)
-        elif type(path) == np.ndarray:
-            self._imgs = nparray(copy.deepcopy(path), persistence)
+            self._imgs, info = list2stack(
+                path, persistence, progress, layout=layout, compression=compression
+            )
+        elif isinstance(path, np.ndarray):
+            self._imgs, self.shared = nparray(
+                path, persistence, progress, copy, layout, compression
+            )
+        elif isinstance(path, VirtualStack):
+            # Pixels are computed from the sources, until the stack is materialized
+            self._imgs, self.shared = path, True
         else:
             raise NotImplementedError("The path format is unknown")
 
-        self.crop = [0, 0, *self._imgs[0].shape]
+        self.crop = [0, 0, *self._imgs.shape[1:]]
         self.keyframe = len(self) // 2
         self.start_frame = 0
         self.end_frame = len(self) - 1
@@ -150,6 +343,66 @@ class Stack(Sequence):
         self.z_label = z_label
         self.coords = []
 
+    def detach(self):
+        """Copies the pixels into a buffer owned by the stack, if they are shared,
+        so they can be modified without altering the original array
+        """
+        if self.shared:
+            self._imgs = np.array(self._imgs)
+            self.shared = False
+
+    @property
+    def virtual(self):
+        return isinstance(self._imgs, VirtualStack)
+
+    def materialize(self, persistence=True, progress=None):
+        """Computes all the frames of a virtual stack, and keeps them as its pixels
+
+        Args:
+            persistence (bool, optional): the pixels are kept in RAM (True) or on disk (False). Defaults to True.
+            progress (callable, optional): receives the percentage of frames computed. Defaults to None.
+        """
+        if not self.virtual:
+            return
+
+        out = _allocate(self._imgs.shape, self._imgs.dtype, persistence)
+        total = len(self)
+        for i in range(total):
+            out[i] = self._imgs[i]
+            _report(progress, i, total)
+        self._imgs = _finalize(out)
+        self.shared = False
+
+    def rechunk(self, layout="pixel", compression=None, path=None, progress=None):
+        """Writes the pixels into a chunked HDF5 store, with chunks suited to the access
+        pattern: "frame" for playback, "pixel" for time series of pixels (i.e., traces of ROIs)
+
+        Args:
+            layout (str, optional): "frame" or "pixel". Defaults to "pixel".
+            compression (str, optional): HDF5 filter of the chunks, e.g. "lzf". Defaults to None.
+            path (str, optional): route to the file; a scratch space file if None. Defaults to None.
+            progress (callable, optional): receives the percentage of frames written. Defaults to None.
+        """
+        shape, dtype = self._imgs.shape, self._imgs.dtype
+        if path is None:
+            out = _allocate(shape, dtype, False, layout, compression)
+        else:
+            out = create_store(path, shape, dtype, layout, compression)
+
+        total = len(self)
+        for i in range(total):
+            out[i] = self._imgs[i]
+            _report(progress, i, total)
+        self._imgs = _finalize(out)
+        self.shared = False
+
+    def release(self):
+        """Gives back the file of the scratch space backing the stack, if any, once it
+        is no longer displayed; the pixels must not be accessed afterwards
+        """
+        get_scratch().release(self._scratch)
+        self._scratch = None
+
     def reverse(self):
         self._imgs = self.pages[::-1]
         self.start_frame = len(self) - self.end_frame
@@ -163,10 +416,66 @@ class Stack(Sequence):
         self.end_frame = round(self.end_frame // f)
 
     def __getitem__(self, i):
+        if isinstance(i, (int, np.integer)):
+            x, y, h, w = self.crop[0:4]
+            return self._imgs[i][x : x + h, y : y + w]
         return self.pages[i]
 
     def __len__(self):
-        return self.pages.shape[0]
+        return self._imgs.shape[0]
+
+    def __getstate__(self):
+        # The label index is rebuilt when needed, instead of pickled
+        d = self.__dict__.copy()
+        d["_labels"] = None
+        return d
+
+    def __setstate__(self, d):
+        # Stacks pickled before the statistics were cached keep the pixels in _imgs
+        if "_imgs" in d:
+            d["_data"] = d.pop("_imgs")
+        d.setdefault("_stats", None)
+        d["_labels"] = None
+        d.setdefault("uid", uuid.uuid4().hex)
+        # Unpickled pixels are in RAM, unless they are a view of a live scratch file
+        d["_scratch"] = None
+        self.__dict__ = d
+        self._scratch = get_scratch().acquire(self._data)
+
+    @property
+    def _imgs(self):
+        return self._data
+
+    @_imgs.setter
+    def _imgs(self, value):
+        self._data = value
+        # Identifies the pixels, i.e., for the thumbnails; copies of the stack keep it
+        self.uid = uuid.uuid4().hex
+        # The new pixels are registered before releasing the old ones, as they can share the file
+        previous = self._scratch
+        self._scratch = get_scratch().acquire(value)
+        get_scratch().release(previous)
+        if self._stats is not None:
+            self._stats.set_data(value)
+        self._labels = None
+
+    @property
+    def stats(self):
+        """Intensity statistics of the whole stack, see LayerStatistics.
+        They are computed on first access, and reset when the pixels are replaced.
+        """
+        if self._stats is None:
+            self._stats = LayerStatistics(self._data)
+        return self._stats
+
+    @property
+    def labels(self):
+        """Index of the labels of the first frame, for masks, see LabelIndex.
+        It is built on first access, and reset when the pixels are replaced.
+        """
+        if self._labels is None:
+            self._labels = LabelIndex(self._data[0])
+        return self._labels
 
     def set_start_in_units(self, start):
         self.start_frame = self.keyframe + round(start // self.dz) + 1
@@ -177,6 +486,8 @@ class Stack(Sequence):
     @property
     def pages(self):
         x, y, h, w = self.crop[0:4]
+        if [x, y, h, w] == [0, 0, *self._imgs.shape[1:3]]:
+            return self._imgs
         return self._imgs[:, x : x + h, y : y + w]
 
     @property
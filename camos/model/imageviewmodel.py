@@ -1,6 +1,6 @@
 # -*- coding: utf-8 -*-
 # Created on Sat Jun 05 2021
-# Last modified on Mon Jun 07 2021
+# Last modified on Sun Oct 18 2026
 # Copyright (c) CaMOS Development Team. All Rights Reserved.
 # Distributed under a MIT License. See LICENSE for more info.
 
@@ -12,11 +12,29 @@ import copy
 import numpy as np
 
 from camos.model.inputdata import InputData
+from camos.model.thumbnails import get_thumbnails
+from camos.model.virtual import (
+    CropStack,
+    FlipStack,
+    RotateStack,
+    CombineStack,
+    VirtualStack,
+)
 
 MAXHISTORY = 20
 MAXNAMELEN = 300
 
 
+def _to_qimage(thumb):
+    """Converts an RGB thumbnail (uint8 array) into a QImage that owns its pixels
+    """
+    thumb = np.ascontiguousarray(thumb)
+    height, width = thumb.shape[0:2]
+    return QImage(
+        thumb.data, width, height, 3 * width, QImage.Format_RGB888
+    ).copy()
+
+
 class ImageViewModel(QObject):
     """The ImageViewModel object. This contains information regarding image data, without considering format.
     Images are stored in self.images as InputData objects. They are accessible by index, which corresponds to the rest of
@@ -54,6 +72,9 @@ class ImageViewModel(QObject):
     # For intensities being updated
     updateint = pyqtSignal(int)
 
+    # For the thumbnail of a layer being ready, with the InputData it belongs to
+    iconready = pyqtSignal(object, QImage)
+
     # For communicating to plots being updated
     # imagetoplot = pyqtSignal(list)
 
@@ -165,7 +186,7 @@ class ImageViewModel(QObject):
             int(min(x_shape_max, abs(int(x_tr - self.roi_coord[1][1])) / scale[0])),
         )
 
-        cropped = self.images[index]._image._imgs[:, y_min:y_max, x_min:x_max]
+        cropped = CropStack(self.images[index]._image._imgs, y_min, y_max, x_min, x_max)
         image = InputData(cropped, name="Cropped from Layer {}".format(index),)
         image.loadImage()
         self.add_image(image, "Cropped from Layer {}".format(index), scale=scale)
@@ -177,7 +198,7 @@ class ImageViewModel(QObject):
             index (int): position of the InputData object containing the image, in the list self.images
         """
         scale = self.scales[index]
-        flipped = np.flip(self.images[index]._image._imgs, axis=2)
+        flipped = FlipStack(self.images[index]._image._imgs, axis=2)
         image = InputData(flipped, name="Flipped from Layer {}".format(index),)
         image.loadImage()
         self.add_image(image, "Flipped from Layer {}".format(index), scale=scale)
@@ -185,13 +206,12 @@ class ImageViewModel(QObject):
     def select_cells(self, cell_ID=None, scale=[1, 1]):
         """Selects the cells in the currently selected layer if cell selection is enabled. See the method self.trigger_select_cells
         """
-        mask = self.images[self.currentlayer]._image._imgs[0]
         if cell_ID == None:
             x, y = self.curr_x, self.curr_y
-            cell_ID = mask[x, y]
+            cell_ID = self.images[self.currentlayer]._image._imgs[0, x, y]
         else:
             cell_ID = int(cell_ID[2])
-        cell = np.where(mask == cell_ID, mask, 0)
+        cell = self.get_layer_labels(self.currentlayer).select([cell_ID])
         image = InputData(cell, name="Selected Cell {}".format(cell_ID))
         image.loadImage()
         scale = self.scales[self.currentlayer]
@@ -204,10 +224,8 @@ class ImageViewModel(QObject):
     def find_cells(self, cell_ID=[0]):
         """Selects the cells in the currently selected layer if cell selection is enabled. See the method self.trigger_select_cells
         """
-        mask = self.images[self.currentlayer].image(0)
         cell_ID = list(map(int, cell_ID))
-        ids = np.isin(mask, cell_ID)
-        found = np.where(ids == True, mask, 0)
+        found = self.get_layer_labels(self.currentlayer).select(cell_ID)
         newname = "Cells {} from Layer {}".format(cell_ID, self.currentlayer)
         image = InputData(found, name=newname)
         image.loadImage()
@@ -219,8 +237,10 @@ class ImageViewModel(QObject):
     def filter_layer(self, lowerf, upperf):
         """Filters the cells in the currently selected layer, between lower and upper values.
         """
-        mask = self.images[self.currentlayer].image(0)
-        found = np.where((mask > lowerf) & (mask < upperf), mask, 0)
+        labels = self.get_layer_labels(self.currentlayer).labels
+        found = self.get_layer_labels(self.currentlayer).select(
+            labels[(labels > lowerf) & (labels < upperf)]
+        )
         newname = "Filtered from Layer {}".format(self.currentlayer)
         image = InputData(found, name=newname)
         image.loadImage()
@@ -233,7 +253,7 @@ class ImageViewModel(QObject):
         if layer == None:
             idx = [self.get_currint()]
         else:
-            idx = np.unique(self.images[self.currentlayer]._image._imgs[0]).tolist()
+            idx = self.get_layer_labels(self.currentlayer).labels.tolist()
         return idx
 
     @pyqtSlot()
@@ -267,7 +287,7 @@ class ImageViewModel(QObject):
             self.currentlayer = 0
 
         # Remove all data and properties linked to index
-        self.images.pop(index)
+        self.images.pop(index).release()
         self.frames.pop(index)
         self.opacities.pop(index)
         self.colormaps.pop(index)
@@ -288,19 +308,48 @@ class ImageViewModel(QObject):
             return None
         return self.names
 
-    def get_layer(self, layer=0):
+    def get_layer(self, layer=0, lazy=False):
         """This function generates the visualization of the indicated layer in the model, according to its properties (colormap, opacity...).
 
+        Args:
+            lazy (bool, optional): for virtual layers, return a VirtualFrame, which only computes the regions that are sliced. Defaults to False.
+
         Returns:
             np.ndarray: the merge of all layers in the model
         """
         if len(self.images) == 0:
             return np.zeros((1, 1))
-        _frame = int(self.frame / (self.maxframe / self.frames[layer]))
-        _img = self.images[layer]._image._imgs[_frame]
+        _imgs = self.images[layer]._image._imgs
+        if lazy and isinstance(_imgs, VirtualStack):
+            return _imgs.view(self.get_layer_frame(layer))
+        _img = _imgs[self.get_layer_frame(layer)]
 
         return _img
 
+    def get_layer_stats(self, layer=0):
+        """Cached intensity statistics of the indicated layer, see LayerStatistics
+
+        Returns:
+            LayerStatistics: statistics of the whole stack of the layer
+        """
+        return self.images[layer]._image.stats
+
+    def get_layer_labels(self, layer=0):
+        """Cached index of the labels of the indicated (mask) layer, see LabelIndex
+
+        Returns:
+            LabelIndex: sorted labels, with their pixels, areas, centroids and bounding boxes
+        """
+        return self.images[layer]._image.labels
+
+    def get_layer_frame(self, layer=0):
+        """Translates the global frame into the frame of the indicated layer, as layers can have different number of frames
+
+        Returns:
+            int: index of the frame within the layer
+        """
+        return int(self.frame / (self.maxframe / self.frames[layer]))
+
     @pyqtSlot()
     def rotate_image(self, index=0, undo=None):
         """Performs a counter-clockwise rotation on the selected layer (image)
@@ -308,9 +357,14 @@ class ImageViewModel(QObject):
         Args:
             index (int, optional): layer to configure. Defaults to 0.
         """
-        rotated = np.rot90(self.images[index]._image._imgs, axes=(1, 2))
+        source = self.images[index]._image._imgs
+        if isinstance(source, np.ndarray):
+            # Arrays are rotated as a view; other stacks, as a virtual stack
+            rotated = np.rot90(source, axes=(1, 2))
+        else:
+            rotated = RotateStack(source)
         self.images[index]._image._imgs = rotated
-        self.images[index].crop = [0, 0, rotated[0].shape]
+        self.images[index].crop = [0, 0, rotated.shape[1:]]
         self.updatedframe.emit(index)
 
     def reset_position(self, index=0, undo=None):
@@ -377,13 +431,16 @@ class ImageViewModel(QObject):
             # Add to the undo queue
             self.undoAdd(_undo)
 
+    def _combine_layers(self, layer, operation):
+        """Virtual stack combining, frame by frame, the current layer and the given one
+        """
+        a = self.images[self.currentlayer]._image._imgs
+        b = self.images[layer]._image._imgs
+        return CombineStack(a, b, operation)
+
     def sum_layers(self, layer=0):
         curr = self.currentlayer
-        a = self.images[curr].image(0)
-        b = self.images[layer].image(0)
-        assert a.shape == b.shape
-
-        summed = a + b
+        summed = self._combine_layers(layer, "sum")
         image = InputData(
             summed,
             name="Sum from {} and {}".format(self.names[layer], self.names[curr]),
@@ -395,11 +452,7 @@ class ImageViewModel(QObject):
 
     def subtract_layers(self, layer=0):
         curr = self.currentlayer
-        a = self.images[curr].image(0)
-        b = self.images[layer].image(0)
-        assert a.shape == b.shape
-
-        subtracted = np.abs(a - b)
+        subtracted = self._combine_layers(layer, "subtract")
         image = InputData(
             subtracted,
             name="Subtract from {} and {}".format(self.names[layer], self.names[curr]),
@@ -411,12 +464,7 @@ class ImageViewModel(QObject):
 
     def intersect_layers(self, layer=0):
         curr = self.currentlayer
-        a = self.images[curr].image(0)
-        b = self.images[layer].image(0)
-        assert a.shape == b.shape
-
-        multiplied = np.multiply(a, b)
-        intersect = np.where(multiplied != 0, a, 0)
+        intersect = self._combine_layers(layer, "intersect")
         image = InputData(
             intersect,
             name="Intersect from {} and {}".format(self.names[layer], self.names[curr]),
@@ -427,6 +475,15 @@ class ImageViewModel(QObject):
             "Intersect from {} and {}".format(self.names[layer], self.names[curr]),
         )
 
+    def materialize_layer(self, index=0):
+        """Computes and stores all the frames of a virtual layer (i.e., cropped, flipped or combined)
+
+        Args:
+            index (int, optional): index of the layer, according to self.images. Defaults to 0.
+        """
+        self.images[index].materialize()
+        self.updatedframe.emit(index)
+
     @pyqtSlot()
     def duplicate_image(self, index=0):
         """Duplicates the current layer, by copying the InputData object, and calls the self.add_image method.
@@ -545,7 +602,7 @@ class ImageViewModel(QObject):
         try:
             if (self.curr_x < 0) or (self.curr_y < 0):
                 return 0
-            frame = int(self.frame / (self.maxframe / self.frames[self.currentlayer]))
+            frame = self.get_layer_frame(self.currentlayer)
             return self.images[self.currentlayer]._image._imgs[
                 frame, self.curr_x, self.curr_y
             ]
@@ -562,23 +619,27 @@ class ImageViewModel(QObject):
             QPixmap: icon that has been generated as a thumbnail of the input layer
         """
         try:
-            from PIL import Image
-
-            original = (
-                Image.fromarray(self.images[index].image(0).astype(np.uint8))
-                .convert("RGB")
-                .resize((128, 128))
-            )
-            height, width = original.size
-            bytesPerLine = 3 * width
-            icon_image = QImage(
-                np.array(original), width, height, bytesPerLine, QImage.Format_RGB888
-            )
-            icon_pixmap = QPixmap.fromImage(icon_image)
+            thumb = get_thumbnails().get(self.images[index]._image)
+            icon_pixmap = QPixmap.fromImage(_to_qimage(thumb))
         except:
             icon_pixmap = QPixmap()
         return icon_pixmap
 
+    def request_icon(self, index):
+        """Creates the icon for the corresponding layer in a worker thread. Once ready,
+        iconready is emitted with the InputData of the layer, as its index can change meanwhile.
+        Thumbnails are cached, so duplicated layers and reloaded views reuse them.
+
+        Args:
+            index (int): index of the image in the self.images list
+        """
+        image = self.images[index]
+
+        def ready(thumb):
+            self.iconready.emit(image, _to_qimage(thumb))
+
+        get_thumbnails().request(image._image, ready)
+
     def undoAdd(self, _undo):
         self.undoHistory.append(_undo)
         if len(self.undoHistory) > MAXHISTORY:
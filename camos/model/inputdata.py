@@ -1,12 +1,13 @@
 # -*- coding: utf-8 -*-
 # Created on Sat Jun 05 2021
-# Last modified on Mon Jun 07 2021
+# Last modified on Sun Oct 18 2026
 # Copyright (c) CaMOS Development Team. All Rights Reserved.
 # Distributed under a MIT License. See LICENSE for more info.
 
 import numpy as np
 import camos.model.image as img
 from camos.utils.apptools import getGui
+from camos.model.chunkstore import LAYOUTS
 
 
 class InputData:
@@ -15,33 +16,77 @@ class InputData:
     properties of interest for the object to be handled in visualization and analysis.
     """
 
-    def __init__(self, file=None, memoryPersist=None, name="New Layer"):
+    def __init__(
+        self, file=None, memoryPersist=None, name="New Layer", copy=False, layout=None
+    ):
         """Initialization of the object
 
         Args:
-            file ([str, numpy.ndarray], optional): Can be a numpy array containing any numeric data, or a path to a file. The opening plugin must support this. Defaults to None.
+            file ([str, numpy.ndarray, VirtualStack], optional): Can be a numpy array containing any numeric data, a virtual stack computed from other layers, or a path to a file. The opening plugin must support this. Defaults to None.
             memoryPersist (bool, optional): whether the data must be loaded into memory, at once, or can be loaded as required, from disk. Defaults to False.
             stack (bool): the file bust be interpreted as a stack (False), various files
                 are interpreted as a single stack (True)
+            name (str, optional): name of the layer. Defaults to "New Layer".
+            copy (bool, optional): if file is a numpy array, whether it is copied (True) or wrapped as a read-only view (False). Defaults to False.
+            layout (str, optional): if not in memory, chunk layout of the data on disk ("frame" or "pixel"), or a flat file (None). Defaults to the configuration if memoryPersist is None.
         """
         self.file = file
+        self.copy = copy
         self.name = name
         self._image = None
+        self._max = None
         self.frames = 0
         self.data = None
+        self.layout = layout
         if memoryPersist is None:
-            _persist = getGui().configuration.readConfiguration()[
-                "Performance/RAM_persistence"
-            ]
-            self.memoryPersist = _persist
+            _config = getGui().configuration.readConfiguration()
+            self.memoryPersist = _config["Performance/RAM_persistence"]
+            if layout is None and _config["Performance/Chunk_layout"] in LAYOUTS:
+                self.layout = _config["Performance/Chunk_layout"]
         else:
             self.memoryPersist = memoryPersist
-        self.max = 0
         self.opacity = 50
         self.brightness = 0
         self.contrast = 0
         self.colormap = "gray"
 
+    @property
+    def max(self):
+        """Maximum intensity of the image, from the cached statistics of the stack,
+        unless it has been set
+        """
+        if getattr(self, "_max", None) is not None:
+            return self._max
+        if self._image is None:
+            return 0
+        return self._image.stats.max
+
+    @max.setter
+    def max(self, value):
+        self._max = value
+
+    @property
+    def virtual(self):
+        """Whether the pixels are computed on demand from other layers
+        """
+        return self._image is not None and self._image.virtual
+
+    def materialize(self, progress=None):
+        """Computes and stores all the frames of a virtual layer, i.e., before a task
+        that needs the whole stack at once
+
+        Args:
+            progress (callable, optional): receives the percentage of frames computed. Defaults to None.
+        """
+        if self.virtual:
+            self._image.materialize(self.memoryPersist, progress)
+
+    def release(self):
+        """Gives back the disk resources of the image, once the layer is removed
+        """
+        if self._image is not None:
+            self._image.release()
+
     def image(self, index):
         """Returns the current frame for an image
 
@@ -53,10 +98,21 @@ class InputData:
         """
         return self._image[index]
 
-    def loadImage(self):
+    def loadImage(self, progress=None):
+        """Loads the file or array into a Stack
+
+        Args:
+            progress (callable, optional): receives the percentage of frames loaded, i.e., the progress reporter of the running task. Defaults to None.
+        """
         self._image = img.Stack(
-            self.file, dx=1, dz=1, units="nm", persistence=self.memoryPersist
+            self.file,
+            dx=1,
+            dz=1,
+            units="nm",
+            persistence=self.memoryPersist,
+            progress=progress,
+            copy=self.copy,
+            layout=self.layout,
         )
 
         self.frames = len(self._image)
-        self.max = self._image._imgs.max()
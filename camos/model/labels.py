@@ -0,0 +1,183 @@
+# -*- coding: utf-8 -*-
+# Created on Sun Oct 18 2026
+# Last modified on Sun Oct 18 2026
+# Copyright (c) CaMOS Development Team. All Rights Reserved.
+# Distributed under a MIT License. See LICENSE for more info.
+
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+# Maximum number of pixels of the frames read at once while aggregating
+CHUNK_PIXELS = 2 ** 24
+
+
+class LabelIndex:
+    """Index of the labels (i.e., cells or electrodes) of a mask, built in a single pass.
+    Pixels are grouped by label in CSR form: the flat indices of the pixels of the
+    k-th label are pixels[offsets[k]:offsets[k + 1]]. For every label, it also keeps
+    the area, centroid and bounding box, so per-label queries do not scan the mask.
+    """
+
+    def __init__(self, mask):
+        """Initialization of the object
+
+        Args:
+            mask (np.ndarray): 2D array of integer labels, with shape (height, width)
+        """
+        mask = np.asarray(mask)
+        self.shape = mask.shape[0:2]
+        self.dtype = mask.dtype
+        flat = mask.reshape(-1)
+
+        # A stable sort keeps the pixels of every label in raster order
+        self.pixels = np.argsort(flat, kind="stable")
+        _sorted = flat[self.pixels]
+        if len(_sorted) > 0:
+            starts = np.flatnonzero(np.r_[True, _sorted[1:] != _sorted[:-1]])
+        else:
+            starts = np.zeros(0, dtype=np.intp)
+        self.labels = _sorted[starts]
+        self.offsets = np.r_[starts, len(_sorted)].astype(np.intp)
+        self.areas = np.diff(self.offsets)
+
+        rows, cols = np.divmod(self.pixels, self.shape[1])
+        if len(starts) > 0:
+            self.centroids = np.stack(
+                [
+                    np.add.reduceat(rows, starts) / self.areas,
+                    np.add.reduceat(cols, starts) / self.areas,
+                ],
+                axis=1,
+            )
+            # Bounding boxes are [y0, x0, y1, x1], with y1 and x1 exclusive
+            self.bboxes = np.stack(
+                [
+                    np.minimum.reduceat(rows, starts),
+                    np.minimum.reduceat(cols, starts),
+                    np.maximum.reduceat(rows, starts) + 1,
+                    np.maximum.reduceat(cols, starts) + 1,
+                ],
+                axis=1,
+            )
+        else:
+            self.centroids = np.zeros((0, 2))
+            self.bboxes = np.zeros((0, 4), dtype=np.intp)
+
+    def __len__(self):
+        return len(self.labels)
+
+    def __contains__(self, label):
+        return self.position(label) is not None
+
+    def position(self, label):
+        """Position of a label in the sorted labels, or None if it is not in the mask
+        """
+        k = int(np.searchsorted(self.labels, label))
+        if k < len(self.labels) and self.labels[k] == label:
+            return k
+        return None
+
+    def _position(self, label):
+        k = self.position(label)
+        if k is None:
+            raise KeyError("Label {} is not in the mask".format(label))
+        return k
+
+    def flat(self, label):
+        """Flat indices of the pixels with a label, in raster order
+        """
+        k = self._position(label)
+        return self.pixels[self.offsets[k] : self.offsets[k + 1]]
+
+    def coords(self, label):
+        """Rows and columns of the pixels with a label
+
+        Returns:
+            tuple: rows and columns, as arrays
+        """
+        return np.divmod(self.flat(label), self.shape[1])
+
+    def area(self, label):
+        return int(self.areas[self._position(label)])
+
+    def centroid(self, label):
+        return self.centroids[self._position(label)]
+
+    def bbox(self, label):
+        """Bounding box of a label, as [y0, x0, y1, x1] with y1 and x1 exclusive
+        """
+        return self.bboxes[self._position(label)]
+
+    def select(self, labels):
+        """Creates a mask keeping only the given labels; the rest of pixels are 0
+
+        Args:
+            labels (list): labels to keep; those not in the mask are ignored
+
+        Returns:
+            np.ndarray: the mask, with the shape and type of the indexed mask
+        """
+        out = np.zeros(self.shape, dtype=self.dtype)
+        labels = np.unique(np.asarray(labels).ravel())
+        k = np.searchsorted(self.labels, labels)
+        k = k[k < len(self.labels)]
+        k = k[np.isin(self.labels[k], labels)]
+        if len(k) > 0:
+            idx = np.concatenate(
+                [self.pixels[self.offsets[j] : self.offsets[j + 1]] for j in k]
+            )
+            out.reshape(-1)[idx] = np.repeat(self.labels[k], self.areas[k])
+        return out
+
+    def aggregate(self, data, mean=True, dtype=np.float32, workers=1, progress=None):
+        """Sums (or averages) the pixels of every label, in every frame of a stack.
+        The stack is read once, in consecutive chunks of frames; for each chunk, the
+        pixels are gathered by label and reduced for all labels at once.
+
+        Args:
+            data (array-like): stack with shape (frames, height, width[, channels]), the frames matching the mask
+            mean (bool, optional): whether to divide the sums by the areas. Defaults to True.
+            dtype (np.dtype, optional): type of the accumulation and of the result. Defaults to np.float32.
+            workers (int, optional): number of threads reducing chunks in parallel. Defaults to 1.
+            progress (callable, optional): receives the percentage of frames processed. Defaults to None.
+
+        Returns:
+            np.ndarray: values with shape (labels, frames[, channels]), in the order of self.labels
+        """
+        n = len(data)
+        rest = tuple(data.shape[3:])
+        out = np.zeros((len(self), n) + rest, dtype=dtype)
+        if len(self) == 0 or n == 0:
+            return out
+
+        frame = int(np.prod(data.shape[1:], dtype=np.int64))
+        step = max(1, CHUNK_PIXELS // max(1, frame))
+        starts = list(range(0, n, step))
+        # Areas are broadcast over the frames (and channels) of every chunk
+        areas = self.areas.reshape((-1, 1) + (1,) * len(rest)).astype(dtype)
+
+        def reduce(t0):
+            t1 = min(n, t0 + step)
+            chunk = np.asarray(data[t0:t1]).reshape((t1 - t0, -1) + rest)
+            sums = np.add.reduceat(
+                chunk[:, self.pixels], self.offsets[:-1], axis=1, dtype=dtype
+            )
+            out[:, t0:t1] = np.moveaxis(sums, 1, 0)
+            if mean:
+                out[:, t0:t1] /= areas
+            return t1 - t0
+
+        done = 0
+        if workers > 1 and len(starts) > 1:
+            with ThreadPoolExecutor(max_workers=workers) as pool:
+                for count in pool.map(reduce, starts):
+                    done += count
+                    if progress is not None:
+                        progress(int(done * 100 / n))
+        else:
+            for t0 in starts:
+                done += reduce(t0)
+                if progress is not None:
+                    progress(int(done * 100 / n))
+        return out
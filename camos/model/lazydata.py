@@ -0,0 +1,199 @@
+# -*- coding: utf-8 -*-
+# Created on Sun Oct 18 2026
+# Last modified on Sun Oct 18 2026
+# Copyright (c) CaMOS Development Team. All Rights Reserved.
+# Distributed under a MIT License. See LICENSE for more info.
+
+import copy
+import os
+import threading
+import uuid
+from collections import OrderedDict
+
+import numpy as np
+
+from camos.model.filepool import get_pool
+
+# Memory used by the slices of all the lazy datasets kept in memory
+CACHE_BYTES = 2 ** 28
+
+
+class SliceCache:
+    """Least recently used slices of the lazy datasets, within a budget of bytes shared
+    by all of them. Slices larger than a quarter of the budget are not kept.
+    """
+
+    def __init__(self, budget=CACHE_BYTES):
+        self.budget = budget
+        self.nbytes = 0
+        self._slices = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            value = self._slices.get(key)
+            if value is not None:
+                self._slices.move_to_end(key)
+            return value
+
+    def put(self, key, value):
+        if value.nbytes > self.budget // 4:
+            return
+        with self._lock:
+            if key in self._slices:
+                return
+            self._slices[key] = value
+            self.nbytes += value.nbytes
+            while self.nbytes > self.budget:
+                _, old = self._slices.popitem(last=False)
+                self.nbytes -= old.nbytes
+
+    def discard(self, uid):
+        """Forgets the slices of a dataset
+        """
+        with self._lock:
+            for key in [k for k in self._slices if k[0] == uid]:
+                self.nbytes -= self._slices.pop(key).nbytes
+
+
+_cache = SliceCache()
+
+
+def get_cache():
+    return _cache
+
+
+def _cache_key(key):
+    """Hashable form of an index made of integers, slices and field names,
+    or None for other indices (i.e., arrays), which are not cached
+    """
+    if not isinstance(key, tuple):
+        key = (key,)
+    out = []
+    for k in key:
+        if isinstance(k, (int, np.integer)):
+            out.append(int(k))
+        elif isinstance(k, slice):
+            out.append(("slice", k.start, k.stop, k.step))
+        elif isinstance(k, str) or k is Ellipsis:
+            out.append(k)
+        else:
+            return None
+    return tuple(out)
+
+
+class LazyDataset:
+    """Array-like view of a dataset stored on disk: a dataset of an HDF5 file, opened
+    through the shared file pool, or an array such as a np.memmap. Nothing is read until
+    it is indexed; recently read slices are kept in a cache with a fixed budget of memory
+    shared by all datasets (see SliceCache), and returned as copies.
+
+    It behaves as a numpy array: it can be indexed (with integers, slices, arrays and
+    field names, i.e., data[:]["CellID"]), and converted with np.asarray (which reads everything).
+    """
+
+    def __init__(self, source, name=None):
+        """Initialization of the object
+
+        Args:
+            source (str or array-like): route to an HDF5 file, or an array read lazily (e.g., np.memmap)
+            name (str, optional): name of the dataset in the HDF5 file. Defaults to None.
+        """
+        if isinstance(source, str):
+            if name is None:
+                raise ValueError("The name of the dataset in the file is required")
+            self.path = os.path.abspath(source)
+            self.name = name
+            self._array = None
+            # The file stays open in the pool until the dataset is released
+            get_pool().acquire(self.path)
+        else:
+            self.path = None
+            self.name = name
+            self._array = source
+        self.uid = uuid.uuid4().hex
+        self._released = False
+        source = self._source
+        self.dtype = source.dtype
+        self.shape = tuple(source.shape)
+
+    @property
+    def _source(self):
+        if self._array is not None:
+            return self._array
+        return get_pool().open(self.path)[self.name]
+
+    @property
+    def ndim(self):
+        return len(self.shape)
+
+    @property
+    def size(self):
+        return int(np.prod(self.shape))
+
+    @property
+    def nbytes(self):
+        return self.size * self.dtype.itemsize
+
+    def __len__(self):
+        return self.shape[0]
+
+    def __array__(self, dtype=None, copy=None):
+        out = np.array(self._source[()])
+        return out if dtype is None else out.astype(dtype)
+
+    def __getitem__(self, key):
+        # The cache keeps its own copy, so callers can modify the slices they get
+        cache_key = _cache_key(key)
+        if cache_key is not None:
+            out = _cache.get((self.uid, cache_key))
+            if out is not None:
+                return out.copy()
+        out = self._read(key)
+        if cache_key is not None and isinstance(out, np.ndarray):
+            _cache.put((self.uid, cache_key), out.copy())
+        return out
+
+    def _read(self, key):
+        if isinstance(key, str):
+            # A column of a structured dataset
+            return np.asarray(self._source[key])
+        first = key[0] if isinstance(key, tuple) and len(key) > 0 else key
+        if isinstance(first, (list, np.ndarray)):
+            # HDF5 only reads increasing, unique indices along the first axis; the
+            # rows are read once, and then arranged in memory
+            index = np.asarray(first)
+            if index.dtype == bool:
+                index = np.flatnonzero(index.reshape(len(index), -1)[:, 0])
+            index = np.where(index < 0, index + len(self), index)
+            rows, inverse = np.unique(index, return_inverse=True)
+            if len(rows) == 0:
+                out = np.zeros((0,) + self.shape[1:], dtype=self.dtype)
+            else:
+                out = np.asarray(self._source[rows])[inverse.reshape(-1)]
+            rest = key[1:] if isinstance(key, tuple) else ()
+            return out[(slice(None),) + tuple(rest)] if len(rest) > 0 else out
+        return np.asarray(self._source[key])
+
+    def __deepcopy__(self, memo):
+        """Copies of datasets of HDF5 files read the same file, with their own slices
+        in the cache; the others copy their array
+        """
+        if self.path is not None:
+            return LazyDataset(self.path, self.name)
+        return LazyDataset(copy.deepcopy(self._array, memo), self.name)
+
+    def __reduce__(self):
+        # Datasets of HDF5 files are pickled by reference, the others with their values
+        if self.path is not None:
+            return (LazyDataset, (self.path, self.name))
+        return (np.array, (np.asarray(self),))
+
+    def release(self):
+        """Forgets the cached slices of the dataset, and gives back its file to the
+        pool, once it is removed
+        """
+        _cache.discard(self.uid)
+        if self.path is not None and not self._released:
+            self._released = True
+            get_pool().release(self.path)
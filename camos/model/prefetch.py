@@ -0,0 +1,174 @@
+# -*- coding: utf-8 -*-
+# Created on Sun Oct 18 2026
+# Last modified on Sun Oct 18 2026
+# Copyright (c) CaMOS Development Team. All Rights Reserved.
+# Distributed under a MIT License. See LICENSE for more info.
+
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+# Number of upcoming frames read ahead, and memory for the frames of each stack
+LOOKAHEAD = 8
+RING_BYTES = 2 ** 28
+RING_FRAMES = 64
+
+
+class FrameRing:
+    """Bounded cache of the decoded frames of a stack, with the motion of the playback
+    """
+
+    def __init__(self, data, ring_bytes=RING_BYTES):
+        self.data = data
+        frame = max(1, data.nbytes // max(1, len(data)))
+        self.capacity = int(max(2, min(RING_FRAMES, ring_bytes // frame)))
+        self.frames = OrderedDict()
+        self.wanted = None
+        self.direction = 1
+        self.step = 1
+
+    def get(self, i):
+        if i in self.frames:
+            self.frames.move_to_end(i)
+            return self.frames[i]
+        return None
+
+    def put(self, i, frame):
+        self.frames[i] = frame
+        self.frames.move_to_end(i)
+        while len(self.frames) > self.capacity:
+            oldest = next(iter(self.frames))
+            if oldest == self.wanted:
+                self.frames.move_to_end(oldest)
+                oldest = next(iter(self.frames))
+            del self.frames[oldest]
+
+    def track(self, i):
+        """Updates the direction and speed (frames per step) of the playback
+        """
+        if self.wanted is not None and i != self.wanted:
+            delta = i - self.wanted
+            self.direction = 1 if delta > 0 else -1
+            self.step = abs(delta)
+        self.wanted = i
+
+    def upcoming(self, lookahead):
+        """Frames expected next, following the playback
+        """
+        frames = []
+        for k in range(1, lookahead + 1):
+            j = self.wanted + self.direction * self.step * k
+            if not 0 <= j < len(self.data):
+                break
+            frames.append(j)
+        return frames
+
+
+class FramePrefetcher:
+    """Reads the frames of disk (or computed) stacks in worker threads, ahead of the
+    playback. Each layer has a FrameRing for its stack, replaced (and its frames dropped)
+    when the stack of the layer changes, i.e., once cropped; frames requested while scrubbing are
+    returned only if already decoded, so the caller never waits for the disk. Requests
+    that are no longer wanted are dropped, so intermediate frames are skipped.
+    """
+
+    def __init__(self, callback=None, workers=2, lookahead=LOOKAHEAD, ring_bytes=RING_BYTES):
+        """Initialization of the object
+
+        Args:
+            callback (callable, optional): called as callback(data, i), from a worker thread, once the wanted frame i of data is decoded. Defaults to None.
+            workers (int, optional): number of reading threads. Defaults to 2.
+            lookahead (int, optional): number of upcoming frames read ahead. Defaults to LOOKAHEAD.
+            ring_bytes (int, optional): memory for the frames of each stack. Defaults to RING_BYTES.
+        """
+        self.callback = callback
+        self.lookahead = lookahead
+        self.ring_bytes = ring_bytes
+        self._rings = {}
+        self._pending = []
+        self._inflight = set()
+        self._cond = threading.Condition()
+        self._threads = []
+        for _ in range(workers):
+            thread = threading.Thread(target=self._work)
+            thread.daemon = True
+            thread.start()
+            self._threads.append(thread)
+
+    def _ring(self, data, owner):
+        key = id(owner)
+        if key not in self._rings or self._rings[key].data is not data:
+            self._rings[key] = FrameRing(data, self.ring_bytes)
+        return self._rings[key]
+
+    def show(self, data, i, owner=None):
+        """Requests frame i of a stack, to be displayed now
+
+        Args:
+            data (array-like): the stack
+            i (int): index of the frame
+            owner (object, optional): the layer the stack belongs to (i.e., its Stack). Defaults to data.
+
+        Returns:
+            np.ndarray: the frame if it is already decoded, otherwise None; then, the
+                callback is called once it is, unless another frame is wanted meanwhile
+        """
+        with self._cond:
+            ring = self._ring(data, data if owner is None else owner)
+            ring.track(i)
+            frame = ring.get(i)
+
+            # The wanted frame goes first, then the upcoming ones; older requests are dropped
+            frames = ([] if frame is not None else [i]) + ring.upcoming(self.lookahead)
+            frames = [
+                j
+                for j in frames
+                if j not in ring.frames and (id(data), j) not in self._inflight
+            ]
+            self._pending = [(ring, j) for j in frames] + [
+                (r, j) for r, j in self._pending if r is not ring
+            ]
+            self._cond.notify_all()
+        return frame
+
+    def discard(self, owner):
+        """Drops the frames of a layer, i.e., when its stack is no longer read ahead
+        """
+        with self._cond:
+            ring = self._rings.pop(id(owner), None)
+            self._pending = [(r, j) for r, j in self._pending if r is not ring]
+
+    def retain(self, owners):
+        """Drops the frames of the layers that are not in owners, i.e., removed layers
+        """
+        keys = [id(o) for o in owners]
+        with self._cond:
+            for key in list(self._rings):
+                if key not in keys:
+                    del self._rings[key]
+            rings = list(self._rings.values())
+            self._pending = [(r, j) for r, j in self._pending if r in rings]
+
+    def _work(self):
+        while True:
+            with self._cond:
+                while len(self._pending) == 0:
+                    self._cond.wait()
+                ring, j = self._pending.pop(0)
+                key = (id(ring.data), j)
+                self._inflight.add(key)
+
+            try:
+                frame = np.array(ring.data[j])
+            except Exception:
+                frame = None
+
+            with self._cond:
+                self._inflight.discard(key)
+                if frame is None:
+                    continue
+                ring.put(j, frame)
+                wanted = j == ring.wanted
+            if wanted and self.callback is not None:
+                self.callback(ring.data, j)
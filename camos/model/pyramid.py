@@ -0,0 +1,364 @@
+# -*- coding: utf-8 -*-
+# Created on Sun Oct 18 2026
+# Last modified on Sun Oct 18 2026
+# Copyright (c) CaMOS Development Team. All Rights Reserved.
+# Distributed under a MIT License. See LICENSE for more info.
+
+import hashlib
+import os
+import shutil
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+from camos.model.scratch import get_scratch
+
+# Side of the square tiles, in pixels, and number of tiles kept in memory
+TILE = 512
+CACHE_TILES = 64
+
+# Maximum number of pixels read at once while building a level
+BLOCK_PIXELS = 2 ** 24
+
+
+# Maximum number of bytes of the levels kept in the disk cache across sessions;
+# the scratch space quota applies instead, if it is lower
+CACHE_BYTES = 2 ** 32
+
+
+def cache_dir():
+    """Location of the on-disk pyramid cache, next to the session folders of the
+    scratch space, so it follows the configured scratch location
+    """
+    return os.path.join(get_scratch().root, "pyramids")
+
+
+def _folder_size(path):
+    size = 0
+    for name in os.listdir(path):
+        try:
+            size += os.path.getsize(os.path.join(path, name))
+        except OSError:
+            pass
+    return size
+
+
+def trim_cache(keep=None, limit=None):
+    """Removes the least recently used pyramids from the disk cache, until their size
+    fits the limit. The pyramid in use (keep) is never removed.
+
+    Args:
+        keep (str, optional): key of the pyramid to keep. Defaults to None.
+        limit (int, optional): maximum number of bytes. Defaults to CACHE_BYTES, or the scratch quota if lower.
+
+    Returns:
+        int: number of pyramids removed
+    """
+    if limit is None:
+        quota = get_scratch().quota
+        limit = min(CACHE_BYTES, quota) if quota else CACHE_BYTES
+    root = cache_dir()
+    if not os.path.isdir(root):
+        return 0
+    folders = []
+    for name in os.listdir(root):
+        path = os.path.join(root, name)
+        if os.path.isdir(path):
+            folders.append((os.path.getmtime(path), name, _folder_size(path)))
+    total = sum(f[2] for f in folders)
+    removed = 0
+    for _, name, size in sorted(folders):
+        if total <= limit:
+            break
+        if name == keep:
+            continue
+        # Levels still mapped by another session cannot be removed on Windows
+        shutil.rmtree(os.path.join(root, name), ignore_errors=True)
+        total -= size
+        removed += 1
+    return removed
+
+
+def pyramid_key(source, frame=0):
+    """Creates a key identifying the pyramid of a frame of a file, so the levels
+    can be reused across sessions. Layers that do not come from a file have no key.
+
+    Args:
+        source (str, np.ndarray): the file (or array) the layer was loaded from
+        frame (int, optional): index of the frame in the stack. Defaults to 0.
+
+    Returns:
+        str: hexadecimal key, or None if the source is not a file
+    """
+    if not (isinstance(source, str) and os.path.isfile(source)):
+        return None
+    st = os.stat(source)
+    _id = "{}|{}|{}|{}".format(
+        os.path.abspath(source), st.st_mtime_ns, st.st_size, frame
+    )
+    return hashlib.sha1(_id.encode()).hexdigest()
+
+
+def downsample(src, dst, block_pixels=BLOCK_PIXELS):
+    """Averages 2x2 blocks of src into dst, reading a band of rows at a time.
+    The last row and column of src are dropped if its shape is odd.
+
+    Args:
+        src (np.ndarray): source image, with shape (height, width[, channels])
+        dst (np.ndarray): destination image, with shape (height // 2, width // 2[, channels])
+        block_pixels (int, optional): maximum number of source pixels read at once.
+    """
+    h, w = dst.shape[0:2]
+    rows = max(1, block_pixels // max(1, 4 * w))
+    for r in range(0, h, rows):
+        n = min(rows, h - r)
+        band = np.asarray(src[2 * r : 2 * (r + n), 0 : 2 * w], dtype=np.float32)
+        band = band.reshape((n, 2, w, 2) + band.shape[2:]).mean(axis=(1, 3))
+        if np.issubdtype(dst.dtype, np.integer):
+            band = np.rint(band)
+        dst[r : r + n] = band.astype(dst.dtype)
+
+
+class ImagePyramid:
+    """Multi-resolution representation of a large image.
+    Level 0 is the original image; each other level halves the previous one, until
+    it fits in a single tile. Levels are built once, in a background thread, and
+    stored on disk; only the tiles being displayed are read into memory. Levels of
+    images loaded from a file are kept in a disk cache, by key, and reused across
+    sessions (the least recently used are removed above CACHE_BYTES, see trim_cache);
+    the others are files of the scratch space, removed once the pyramid is released.
+    """
+
+    def __init__(self, image, key=None, tile=TILE, cache_tiles=CACHE_TILES):
+        """Initialization of the object
+
+        Args:
+            image (np.ndarray): the full resolution image, with shape (height, width[, channels]); can be a np.memmap
+            key (str, optional): identifies the image in the disk cache, see pyramid_key. Defaults to None.
+            tile (int, optional): side of the tiles in pixels. Defaults to TILE.
+            cache_tiles (int, optional): number of tiles kept in memory. Defaults to CACHE_TILES.
+        """
+        self.levels = [image]
+        self.shape = tuple(image.shape[0:2])
+        self.dtype = image.dtype
+        self.tile = tile
+        self.cache_tiles = cache_tiles
+        self.key = key
+        self.ready = False
+        self._tiles = OrderedDict()
+        self._lock = threading.Lock()
+        self._thread = None
+        self._scratch = ()
+        self._released = False
+
+        # Shapes of all the levels, computed before anything is built
+        self.shapes = [self.shape]
+        h, w = self.shape
+        while max(h, w) > tile and min(h, w) > 1:
+            h, w = h // 2, w // 2
+            self.shapes.append((h, w))
+
+        self.path = None if key is None else os.path.join(cache_dir(), key)
+        self._load_cached()
+
+    @property
+    def n_levels(self):
+        return len(self.shapes)
+
+    def _level_file(self, level):
+        return os.path.join(self.path, "level_{}.npy".format(level))
+
+    def _load_cached(self):
+        if self.path is None:
+            return
+        files = [self._level_file(k) for k in range(1, self.n_levels)]
+        if not all(os.path.isfile(f) for f in files):
+            return
+        try:
+            levels = [np.load(f, mmap_mode="r") for f in files]
+        except (ValueError, OSError):
+            return
+        if [l.shape[0:2] for l in levels] != self.shapes[1:]:
+            return
+        try:
+            # The modification time of the folder orders the cache by last use
+            os.utime(self.path)
+        except OSError:
+            pass
+        self.levels += levels
+        self.ready = True
+
+    def _acquire(self, levels):
+        scratch = get_scratch()
+        for level in levels:
+            self._scratch += scratch.acquire(level)
+
+    def release(self):
+        """Stops using the levels, once the pyramid is no longer displayed. Files of the
+        scratch space are given back (when the building thread stops, if it is running);
+        the disk cache keeps the levels of files.
+        """
+        with self._lock:
+            self._released = True
+            self._tiles.clear()
+            if self._thread is not None and self._thread.is_alive():
+                return
+            paths, self._scratch = self._scratch, ()
+        del self.levels[1:]
+        self.ready = False
+        get_scratch().release(paths)
+
+    def build(self, callback=None, background=True):
+        """Builds the missing levels of the pyramid
+
+        Args:
+            callback (callable, optional): called without arguments once all levels are available. Defaults to None.
+            background (bool, optional): whether to build in a separate thread. Defaults to True.
+        """
+        if self.ready:
+            if callback is not None:
+                callback()
+            return
+
+        if not background:
+            self._build(callback)
+            return
+
+        self._thread = threading.Thread(target=self._build, args=(callback,))
+        self._thread.daemon = True
+        self._thread.start()
+
+    def _new_level_file(self, k, shape):
+        """Route of the file of a new level, and of the file it is written into first
+        """
+        if self.path is None:
+            nbytes = int(np.prod(shape)) * self.dtype.itemsize
+            path = get_scratch().new_file(nbytes, suffix=".npy")
+            return path, path
+        os.makedirs(self.path, exist_ok=True)
+        final = self._level_file(k)
+        # Levels are complete once renamed, even if another pyramid of the same
+        # file is being built at the same time
+        partial = "{}.{}.{}.part".format(final, os.getpid(), threading.get_ident())
+        return final, partial
+
+    def _build(self, callback=None):
+        for k in range(len(self.levels), self.n_levels):
+            if self._released:
+                break
+            shape = self.shapes[k] + self.levels[0].shape[2:]
+            try:
+                final, partial = self._new_level_file(k, shape)
+            except MemoryError:
+                # The quota is full; the missing levels are read with a stride
+                break
+            dst = np.lib.format.open_memmap(
+                partial, mode="w+", dtype=self.dtype, shape=shape
+            )
+            downsample(self.levels[k - 1], dst)
+            dst.flush()
+            del dst
+            if partial != final:
+                os.replace(partial, final)
+            level = np.load(final, mmap_mode="r")
+            if self.path is None:
+                self._acquire([level])
+            self.levels.append(level)
+
+        with self._lock:
+            released = self._released
+            self._thread = None
+        if released:
+            self.release()
+            return
+
+        self.ready = len(self.levels) == self.n_levels
+        if self.ready and self.path is not None:
+            trim_cache(keep=self.key)
+        if callback is not None:
+            callback()
+
+    def level_for(self, factor):
+        """Selects the level to be displayed
+
+        Args:
+            factor (float): number of image pixels per screen pixel
+
+        Returns:
+            int: the coarsest level that still has at least one pixel per screen pixel
+        """
+        if factor <= 1:
+            return 0
+        return int(min(self.n_levels - 1, np.floor(np.log2(factor))))
+
+    def overview(self):
+        """Returns a small version of the image, fitting in one tile. While the pyramid
+        is being built, it is read from the original image with a stride.
+        """
+        if self.ready:
+            return np.asarray(self.levels[-1])
+        step = int(np.ceil(max(self.shape) / self.tile))
+        return np.array(self.levels[0][::step, ::step])
+
+    def tile_range(self, level, y0, y1, x0, x1):
+        """Converts a region of the full resolution image into the range of tiles
+        covering it, at the given level
+
+        Returns:
+            tuple: (ty0, ty1, tx0, tx1), with the end indices excluded
+        """
+        f = 2 ** level
+        h, w = self.shapes[level]
+        t = self.tile
+        ty0, tx0 = max(0, int(y0 // (f * t))), max(0, int(x0 // (f * t)))
+        ty1 = min(-(-h // t), int(-(-y1 // (f * t))))
+        tx1 = min(-(-w // t), int(-(-x1 // (f * t))))
+        return ty0, ty1, tx0, tx1
+
+    def region(self, level, ty0, ty1, tx0, tx1):
+        """Assembles a range of tiles of a level into a single image
+
+        Returns:
+            np.ndarray: the image, whose pixel (0, 0) is the corner of tile (ty0, tx0)
+        """
+        t = self.tile
+        h, w = self.shapes[level]
+        out = np.empty(
+            (min(h, ty1 * t) - ty0 * t, min(w, tx1 * t) - tx0 * t)
+            + self.levels[0].shape[2:],
+            dtype=self.dtype,
+        )
+        for ty in range(ty0, ty1):
+            for tx in range(tx0, tx1):
+                tile = self._tile(level, ty, tx)
+                y, x = (ty - ty0) * t, (tx - tx0) * t
+                out[y : y + tile.shape[0], x : x + tile.shape[1]] = tile
+        return out
+
+    def _tile(self, level, ty, tx):
+        key = (level, ty, tx)
+        with self._lock:
+            if key in self._tiles:
+                self._tiles.move_to_end(key)
+                return self._tiles[key]
+
+        t = self.tile
+        h, w = self.shapes[level]
+        ys = slice(ty * t, min(h, (ty + 1) * t))
+        xs = slice(tx * t, min(w, (tx + 1) * t))
+        if level < len(self.levels):
+            tile = np.array(self.levels[level][ys, xs])
+        else:
+            # The level is not built yet, it is read with a stride from the original
+            f = 2 ** level
+            tile = np.array(
+                self.levels[0][ys.start * f : ys.stop * f : f, xs.start * f : xs.stop * f : f]
+            )
+            return tile
+
+        with self._lock:
+            self._tiles[key] = tile
+            while len(self._tiles) > self.cache_tiles:
+                self._tiles.popitem(last=False)
+        return tile
@@ -0,0 +1,320 @@
+# -*- coding: utf-8 -*-
+# Created on Sun Oct 18 2026
+# Last modified on Sun Oct 18 2026
+# Copyright (c) CaMOS Development Team. All Rights Reserved.
+# Distributed under a MIT License. See LICENSE for more info.
+
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import weakref
+from collections import OrderedDict
+
+import numpy as np
+
+SESSION_PREFIX = "session-"
+
+
+def default_root():
+    """Default location of the scratch space
+    """
+    return os.path.join(tempfile.gettempdir(), "camos", "scratch")
+
+
+def _alive_windows(pid):
+    """Whether a process with the given pid is running, on Windows, where os.kill
+    would terminate it. Processes that cannot be queried are considered alive.
+    """
+    import ctypes
+
+    PROCESS_QUERY_LIMITED_INFORMATION = 0x1000
+    ERROR_INVALID_PARAMETER = 87
+    STILL_ACTIVE = 259
+
+    kernel32 = ctypes.WinDLL("kernel32", use_last_error=True)
+    handle = kernel32.OpenProcess(PROCESS_QUERY_LIMITED_INFORMATION, False, pid)
+    if not handle:
+        # Only a pid that does not exist is reported as an invalid parameter
+        return ctypes.get_last_error() != ERROR_INVALID_PARAMETER
+    try:
+        code = ctypes.c_ulong()
+        if not kernel32.GetExitCodeProcess(handle, ctypes.byref(code)):
+            return True
+        return code.value == STILL_ACTIVE
+    finally:
+        kernel32.CloseHandle(handle)
+
+
+def _alive(pid):
+    """Whether a process with the given pid is running
+    """
+    if sys.platform.startswith("win"):
+        return _alive_windows(pid)
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+class ScratchSpace:
+    """Manages the temporary files backing the stacks that are not kept in RAM.
+    Each session writes into its own folder inside the scratch location. Files are
+    reference counted by the stacks using them: once released by all of them, they
+    are kept for reuse by an allocation of the same size (only after every memory map
+    of the file is gone, so stale arrays are never overwritten), and removed when the
+    quota requires it or when the session ends. Folders left by crashed sessions are removed
+    when the scratch space is created.
+    """
+
+    def __init__(self, root=None, quota=0):
+        """Initialization of the object
+
+        Args:
+            root (str, optional): folder where the session folders are created. Defaults to default_root().
+            quota (int, optional): maximum number of bytes in use by the session, 0 for no limit. Defaults to 0.
+        """
+        self.root = root or default_root()
+        self.quota = quota
+        self.path = os.path.join(self.root, "{}{}".format(SESSION_PREFIX, os.getpid()))
+        self._lock = threading.Lock()
+        self._sizes = {}
+        self._refs = {}
+        self._free = OrderedDict()
+        self._maps = {}
+        self._handles = {}
+        self._count = 0
+        self.reclaim()
+
+    @property
+    def used(self):
+        """Number of bytes in files of this session, including the released ones
+        """
+        return sum(self._sizes.values())
+
+    def reclaim(self):
+        """Removes the folders of sessions whose process is no longer running
+
+        Returns:
+            int: number of folders removed
+        """
+        if not os.path.isdir(self.root):
+            return 0
+        removed = 0
+        for name in os.listdir(self.root):
+            if not name.startswith(SESSION_PREFIX):
+                continue
+            try:
+                pid = int(name[len(SESSION_PREFIX) :])
+            except ValueError:
+                continue
+            if pid == os.getpid() or _alive(pid):
+                continue
+            shutil.rmtree(os.path.join(self.root, name), ignore_errors=True)
+            removed += 1
+        return removed
+
+    def allocate(self, shape, dtype):
+        """Creates a writable memory map, reusing a released file of the same size if any.
+        As with np.empty, the contents are undefined.
+
+        Args:
+            shape (tuple): shape of the array
+            dtype (np.dtype): type of the elements
+
+        Returns:
+            np.memmap: the array, backed by a file of the scratch space
+        """
+        dtype = np.dtype(dtype)
+        nbytes = int(np.prod(shape)) * dtype.itemsize
+        with self._lock:
+            path = self._reuse(nbytes)
+            if path is None:
+                self._make_room(nbytes)
+                os.makedirs(self.path, exist_ok=True)
+                self._count += 1
+                path = os.path.join(self.path, "{}.dat".format(self._count))
+                mode = "w+"
+            else:
+                mode = "r+"
+            self._sizes[path] = nbytes
+            self._refs[path] = 0
+            arr = np.memmap(path, dtype=dtype, mode=mode, shape=shape)
+            # Views of the array keep it alive, so the file is in use while it is
+            self._maps[path] = weakref.ref(arr)
+        return arr
+
+    def new_file(self, nbytes, suffix=".h5"):
+        """Reserves the route of a new file, written by the caller (i.e., an HDF5 file).
+        Unlike memory maps, these files are removed as soon as they are released.
+
+        Args:
+            nbytes (int): expected size of the file, counted against the quota
+            suffix (str, optional): extension of the file. Defaults to ".h5".
+
+        Returns:
+            str: route to the file
+        """
+        with self._lock:
+            self._make_room(nbytes)
+            os.makedirs(self.path, exist_ok=True)
+            self._count += 1
+            path = os.path.join(self.path, "{}{}".format(self._count, suffix))
+            self._sizes[path] = nbytes
+            self._refs[path] = 0
+        return path
+
+    def attach(self, path, handle):
+        """Registers an open handle of a file of the scratch space (i.e., a ChunkedStack),
+        which is closed before the file is removed, as open files cannot be removed on Windows
+
+        Args:
+            path (str): route to the file, as returned by new_file
+            handle (object): the handle, with a close method; it is referenced weakly
+        """
+        with self._lock:
+            if path in self._sizes:
+                self._handles.setdefault(path, []).append(weakref.ref(handle))
+
+    def _close_handles(self, path):
+        for ref in self._handles.pop(path, []):
+            handle = ref()
+            if handle is not None:
+                handle.close()
+
+    def _reuse(self, nbytes):
+        for path, size in self._free.items():
+            if size == nbytes and not self._mapped(path):
+                del self._free[path]
+                return path
+        return None
+
+    def _mapped(self, path):
+        """Whether a memory map of the file (or a view of it) is still alive
+        """
+        ref = self._maps.get(path)
+        return ref is not None and ref() is not None
+
+    def _make_room(self, nbytes):
+        """Removes released files, oldest first, until nbytes fit in the quota
+        """
+        if not self.quota:
+            return
+        while self._free and self.used + nbytes > self.quota:
+            path, _ = self._free.popitem(last=False)
+            self._remove(path)
+        if self.used + nbytes > self.quota:
+            raise MemoryError(
+                "The scratch space quota ({} bytes) does not allow {} more bytes".format(
+                    self.quota, nbytes
+                )
+            )
+
+    def _remove(self, path):
+        self._sizes.pop(path, None)
+        self._refs.pop(path, None)
+        self._maps.pop(path, None)
+        self._close_handles(path)
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+    def owners(self, arr):
+        """Finds the files of the scratch space an array maps, either directly, as a view
+        of another array, or through the sources of a virtual stack
+
+        Returns:
+            tuple: the routes to the files, empty if the array is not in the scratch space
+        """
+        found = []
+        pending = [arr]
+        while len(pending) > 0:
+            arr = pending.pop()
+            while arr is not None:
+                pending += getattr(arr, "sources", [])
+                filename = getattr(arr, "filename", None)
+                if filename is not None:
+                    filename = os.path.abspath(filename)
+                    if filename in self._sizes and filename not in found:
+                        found.append(filename)
+                    break
+                arr = getattr(arr, "base", None)
+        return tuple(found)
+
+    def acquire(self, arr):
+        """Registers a new user of the files backing an array
+
+        Returns:
+            tuple: the routes to the files, to be passed to release
+        """
+        paths = self.owners(arr)
+        with self._lock:
+            for path in paths:
+                self._refs[path] += 1
+                # A released file that is used again cannot be reused
+                self._free.pop(path, None)
+        return paths
+
+    def release(self, paths):
+        """Unregisters a user of some files; once a file has none, it can be reused or removed
+
+        Args:
+            paths (tuple): routes returned by acquire, or None
+        """
+        for path in paths or ():
+            with self._lock:
+                if path not in self._refs:
+                    continue
+                self._refs[path] -= 1
+                if self._refs[path] > 0:
+                    continue
+                if not path.endswith(".dat") or (self.quota and self.used > self.quota):
+                    self._remove(path)
+                else:
+                    self._free[path] = self._sizes[path]
+
+    def cleanup(self):
+        """Removes all the files of this session
+        """
+        with self._lock:
+            self._sizes.clear()
+            self._refs.clear()
+            self._free.clear()
+            self._maps.clear()
+            for path in list(self._handles):
+                self._close_handles(path)
+            shutil.rmtree(self.path, ignore_errors=True)
+
+
+_scratch = None
+
+
+def get_scratch():
+    """Returns the scratch space of the session, creating it with the defaults if needed
+    """
+    global _scratch
+    if _scratch is None:
+        _scratch = ScratchSpace()
+    return _scratch
+
+
+def configure(root=None, quota=0):
+    """Sets the location and quota of the scratch space. The location can only
+    change while no files are in use; otherwise, it applies to the next session.
+
+    Args:
+        root (str, optional): folder for the scratch files. Defaults to default_root().
+        quota (int, optional): maximum number of bytes, 0 for no limit. Defaults to 0.
+    """
+    global _scratch
+    root = root or default_root()
+    if _scratch is None or (_scratch.root != root and not _scratch._sizes):
+        _scratch = ScratchSpace(root, quota)
+    else:
+        _scratch.quota = quota
+    return _scratch
@@ -1,6 +1,6 @@
 # -*- coding: utf-8 -*-
 # Created on Sat Jun 05 2021
-# Last modified on Thu Jul 15 2021
+# Last modified on Sun Oct 18 2026
 # Copyright (c) CaMOS Development Team. All Rights Reserved.
 # Distributed under a MIT License. See LICENSE for more info.
 
@@ -15,6 +15,7 @@ import copy
 
 import camos.utils.apptools as apptools
 import camos.utils.pluginmanager as PluginManager
+from camos.model.events import EventIndex
 from camos.viewport.signalviewer2 import SignalViewer2
 
 MAXNAMELEN = 300
@@ -34,6 +35,15 @@ def choose_plotter(data):
         raise NotImplementedError
 
 
+def index_events(data):
+    """Index of a dataset by cell, for structured data with a CellID column
+    """
+    names = getattr(data, "dtype", np.dtype(float)).names
+    if names is None or "CellID" not in names:
+        return None
+    return EventIndex(data)
+
+
 class SignalViewModel(QObject):
     newdata = pyqtSignal()
 
@@ -46,6 +56,7 @@ class SignalViewModel(QObject):
         self.masks = []
         self.viewers = []
         self.properties = []
+        self.events = [index_events(d) for d in self.data]
 
     @pyqtSlot()
     def add_data(
@@ -60,6 +71,7 @@ class SignalViewModel(QObject):
         properties={},
     ):
         self.data.append(data)
+        self.events.append(index_events(data))
         if name in self.names or name == "":
             name = "New_{}_{}".format(name, len(self.names))
 
@@ -84,9 +96,12 @@ class SignalViewModel(QObject):
                 title=self.names[-1],
                 mask=self.masks[-1],
                 plotter=plotter,
+                events=self.events[-1],
             )
             _class.plotter.colname = colname
             _class.display()
+        elif isinstance(_class, SignalViewer2) and _class.events is None:
+            _class.events = self.events[-1]
 
         self.add_viewer(_class, self.names[-1])
 
@@ -106,12 +121,15 @@ class SignalViewModel(QObject):
             index (int): position of the data track in the self.data list
         """
         assert index != None
-        self.data.pop(index)
+        data = self.data.pop(index)
+        if hasattr(data, "release"):
+            data.release()
         self.names.pop(index)
         self.sampling.pop(index)
         self.masks.pop(index)
         self.viewers.pop(index)
         self.properties.pop(index)
+        self.events.pop(index)
 
     def add_viewer(self, _class, name):
         if _class != None:
@@ -122,10 +140,23 @@ class SignalViewModel(QObject):
         else:
             self.viewers.append([])
 
+    def get_events(self, index):
+        """Index of the rows of a dataset by cell (see EventIndex), built when the data was added
+
+        Args:
+            index (int): position of the data track in the self.data list
+
+        Returns:
+            EventIndex: the index of the dataset
+        """
+        if self.events[index] is None:
+            raise ValueError("The dataset does not have a CellID column")
+        return self.events[index]
+
     def filter_data(self, index, IDs):
         assert "CellID" in self.data[index].dtype.names
 
-        _filtered_idx = np.isin(self.data[index][:]["CellID"], IDs)
+        _filtered_idx = self.get_events(index).select(IDs)
         _filtered = self.data[index][_filtered_idx]
 
         self.add_data(
@@ -133,7 +164,8 @@ class SignalViewModel(QObject):
         )
 
     def duplicate_data(self, index=0):
-        """Duplicates the current data
+        """Duplicates the current data. Copies of datasets read from disk (see LazyDataset)
+        read the same file
 
         Args:
             index (int, optional): index of the data to duplicate, according to self.data. Defaults to 0.
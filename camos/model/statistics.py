@@ -0,0 +1,247 @@
+# -*- coding: utf-8 -*-
+# Created on Sun Oct 18 2026
+# Last modified on Sun Oct 18 2026
+# Copyright (c) CaMOS Development Team. All Rights Reserved.
+# Distributed under a MIT License. See LICENSE for more info.
+
+import threading
+
+import numpy as np
+
+# Number of bins of the cached histogram
+HIST_BINS = 512
+
+# Frames, and pixels per frame, read for the quick estimate
+SAMPLE_FRAMES = 8
+SAMPLE_PIXELS = 2 ** 16
+
+# Maximum number of pixels read at once while refining
+CHUNK_PIXELS = 2 ** 22
+
+
+class LayerStatistics:
+    """Intensity statistics (minimum, maximum, histogram and percentiles) of a stack.
+    They are computed lazily: the first request returns an estimate from a strided
+    sample of a few frames, and starts a background pass over the whole stack, in
+    chunks, that refines the values. Results are cached until invalidate is called.
+    """
+
+    def __init__(self, data=None):
+        """Initialization of the object
+
+        Args:
+            data (np.ndarray, optional): array-like with shape (frames, height, width[, channels]). Defaults to None.
+        """
+        self._lock = threading.RLock()
+        self._listeners = []
+        self.set_data(data)
+
+    def set_data(self, data):
+        """Replaces the data, discarding the cached statistics
+        """
+        with self._lock:
+            self._data = data
+            self._generation = getattr(self, "_generation", 0) + 1
+            self._thread = None
+            self._min = None
+            self._max = None
+            self._edges = None
+            self._counts = None
+            self.exact = False
+
+    def invalidate(self):
+        """Discards the cached statistics, i.e., after the data has been modified in place
+        """
+        self.set_data(self._data)
+
+    def on_ready(self, callback):
+        """Registers a callable, called without arguments (possibly from another thread)
+        each time the exact statistics become available
+        """
+        self._listeners.append(callback)
+        if self.exact:
+            callback()
+
+    @property
+    def min(self):
+        self._ensure()
+        return self._min
+
+    @property
+    def max(self):
+        self._ensure()
+        return self._max
+
+    def histogram(self):
+        """Returns the histogram of the whole stack
+
+        Returns:
+            tuple: left edges of the bins, and number of pixels in each bin
+        """
+        self._ensure()
+        return self._edges[:-1], self._counts
+
+    def percentile(self, q):
+        """Percentile of the intensities, interpolated from the histogram
+
+        Args:
+            q (float): percentile, between 0 and 100
+
+        Returns:
+            float: intensity under which q percent of the pixels fall
+        """
+        self._ensure()
+        if q <= 0:
+            return self._min
+        if q >= 100:
+            return self._max
+
+        cdf = np.cumsum(self._counts)
+        target = q / 100 * cdf[-1]
+        i = int(np.searchsorted(cdf, target))
+        before = cdf[i - 1] if i > 0 else 0
+        frac = (target - before) / max(1, self._counts[i])
+        value = self._edges[i] + frac * (self._edges[i + 1] - self._edges[i])
+        return float(np.clip(value, self._min, self._max))
+
+    def levels(self, lower=0, upper=100):
+        """Display levels of the stack, as the given percentiles
+
+        Returns:
+            list: [lower level, upper level]
+        """
+        lo, hi = float(self.percentile(lower)), float(self.percentile(upper))
+        if hi <= lo:
+            hi = lo + 1
+        return [lo, hi]
+
+    def _ensure(self):
+        with self._lock:
+            if self._data is None:
+                raise ValueError("There is no data to compute the statistics of")
+            if self._min is None:
+                self._estimate()
+            if not self.exact and self._thread is None:
+                self.refine()
+
+    def _estimate(self):
+        """Quick statistics from a strided sample of a few frames
+        """
+        n = len(self._data)
+        frames = np.unique(np.linspace(0, n - 1, min(n, SAMPLE_FRAMES)).astype(int))
+        h, w = self._data.shape[1:3]
+        step = max(1, int(np.ceil(np.sqrt(h * w / SAMPLE_PIXELS))))
+        sample = np.concatenate(
+            [np.asarray(self._data[int(i), ::step, ::step]).ravel() for i in frames]
+        )
+        sample = sample[np.isfinite(sample)] if sample.dtype.kind == "f" else sample
+        if sample.size == 0:
+            # i.e., the sampled frames are all NaN
+            self._set(0, 0, sample)
+        else:
+            self._set(sample.min(), sample.max(), sample)
+
+    def _set(self, vmin, vmax, sample=None, counts=None):
+        if vmax <= vmin:
+            vmax = vmin + 1
+        edges = self._bin_edges(vmin, vmax)
+        if counts is None:
+            counts, _ = np.histogram(sample, bins=edges)
+        self._min, self._max = vmin, vmax
+        self._edges, self._counts = edges, counts
+
+    def _bin_edges(self, vmin, vmax):
+        if vmax <= vmin:
+            vmax = vmin + 1
+        if self._data.dtype.kind in "ui":
+            # Integer bins, so no bin falls between two consecutive values
+            width = max(1, int(np.ceil((int(vmax) - int(vmin) + 1) / HIST_BINS)))
+            return np.arange(int(vmin), int(vmax) + width + 1, width, dtype=np.float64)
+        return np.linspace(float(vmin), float(vmax), HIST_BINS + 1)
+
+    def refine(self, background=True):
+        """Computes the exact minimum and maximum, and the histogram of the whole stack,
+        reading it in chunks. The histogram is first computed over the range of the
+        estimate; if the exact range differs, it is computed again over the exact range.
+
+        Args:
+            background (bool, optional): whether to run in a separate thread. Defaults to True.
+        """
+        with self._lock:
+            if self._min is None:
+                self._estimate()
+            generation = self._generation
+            if not background:
+                self._thread = threading.current_thread()
+            else:
+                self._thread = threading.Thread(target=self._refine, args=(generation,))
+                self._thread.daemon = True
+                self._thread.start()
+                return
+        self._refine(generation)
+
+    def _refine(self, generation):
+        edges = self._edges
+        counts, vmin, vmax = self._histogram(edges, generation)
+        if counts is None or vmin is None:
+            return
+
+        exact_edges = self._bin_edges(vmin, vmax)
+        if not np.array_equal(exact_edges, edges):
+            edges = exact_edges
+            counts, _, _ = self._histogram(edges, generation)
+            if counts is None:
+                return
+
+        with self._lock:
+            if generation != self._generation:
+                return
+            self._min, self._max = vmin, vmax
+            self._edges, self._counts = edges, counts
+            self.exact = True
+
+        for callback in list(self._listeners):
+            callback()
+
+    def _histogram(self, edges, generation):
+        """Histogram, minimum and maximum of the whole stack, read in chunks; values
+        outside of the edges are counted in the first or last bin
+
+        Returns:
+            tuple: counts (None if the data changed meanwhile), minimum and maximum
+        """
+        data = self._data
+        counts = np.zeros(len(edges) - 1, dtype=np.int64)
+        vmin, vmax = None, None
+
+        h, w = data.shape[1:3]
+        rows = max(1, CHUNK_PIXELS // max(1, w))
+        for i in range(len(data)):
+            for r in range(0, h, rows):
+                if generation != self._generation:
+                    return None, None, None
+                chunk = np.asarray(data[i, r : r + rows])
+                if chunk.dtype.kind == "f":
+                    chunk = chunk[np.isfinite(chunk)]
+                if chunk.size == 0:
+                    continue
+                cmin, cmax = chunk.min(), chunk.max()
+                vmin = cmin if vmin is None else min(vmin, cmin)
+                vmax = cmax if vmax is None else max(vmax, cmax)
+                c, _ = np.histogram(np.clip(chunk, edges[0], edges[-1]), bins=edges)
+                counts += c
+        return counts, vmin, vmax
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        for key in ["_lock", "_thread", "_listeners"]:
+            del state[key]
+        return state
+
+    def __setstate__(self, d):
+        self.__dict__ = d
+        self._lock = threading.RLock()
+        self._thread = None
+        self._listeners = []
+        if not self.exact:
+            self._min = None
@@ -0,0 +1,154 @@
+# -*- coding: utf-8 -*-
+# Created on Sun Oct 18 2026
+# Last modified on Sun Oct 18 2026
+# Copyright (c) CaMOS Development Team. All Rights Reserved.
+# Distributed under a MIT License. See LICENSE for more info.
+
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+from PIL import Image
+import numpy as np
+
+from camos.model.scratch import get_scratch
+
+# Side of the (square) box the thumbnails fit in, and number kept in memory
+THUMB_SIZE = 128
+CACHE_THUMBS = 256
+
+
+def cache_dir():
+    """Location of the on-disk thumbnail cache: a folder of the session in the scratch
+    space, so the thumbnails are removed with it (see ScratchSpace.cleanup and reclaim)
+    """
+    return os.path.join(get_scratch().path, "thumbnails")
+
+
+def thumbnail(data, levels, size=THUMB_SIZE):
+    """Creates the thumbnail of the first frame of a stack. The frame is read with a
+    stride, so only about size x size pixels are read, and rescaled with the levels.
+
+    Args:
+        data (array-like): the stack, with shape (frames, height, width[, channels])
+        levels (list): intensities displayed as black and white
+        size (int, optional): side of the box the thumbnail fits in. Defaults to THUMB_SIZE.
+
+    Returns:
+        np.ndarray: RGB thumbnail, as uint8 with shape (height, width, 3)
+    """
+    h, w = data.shape[1:3]
+    step = max(1, int(np.ceil(max(h, w) / size)))
+    frame = np.asarray(data[0, ::step, ::step], dtype=np.float32)
+    lo, hi = levels
+    frame = np.clip((frame - lo) * (255 / max(hi - lo, 1e-12)), 0, 255)
+    im = Image.fromarray(frame.astype(np.uint8)).convert("RGB")
+
+    # The aspect ratio is kept; the longest side is scaled to size
+    scale = size / max(im.size)
+    im = im.resize(
+        (max(1, round(im.size[0] * scale)), max(1, round(im.size[1] * scale))),
+        Image.BILINEAR,
+    )
+    return np.array(im)
+
+
+class ThumbnailCache:
+    """Generates the thumbnails of layers in a worker thread, and keeps them in memory and
+    on disk, for the length of the session. They are identified by the uid of the stack,
+    which is kept when it is duplicated, and by the levels.
+    """
+
+    def __init__(self, folder=None, workers=1, size=THUMB_SIZE):
+        """Initialization of the object
+
+        Args:
+            folder (str, optional): location of the on-disk cache. Defaults to cache_dir(), at the time of use.
+            workers (int, optional): number of threads generating thumbnails. Defaults to 1.
+            size (int, optional): side of the box the thumbnails fit in. Defaults to THUMB_SIZE.
+        """
+        self._folder = folder
+        self.size = size
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+        self._pool = ThreadPoolExecutor(max_workers=workers)
+
+    @property
+    def folder(self):
+        # The scratch space can be configured after the cache is created
+        return self._folder or cache_dir()
+
+    def key(self, stack, levels):
+        _id = "{}|{:.6g}|{:.6g}|{}".format(stack.uid, levels[0], levels[1], self.size)
+        return hashlib.sha1(_id.encode()).hexdigest()
+
+    def _path(self, key):
+        return os.path.join(self.folder, "{}.png".format(key))
+
+    def get(self, stack, levels=None):
+        """Returns the thumbnail of a stack, generating it if it is not cached
+
+        Args:
+            stack (Stack): the stack
+            levels (list, optional): black and white intensities. Defaults to stack.stats.levels().
+
+        Returns:
+            np.ndarray: RGB thumbnail, as uint8 with shape (height, width, 3)
+        """
+        if levels is None:
+            levels = stack.stats.levels()
+        key = self.key(stack, levels)
+        with self._lock:
+            if key in self._memory:
+                self._memory.move_to_end(key)
+                return self._memory[key]
+
+        path = self._path(key)
+        try:
+            with Image.open(path) as im:
+                thumb = np.array(im.convert("RGB"))
+        except (OSError, ValueError):
+            thumb = thumbnail(stack._imgs, levels, self.size)
+            try:
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                Image.fromarray(thumb).save(path)
+            except OSError:
+                pass
+
+        with self._lock:
+            self._memory[key] = thumb
+            while len(self._memory) > CACHE_THUMBS:
+                self._memory.popitem(last=False)
+        return thumb
+
+    def request(self, stack, callback, levels=None):
+        """Gets the thumbnail of a stack in a worker thread
+
+        Args:
+            stack (Stack): the stack
+            callback (callable): called, from the worker thread, with the thumbnail
+            levels (list, optional): black and white intensities. Defaults to stack.stats.levels().
+        """
+
+        def job():
+            try:
+                thumb = self.get(stack, levels)
+            except Exception:
+                return
+            callback(thumb)
+
+        self._pool.submit(job)
+
+
+_thumbnails = None
+
+
+def get_thumbnails():
+    """Returns the thumbnail cache of the session, creating it if needed
+    """
+    global _thumbnails
+    if _thumbnails is None:
+        _thumbnails = ThumbnailCache()
+    return _thumbnails
@@ -0,0 +1,482 @@
+# -*- coding: utf-8 -*-
+# Created on Sun Oct 18 2026
+# Last modified on Sun Oct 18 2026
+# Copyright (c) CaMOS Development Team. All Rights Reserved.
+# Distributed under a MIT License. See LICENSE for more info.
+
+import mmap
+import struct
+import threading
+from collections import OrderedDict
+
+from PIL import Image
+import numpy as np
+
+# Number of decoded frames kept in memory by default
+CACHE_FRAMES = 8
+
+# TIFF field types, as (struct code, size in bytes)
+_TYPES = {
+    1: ("B", 1),
+    2: ("c", 1),
+    3: ("H", 2),
+    4: ("I", 4),
+    5: ("II", 8),
+    6: ("b", 1),
+    7: ("B", 1),
+    8: ("h", 2),
+    9: ("i", 4),
+    10: ("ii", 8),
+    11: ("f", 4),
+    12: ("d", 8),
+    13: ("I", 4),
+    16: ("Q", 8),
+    17: ("q", 8),
+    18: ("Q", 8),
+}
+
+# Tags required to describe the layout of a page
+_TAGS = {
+    256: "width",
+    257: "height",
+    258: "bits",
+    259: "compression",
+    262: "photometric",
+    273: "offsets",
+    277: "samples",
+    278: "rowsperstrip",
+    279: "bytecounts",
+    284: "planar",
+    322: "tilewidth",
+    323: "tilelength",
+    324: "tileoffsets",
+    325: "tilebytecounts",
+    339: "sampleformat",
+}
+
+_SAMPLEFORMAT = {1: "u", 2: "i", 3: "f"}
+
+
+class TiffPage:
+    """Layout of a single page (IFD) of a TIFF file, as read from its tags.
+    """
+
+    def __init__(self, tags, byteorder):
+        self.width = int(tags["width"][0])
+        self.height = int(tags["height"][0])
+        self.samples = int(tags.get("samples", [1])[0])
+        self.bits = int(tags.get("bits", [1])[0])
+        self.compression = int(tags.get("compression", [1])[0])
+        self.photometric = int(tags.get("photometric", [1])[0])
+        self.planar = int(tags.get("planar", [1])[0])
+        _format = _SAMPLEFORMAT.get(int(tags.get("sampleformat", [1])[0]), None)
+
+        self.tiled = "tileoffsets" in tags
+        if self.tiled:
+            self.offsets = tags["tileoffsets"]
+            self.bytecounts = tags["tilebytecounts"]
+            self.tilewidth = int(tags["tilewidth"][0])
+            self.tilelength = int(tags["tilelength"][0])
+        else:
+            self.offsets = tags.get("offsets", [])
+            self.bytecounts = tags.get("bytecounts", [])
+            self.rowsperstrip = int(tags.get("rowsperstrip", [self.height])[0])
+
+        self.dtype = None
+        if _format is not None and self.bits in (8, 16, 32, 64):
+            self.dtype = np.dtype("{}{}{}".format(byteorder, _format, self.bits // 8))
+
+    @property
+    def shape(self):
+        if self.samples == 1:
+            return (self.height, self.width)
+        return (self.height, self.width, self.samples)
+
+    @property
+    def nbytes(self):
+        return self.height * self.width * self.samples * self.dtype.itemsize
+
+    @property
+    def mappable(self):
+        """Whether the pixel data can be read directly from the file.
+        Anything PIL would transform on decode (compression, bit packing,
+        inverted photometry, planar separation) is decoded through PIL instead.
+        """
+        return (
+            self.dtype is not None
+            and self.compression == 1
+            and self.photometric in (1, 2, 3)
+            and (self.planar == 1 or self.samples == 1)
+            and (self.samples == 1 or self.bits == 8)
+            and len(self.offsets) > 0
+        )
+
+    @property
+    def contiguous(self):
+        """Whether all the strips of the page follow each other in the file
+        """
+        if self.tiled:
+            return False
+        offsets = np.asarray(self.offsets, dtype=np.int64)
+        counts = np.asarray(self.bytecounts, dtype=np.int64)
+        if len(offsets) > 1 and np.any(offsets[1:] != offsets[:-1] + counts[:-1]):
+            return False
+        return counts.sum() >= self.nbytes
+
+
+def read_pages(path):
+    """Scans the chain of IFDs of a TIFF file, without decoding any pixel data.
+
+    Args:
+        path (str): route to the TIFF file
+
+    Returns:
+        tuple: byte order ("<" or ">") and list of TiffPage objects, or None if
+            the file is not a TIFF file
+    """
+    with open(path, "rb") as f:
+        try:
+            mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            return None
+
+    try:
+        if mm[0:2] == b"II":
+            bo = "<"
+        elif mm[0:2] == b"MM":
+            bo = ">"
+        else:
+            return None
+
+        (magic,) = struct.unpack_from(bo + "H", mm, 2)
+        if magic == 42:
+            big = False
+            (ifd,) = struct.unpack_from(bo + "I", mm, 4)
+        elif magic == 43:
+            big = True
+            (ifd,) = struct.unpack_from(bo + "Q", mm, 8)
+        else:
+            return None
+
+        # Layout of the IFD entries, for classic and BigTIFF files
+        n_fmt, n_sz, e_fmt, e_sz, v_sz, o_fmt = (
+            ("Q", 8, "HHQ", 20, 8, "Q") if big else ("H", 2, "HHI", 12, 4, "I")
+        )
+
+        pages = []
+        visited = set()
+        while ifd != 0 and ifd not in visited and ifd < len(mm):
+            visited.add(ifd)
+            (n,) = struct.unpack_from(bo + n_fmt, mm, ifd)
+            tags = {}
+            for e in range(n):
+                pos = ifd + n_sz + e * e_sz
+                tag, typ, count = struct.unpack_from(bo + e_fmt, mm, pos)
+                if tag not in _TAGS or typ not in _TYPES:
+                    continue
+                code, size = _TYPES[typ]
+                pos += e_sz - v_sz
+                if count * size > v_sz:
+                    (pos,) = struct.unpack_from(bo + o_fmt, mm, pos)
+                if len(code) == 1:
+                    values = np.frombuffer(
+                        mm, dtype=bo + code, count=count, offset=pos
+                    ).astype(np.int64)
+                else:
+                    values = np.frombuffer(
+                        mm, dtype=bo + code[0], count=2 * count, offset=pos
+                    )
+                    values = values[0::2] / values[1::2]
+                tags[_TAGS[tag]] = values
+            pages.append(TiffPage(tags, bo))
+            (ifd,) = struct.unpack_from(bo + o_fmt, mm, ifd + n_sz + n * e_sz)
+    finally:
+        mm.close()
+
+    return bo, pages
+
+
+class LazyTiffStack:
+    """Read-only, array-like view of a multipage TIFF file.
+    The IFDs are scanned once when the object is created; uncompressed pages are
+    memory-mapped from the file, and compressed pages are only decoded (through PIL)
+    when they are indexed. Decoded frames are kept in a bounded LRU cache.
+
+    It behaves as a numpy array of shape (frames, height, width[, channels]):
+    it can be indexed, iterated, and converted with np.asarray (which reads all pages).
+    """
+
+    def __init__(self, path, pages=None, cache_size=CACHE_FRAMES):
+        """Initialization of the object
+
+        Args:
+            path (str): route to the TIFF file
+            pages (tuple, optional): result of read_pages, if the file was already scanned. Defaults to None.
+            cache_size (int, optional): maximum number of decoded frames to keep in memory. Defaults to CACHE_FRAMES.
+        """
+        if pages is None:
+            pages = read_pages(path)
+        if pages is None or len(pages[1]) == 0:
+            raise ValueError("The file is not a valid TIFF file")
+
+        self.path = path
+        self.byteorder, self._pages = pages
+        self.cache_size = cache_size
+
+        first = self._pages[0]
+        if any(
+            (p.shape != first.shape) or (p.dtype != first.dtype) for p in self._pages
+        ):
+            raise ValueError("All the pages in the TIFF file must share shape and type")
+
+        self._frame_shape = first.shape
+        self.dtype = first.dtype
+        self._open()
+
+        # PIL is used to get the dtype of the pages that cannot be mapped
+        if self.dtype is None:
+            self.dtype = self._decode(0).dtype
+
+    def _open(self):
+        self._lock = threading.RLock()
+        self._cache = OrderedDict()
+        self._pil = None
+        with open(self.path, "rb") as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self._strided = self._map_strided()
+
+    def _map_strided(self):
+        """If every page is stored uncompressed, contiguous and at a constant
+        stride in the file, the whole stack is mapped as a single array.
+        """
+        if not all(p.mappable and p.contiguous for p in self._pages):
+            return None
+
+        starts = np.array([p.offsets[0] for p in self._pages], dtype=np.int64)
+        steps = np.diff(starts)
+        if len(steps) > 0 and (np.any(steps != steps[0]) or steps[0] <= 0):
+            return None
+        step = int(steps[0]) if len(steps) > 0 else self._pages[0].nbytes
+
+        itemsize = self.dtype.itemsize
+        frame_strides = tuple(
+            int(s) * itemsize
+            for s in np.cumprod((1,) + self._frame_shape[:0:-1])[::-1]
+        )
+        try:
+            return np.ndarray(
+                shape=(len(self._pages),) + self._frame_shape,
+                dtype=self.dtype,
+                buffer=self._mm,
+                offset=int(starts[0]),
+                strides=(step,) + frame_strides,
+            )
+        except TypeError:
+            # The file is truncated, pages are read one by one
+            return None
+
+    @property
+    def info(self):
+        """Metadata of the first page, as PIL reports it
+        """
+        with Image.open(self.path) as im:
+            return dict(im.info)
+
+    @property
+    def shape(self):
+        return (len(self._pages),) + self._frame_shape
+
+    @property
+    def ndim(self):
+        return len(self.shape)
+
+    @property
+    def size(self):
+        return int(np.prod(self.shape))
+
+    @property
+    def nbytes(self):
+        return self.size * self.dtype.itemsize
+
+    def __len__(self):
+        return len(self._pages)
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self.frame(i)
+
+    def __array__(self, dtype=None, copy=None):
+        if self._strided is not None:
+            out = self._strided
+        else:
+            out = np.empty(self.shape, dtype=self.dtype)
+            for i in range(len(self)):
+                out[i] = self.frame(i)
+        return out if dtype is None else out.astype(dtype)
+
+    def __getitem__(self, key):
+        if self._strided is not None:
+            return self._strided[key]
+
+        if not isinstance(key, tuple):
+            key = (key,)
+        index, rest = key[0], key[1:]
+
+        if isinstance(index, (int, np.integer)):
+            frame = self.frame(index)
+            return frame[rest] if len(rest) > 0 else frame
+
+        if index is Ellipsis:
+            index, rest = slice(None), key
+        indices = np.atleast_1d(np.arange(len(self))[index])
+        out = None
+        for j, i in enumerate(indices):
+            frame = self.frame(int(i))
+            frame = frame[rest] if len(rest) > 0 else frame
+            if out is None:
+                out = np.empty((len(indices),) + frame.shape, dtype=frame.dtype)
+            out[j] = frame
+        if out is None:
+            out = np.empty((0,) + self._frame_shape, dtype=self.dtype)
+        return out
+
+    def frame(self, i):
+        """Returns a single page, either mapped from the file or decoded
+
+        Args:
+            i (int): index of the page; negative values count from the end
+
+        Returns:
+            np.ndarray: the page, with shape (height, width[, channels])
+        """
+        if i < 0:
+            i += len(self)
+        if not 0 <= i < len(self):
+            raise IndexError("Frame index {} is out of range".format(i))
+
+        if self._strided is not None:
+            return self._strided[i]
+
+        page = self._pages[i]
+        if page.mappable and page.contiguous:
+            return np.ndarray(
+                page.shape, dtype=page.dtype, buffer=self._mm, offset=int(page.offsets[0])
+            )
+
+        with self._lock:
+            if i in self._cache:
+                self._cache.move_to_end(i)
+                return self._cache[i]
+
+            if page.mappable:
+                frame = self._assemble(page)
+            else:
+                frame = self._decode(i)
+            frame.flags.writeable = False
+
+            self._cache[i] = frame
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+        return frame
+
+    def _assemble(self, page):
+        """Reads an uncompressed page whose strips or tiles are not contiguous
+        """
+        out = np.empty(page.shape, dtype=page.dtype)
+        rowsize = page.width * page.samples
+
+        if not page.tiled:
+            row = 0
+            for offset in page.offsets:
+                rows = min(page.rowsperstrip, page.height - row)
+                strip = np.frombuffer(
+                    self._mm, dtype=page.dtype, count=rows * rowsize, offset=int(offset)
+                )
+                out[row : row + rows] = strip.reshape((rows,) + page.shape[1:])
+                row += rows
+            return out
+
+        th, tw = page.tilelength, page.tilewidth
+        tiles_x = -(-page.width // tw)
+        tile_shape = (th, tw) + page.shape[2:]
+        for t, offset in enumerate(page.offsets):
+            y, x = (t // tiles_x) * th, (t % tiles_x) * tw
+            tile = np.frombuffer(
+                self._mm,
+                dtype=page.dtype,
+                count=int(np.prod(tile_shape)),
+                offset=int(offset),
+            ).reshape(tile_shape)
+            h, w = min(th, page.height - y), min(tw, page.width - x)
+            out[y : y + h, x : x + w] = tile[:h, :w]
+        return out
+
+    def _decode(self, i):
+        with self._lock:
+            if self._pil is None:
+                self._pil = Image.open(self.path)
+            self._pil.seek(i)
+            return np.array(self._pil)
+
+    def max(self, axis=None, out=None, keepdims=False, **kwargs):
+        return self._reduce(np.maximum, "max", axis, out, keepdims, **kwargs)
+
+    def min(self, axis=None, out=None, keepdims=False, **kwargs):
+        return self._reduce(np.minimum, "min", axis, out, keepdims, **kwargs)
+
+    def _reduce(self, ufunc, name, axis, out, keepdims, **kwargs):
+        """Reductions over all pixels, or along the frames, are computed page by page,
+        so only one page is held in memory at a time.
+        """
+        if axis not in (None, 0) or out is not None or keepdims or kwargs:
+            return getattr(np.asarray(self), name)(
+                axis=axis, out=out, keepdims=keepdims, **kwargs
+            )
+
+        acc = None
+        for frame in self:
+            value = frame if axis == 0 else getattr(frame, name)()
+            acc = np.array(value) if acc is None else ufunc(acc, value)
+        return acc
+
+    def close(self):
+        self._strided = None
+        self._cache.clear()
+        if self._pil is not None:
+            self._pil.close()
+            self._pil = None
+        try:
+            self._mm.close()
+        except BufferError:
+            # Views of the file are still alive; they keep the map open
+            pass
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        for key in ["_lock", "_cache", "_pil", "_mm", "_strided"]:
+            del state[key]
+        return state
+
+    def __setstate__(self, d):
+        self.__dict__ = d
+        self._open()
+
+
+def open_tiff(path, cache_size=CACHE_FRAMES):
+    """Opens a file as a LazyTiffStack, if its pages can be indexed lazily
+
+    Args:
+        path (str): route to the file
+        cache_size (int, optional): maximum number of decoded frames to keep in memory. Defaults to CACHE_FRAMES.
+
+    Returns:
+        LazyTiffStack: the lazy stack, or None if the file is not a TIFF, or its pages
+            do not share the same shape and type
+    """
+    try:
+        pages = read_pages(path)
+        if pages is None:
+            return None
+        return LazyTiffStack(path, pages, cache_size=cache_size)
+    except (ValueError, struct.error, OSError, KeyError, IndexError):
+        return None
@@ -0,0 +1,302 @@
+# -*- coding: utf-8 -*-
+# Created on Sun Oct 18 2026
+# Last modified on Sun Oct 18 2026
+# Copyright (c) CaMOS Development Team. All Rights Reserved.
+# Distributed under a MIT License. See LICENSE for more info.
+
+import numpy as np
+
+
+def _bounds(index, n):
+    """Converts an index along a spatial axis into a slice with a positive step.
+    Returns the slice, whether the result has to be flipped, and whether the axis is dropped.
+    """
+    if isinstance(index, (int, np.integer)):
+        i = int(index) + (n if index < 0 else 0)
+        if not 0 <= i < n:
+            raise IndexError("index {} is out of bounds for axis with size {}".format(index, n))
+        return slice(i, i + 1, 1), False, True
+    start, stop, step = index.indices(n)
+    if step > 0:
+        return slice(start, max(start, stop), step), False, False
+    indices = range(start, stop, step)
+    if len(indices) == 0:
+        return slice(0, 0, 1), False, False
+    return slice(indices[-1], indices[0] + 1, -step), True, False
+
+
+def _mirror(s, n):
+    """Slice selecting, in increasing order, the mirrored (n - 1 - i) positions of a positive slice
+    """
+    indices = range(n)[s]
+    if len(indices) == 0:
+        return slice(0, 0, 1)
+    return slice(n - 1 - indices[-1], n - indices[0], s.step)
+
+
+class VirtualStack:
+    """Layer whose pixels are computed from other stacks, when they are requested.
+    It records its sources and the operation; indexing a frame, or a region of a frame,
+    only reads the matching region of the sources, so no full copy is made.
+
+    It behaves as a read-only numpy array of shape (frames, height, width[, channels]):
+    it can be indexed, iterated, and converted with np.asarray (which computes all frames).
+    Subclasses implement region.
+    """
+
+    operation = "virtual"
+
+    def __init__(self, sources, shape, dtype):
+        """Initialization of the object
+
+        Args:
+            sources (list): the source stacks, array-like of shape (frames, height, width[, channels])
+            shape (tuple): shape of the resulting stack
+            dtype (np.dtype): type of the resulting pixels
+        """
+        self.sources = list(sources)
+        self.shape = tuple(shape)
+        self.dtype = np.dtype(dtype)
+
+    @property
+    def ndim(self):
+        return len(self.shape)
+
+    @property
+    def size(self):
+        return int(np.prod(self.shape))
+
+    @property
+    def nbytes(self):
+        return self.size * self.dtype.itemsize
+
+    def __len__(self):
+        return self.shape[0]
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self.frame(i)
+
+    def __array__(self, dtype=None, copy=None):
+        out = np.empty(self.shape, dtype=self.dtype)
+        for i in range(len(self)):
+            out[i] = self.frame(i)
+        return out if dtype is None else out.astype(dtype)
+
+    def source_frame(self, source, i):
+        """Frame of a source matching frame i, when sources have different number of frames
+        """
+        return int(i / (len(self) / len(source)))
+
+    def region(self, i, ys, xs):
+        """Computes a region of a frame
+
+        Args:
+            i (int): index of the frame
+            ys (slice): rows, with a positive step
+            xs (slice): columns, with a positive step
+
+        Returns:
+            np.ndarray: the pixels, with shape (rows, columns[, channels])
+        """
+        raise NotImplementedError
+
+    def frame(self, i):
+        return self[i]
+
+    def view(self, i):
+        """Returns frame i as a lazy VirtualFrame, i.e., to display a large frame by tiles
+        """
+        return VirtualFrame(self, i)
+
+    def __getitem__(self, key):
+        if not isinstance(key, tuple):
+            key = (key,)
+        if any(k is Ellipsis for k in key) or not all(
+            isinstance(k, (int, np.integer, slice)) for k in key[0:3]
+        ):
+            # Fancy indexing is done on the computed stack
+            return np.asarray(self)[key]
+
+        key = key + (slice(None),) * (3 - len(key))
+        index, rest = key[0], key[3:]
+        (ys, flip_y, drop_y), (xs, flip_x, drop_x) = [
+            _bounds(k, n) for k, n in zip(key[1:3], self.shape[1:3])
+        ]
+
+        def compute(i):
+            out = self.region(i, ys, xs)
+            if flip_y:
+                out = out[::-1]
+            if flip_x:
+                out = out[:, ::-1]
+            out = out[(0 if drop_y else slice(None), 0 if drop_x else slice(None)) + rest]
+            return out
+
+        if isinstance(index, (int, np.integer)):
+            i = int(index) + (len(self) if index < 0 else 0)
+            if not 0 <= i < len(self):
+                raise IndexError("index {} is out of bounds for axis 0".format(index))
+            return compute(i)
+
+        indices = range(len(self))[index]
+        frames = [compute(i) for i in indices]
+        if len(frames) == 0:
+            return np.empty((0,) + compute(0).shape, dtype=self.dtype)
+        return np.stack(frames)
+
+    def max(self, axis=None, out=None, keepdims=False, **kwargs):
+        return self._reduce(np.maximum, "max", axis, out, keepdims, **kwargs)
+
+    def min(self, axis=None, out=None, keepdims=False, **kwargs):
+        return self._reduce(np.minimum, "min", axis, out, keepdims, **kwargs)
+
+    def _reduce(self, ufunc, name, axis, out, keepdims, **kwargs):
+        """Reductions over all pixels, or along the frames, are computed frame by frame
+        """
+        if axis not in (None, 0) or out is not None or keepdims or kwargs:
+            return getattr(np.asarray(self), name)(
+                axis=axis, out=out, keepdims=keepdims, **kwargs
+            )
+
+        acc = None
+        for frame in self:
+            value = frame if axis == 0 else getattr(frame, name)()
+            acc = np.array(value) if acc is None else ufunc(acc, value)
+        return acc
+
+    def __repr__(self):
+        return "<{} of shape {} from {} source(s)>".format(
+            self.operation, self.shape, len(self.sources)
+        )
+
+
+class VirtualFrame:
+    """Lazy 2D view of a frame of a VirtualStack; slicing it only computes the region
+    """
+
+    def __init__(self, stack, index):
+        self.stack = stack
+        self.index = index
+        self.shape = stack.shape[1:]
+        self.dtype = stack.dtype
+        self.key = (id(stack), index)
+
+    @property
+    def ndim(self):
+        return len(self.shape)
+
+    def __getitem__(self, key):
+        if not isinstance(key, tuple):
+            key = (key,)
+        return self.stack[(self.index,) + key]
+
+    def __array__(self, dtype=None, copy=None):
+        out = self.stack[self.index]
+        return out if dtype is None else out.astype(dtype)
+
+
+class CropStack(VirtualStack):
+    """Rectangular region of a stack
+    """
+
+    operation = "crop"
+
+    def __init__(self, source, y0, y1, x0, x1):
+        self.y0, self.x0 = y0, x0
+        shape = (len(source), y1 - y0, x1 - x0) + tuple(source.shape[3:])
+        super().__init__([source], shape, source.dtype)
+
+    def region(self, i, ys, xs):
+        return np.asarray(
+            self.sources[0][
+                i,
+                self.y0 + ys.start : self.y0 + ys.stop : ys.step,
+                self.x0 + xs.start : self.x0 + xs.stop : xs.step,
+            ]
+        )
+
+
+class FlipStack(VirtualStack):
+    """Stack mirrored along the rows (axis 1) or the columns (axis 2)
+    """
+
+    operation = "flip"
+
+    def __init__(self, source, axis=2):
+        self.axis = axis
+        super().__init__([source], source.shape, source.dtype)
+
+    def region(self, i, ys, xs):
+        h, w = self.shape[1:3]
+        if self.axis == 1:
+            return np.asarray(self.sources[0][i, _mirror(ys, h), xs])[::-1]
+        return np.asarray(self.sources[0][i, ys, _mirror(xs, w)])[:, ::-1]
+
+
+class RotateStack(VirtualStack):
+    """Stack rotated k times by 90 degrees, counter-clockwise (as np.rot90 on axes 1 and 2)
+    """
+
+    operation = "rotate"
+
+    def __init__(self, source, k=1):
+        # Consecutive rotations are folded into one
+        if isinstance(source, RotateStack):
+            k, source = k + source.k, source.sources[0]
+        self.k = k % 4
+        h, w = source.shape[1:3]
+        plane = (w, h) if self.k % 2 else (h, w)
+        shape = (len(source),) + plane + tuple(source.shape[3:])
+        super().__init__([source], shape, source.dtype)
+
+    def region(self, i, ys, xs):
+        source = self.sources[0]
+        h, w = source.shape[1:3]
+        if self.k == 0:
+            block = source[i, ys, xs]
+        elif self.k == 1:
+            block = source[i, xs, _mirror(ys, w)]
+        elif self.k == 2:
+            block = source[i, _mirror(ys, h), _mirror(xs, w)]
+        else:
+            block = source[i, _mirror(xs, h), ys]
+        return np.rot90(np.asarray(block), self.k)
+
+
+def _sum(a, b):
+    return a + b
+
+
+def _subtract(a, b):
+    return np.abs(a - b)
+
+
+def _intersect(a, b):
+    return np.where(np.multiply(a, b) != 0, a, 0)
+
+
+class CombineStack(VirtualStack):
+    """Pixel-wise combination of two stacks with the same frame shape. If they have a
+    different number of frames, each frame is combined with the matching frame of the other.
+    """
+
+    OPERATIONS = {"sum": _sum, "subtract": _subtract, "intersect": _intersect}
+
+    def __init__(self, a, b, operation="sum"):
+        if tuple(a.shape[1:]) != tuple(b.shape[1:]):
+            raise ValueError("The frames of both layers must have the same shape")
+        if operation not in self.OPERATIONS:
+            raise ValueError("The operation must be one of {}".format(list(self.OPERATIONS)))
+        self.operation = operation
+        dtype = self.OPERATIONS[operation](
+            np.zeros(1, dtype=a.dtype), np.zeros(1, dtype=b.dtype)
+        ).dtype
+        shape = (max(len(a), len(b)),) + tuple(a.shape[1:])
+        super().__init__([a, b], shape, dtype)
+
+    def region(self, i, ys, xs):
+        a, b = [
+            np.asarray(s[self.source_frame(s, i), ys, xs]) for s in self.sources
+        ]
+        return self.OPERATIONS[self.operation](a, b).astype(self.dtype, copy=False)
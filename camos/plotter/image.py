@@ -1,6 +1,6 @@
 # -*- coding: utf-8 -*-
 # Created on Mon Jul 19 2021
-# Last modified on Mon Jul 19 2021
+# Last modified on Sun Oct 18 2026
 # Copyright (c) CaMOS Development Team. All Rights Reserved.
 # Distributed under a MIT License. See LICENSE for more info.
 
@@ -46,7 +46,7 @@ class Image(Plotter):
         mask = self.mask.astype(int)
         mask_dict = {}
 
-        for i in range(1, self.data.shape[0]):
+        for i in range(self.data.shape[0]):
             mask_dict[int(self.data[i]["CellID"].flatten()[0])] = self.data[i][
                 self.colname
             ].flatten()[0]
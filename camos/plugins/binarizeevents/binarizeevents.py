@@ -1,12 +1,13 @@
 # -*- coding: utf-8 -*-
 # Created on Sat Jun 05 2021
-# Last modified on Mon Jun 07 2021
+# Last modified on Sun Oct 18 2026
 # Copyright (c) CaMOS Development Team. All Rights Reserved.
 # Distributed under a MIT License. See LICENSE for more info.
 
 import numpy as np
 
 from camos.tasks.analysis import Analysis
+from camos.tasks.events import EventTable
 from camos.utils.generategui import NumericInput, DatasetInput
 from camos.utils.units import get_time
 
@@ -34,14 +35,17 @@ class BinarizeEvents(Analysis):
         if not ("Active" in data.dtype.names):
             raise ValueError("The dataset does not have the expected shape")
 
-        # Calculates the bins
-        active = data[:]["Active"] / _binsize
-        active = np.floor(active) * _binsize
+        # Calculates the bins, from the events sorted by cell and time
+        index = self.signal.get_events(_i_data)
+        cells = index.event_cells()
+        active = np.floor(index.times / _binsize) * _binsize
 
-        # Stores the data into the output data structure
-        self.output = np.zeros(shape=(len(active), 1), dtype=output_type)
-        self.output[:]["CellID"] = data[:]["CellID"].reshape(-1, 1)
-        self.output[:]["Active"] = active.reshape(-1, 1)
+        # This reduces the events to one per electrode in the same bin; as the bins
+        # are sorted within every electrode, repeated ones are consecutive
+        keep = np.ones(len(active), dtype=bool)
+        keep[1:] = (cells[1:] != cells[:-1]) | (active[1:] != active[:-1])
 
-        # This reduces the events to one per electrode in the same bin
-        self.output = np.unique(self.output, axis=0)
+        # Stores the data into the output data structure
+        events = EventTable(output_type)
+        events.add(cells[keep], active[keep])
+        self.output = events.to_array()
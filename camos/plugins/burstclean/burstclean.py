@@ -1,12 +1,11 @@
 # -*- coding: utf-8 -*-
 # Created on Sat Jun 05 2021
-# Last modified on Mon Jun 07 2021
+# Last modified on Sun Oct 18 2026
 # Copyright (c) CaMOS Development Team. All Rights Reserved.
 # Distributed under a MIT License. See LICENSE for more info.
 
-import numpy as np
-
 from camos.tasks.analysis import Analysis
+from camos.tasks.events import EventTable
 from camos.utils.generategui import NumericInput, DatasetInput
 from camos.utils.units import get_time
 
@@ -34,24 +33,17 @@ class BurstClean(Analysis):
             raise ValueError("The dataset does not have the expected shape")
 
         # Calculates the MFR, could be given as an input?
-        unique, counts = np.unique(data[:]["CellID"], return_counts=True)
-        active = data[:]["Active"]
-        IDs = data[:]["CellID"]
-        IDs_include = unique[
-            np.where(
-                (counts >= _filter_min * duration) & (counts <= _filter_max * duration)
-            )
+        index = self.signal.get_events(_i_data)
+        IDs_include = index.cells[
+            (index.counts >= _filter_min * duration)
+            & (index.counts <= _filter_max * duration)
         ]
-        idx = np.isin(IDs, IDs_include)
-        active_filter = active[idx]
-        IDs_filter = IDs[idx]
+        rows = index.select(IDs_include)
 
         # Calculate mean firing rate per cell
-        self.output = np.zeros(shape=(len(active_filter), 1), dtype=output_type)
-        self.output[:]["CellID"] = IDs_filter.reshape(-1, 1)
-        self.output[:]["Active"] = active_filter.reshape(-1, 1)
-
-        self.output = self.output[1:]
+        events = EventTable(output_type)
+        events.add(data[:]["CellID"].ravel()[rows], data[:]["Active"].ravel()[rows])
+        self.output = events.to_array()
         self.foutput = self.output
         # self.notify(
         #     "{}: Events Before = {}; Events After = {}".format(
@@ -1,6 +1,6 @@
 # -*- coding: utf-8 -*-
 # Created on Sat Jun 05 2021
-# Last modified on Mon Jun 07 2021
+# Last modified on Sun Oct 18 2026
 # Copyright (c) CaMOS Development Team. All Rights Reserved.
 # Distributed under a MIT License. See LICENSE for more info.
 
@@ -8,6 +8,7 @@ import numpy as np
 from rtree import index
 
 from camos.tasks.analysis import Analysis
+from camos.tasks.events import EventTable
 from camos.utils.generategui import NumericInput, ImageInput
 from camos.utils.units import get_length
 
@@ -32,28 +33,27 @@ class CorrelatePosition(Analysis):
         # The image input returns the index of the image model
         maskcmos_scale = self.model.scales[cmos]
         maskcmos_trans = self.model.translation[cmos]
-        maskcmos = self.model.images[cmos]._image
+        maskcmos = self.model.get_layer_labels(cmos)
 
-        ROIs = np.unique(maskcmos)
+        ROIs = maskcmos.labels
 
         # Setup the output variables
         output_type = [("CellID", "int"), ("Nearest", "int")]
-        self.output = np.zeros(shape=(1, 1), dtype=output_type)
+        pairs = EventTable(output_type)
 
         # Create the spatial index
         idx = index.Index()
         idx_dic = {}
 
-        # Put mask coordinates into the spatial index
-        for i in ROIs[1:]:  # avoid the background 0 value
-            self.intReady.emit(i * 100 / len(ROIs))
-            cell = maskcmos[0] == i
-            p_m = (
-                np.min(np.where(cell), axis=1) + np.flip(maskcmos_trans)
-            ) * maskcmos_scale[0]
-            p_M = (
-                np.max(np.where(cell), axis=1) + np.flip(maskcmos_trans)
-            ) * maskcmos_scale[0]
+        # Put mask coordinates into the spatial index, first half of the task
+        progress = self.progress.subtask(0, 50)
+        for k, i in enumerate(ROIs[1:]):  # avoid the background 0 value
+            progress.advance(k + 1, len(ROIs) - 1)
+            y0, x0, y1, x1 = maskcmos.bbox(i)
+            p_m = (np.array([y0, x0]) + np.flip(maskcmos_trans)) * maskcmos_scale[0]
+            p_M = (np.array([y1 - 1, x1 - 1]) + np.flip(maskcmos_trans)) * maskcmos_scale[
+                0
+            ]
 
             p = (p_m[0], p_m[1], p_M[0], p_M[1])
 
@@ -62,18 +62,15 @@ class CorrelatePosition(Analysis):
         # Retrieve the Calcium mask, find positions
         maskfl_scale = self.model.scales[fl]
         maskfl_trans = self.model.translation[fl]
-        maskfl = self.model.images[fl]._image
-        ROIs = np.unique(maskfl)
-
-        for i in ROIs[1:]:  # avoid the background 0 value
-            self.intReady.emit(i * 100 / len(ROIs))
-            cell = maskfl[0] == i
-            p_m = (
-                np.min(np.where(cell), axis=1) + np.flip(maskfl_trans)
-            ) * maskfl_scale[0]
-            p_M = (
-                np.max(np.where(cell), axis=1) + np.flip(maskfl_trans)
-            ) * maskfl_scale[0]
+        maskfl = self.model.get_layer_labels(fl)
+        ROIs = maskfl.labels
+
+        progress = self.progress.subtask(50, 100)
+        for k, i in enumerate(ROIs[1:]):  # avoid the background 0 value
+            progress.advance(k + 1, len(ROIs) - 1)
+            y0, x0, y1, x1 = maskfl.bbox(i)
+            p_m = (np.array([y0, x0]) + np.flip(maskfl_trans)) * maskfl_scale[0]
+            p_M = (np.array([y1 - 1, x1 - 1]) + np.flip(maskfl_trans)) * maskfl_scale[0]
 
             p = np.array((p_m[0] - dist, p_m[1] - dist, p_M[0] + dist, p_M[1] + dist))
 
@@ -82,7 +79,7 @@ class CorrelatePosition(Analysis):
             if len(nearest) == 0:
                 continue
 
-            row = np.array([(int(i), nearest[0])], dtype=output_type)
-            self.output = np.append(self.output, row)
+            pairs.add(int(i), [nearest[0]])
 
+        self.output = pairs.to_array()
         self.mask = self.model.images[fl].image(0)
@@ -1,15 +1,18 @@
 # -*- coding: utf-8 -*-
 # Created on Sat Jun 05 2021
-# Last modified on Mon Jun 07 2021
+# Last modified on Sun Oct 18 2026
 # Copyright (c) CaMOS Development Team. All Rights Reserved.
 # Distributed under a MIT License. See LICENSE for more info.
 
+import os
+
 import numpy as np
 from PyQt5.QtCore import pyqtSignal
 
 from camos.tasks.analysis import Analysis
 from camos.utils.generategui import NumericInput, ImageInput
 from camos.utils.units import get_time
+from camos.utils.baseline import dff
 
 
 class ExtractSignal(Analysis):
@@ -35,48 +38,22 @@ class ExtractSignal(Analysis):
     ):
         # Set the variables from the UI
         self.sampling = fps
-        mask = self.model.images[_i_mask].image(0)
+        labels = self.model.get_layer_labels(_i_mask)
         image = self.model.images[_i_fluor]
         self.imagename = self.model.names[_i_fluor]
 
-        # Get the ROIs from the mask
-        ROIs = np.unique(mask)[1:]
-        self.raw = np.zeros((len(ROIs), image.frames))
-        total = len(ROIs)
-
-        # Extract raw signals
-        for i, r in enumerate(ROIs):
-            cell = mask == r
-            self.raw[i, :] = np.average(image._image._imgs[:, cell], axis=(1))
-            self.intReady.emit(i * 100 / total)
+        # Extract raw signals of all ROIs at once, in a single pass over the frames
+        # (virtual layers are computed once); the first label is the background
+        self.raw = labels.aggregate(
+            image._image._imgs,
+            workers=os.cpu_count() or 1,
+            progress=self.progress,
+        )[1:]
 
         # Process raw signals to get dF/F0
-        F = self.raw
-        N, frames = F.shape
-
         # Code adapted from FluoroSNNAP
         # Determine deltaF/F by subtracting each value with the
         # mean of the lower 50% of previous 10-s values and dividing it
         # by the mean of the lower 50% of previous 10-s values.
-
-        dF_cell = np.zeros(F.shape)
-
-        _int_idx = np.arange(0, frames + 1, fps * F0_time)
-        interval_idx = np.unique(_int_idx)
-
         # For the first 10-s of data, take the min value for F0
-        F0 = np.min(F[:, 0 : interval_idx[1]], axis=1)
-
-        for k in range(interval_idx[1]):
-            dF_cell[:, k] = (F[:, k] - F0) / F0
-
-        for it in range(interval_idx[1], frames):
-            x = F[:, (it - F0_time) : it]
-            p = np.percentile(x, F0_perc, axis=1)
-            F0 = np.zeros(N)
-            for n in range(N):
-                F0[n] = np.mean(x[n, np.where(x[n, :] < p[n])])
-
-            dF_cell[:, it] = (F[:, it] - F0) / F0
-
-        self.output = dF_cell
+        self.output = dff(self.raw, fps, F0_time, F0_perc, statistic="trimmed_mean")
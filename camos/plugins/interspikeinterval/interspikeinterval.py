@@ -1,13 +1,13 @@
 # -*- coding: utf-8 -*-
 # Created on Sat Jun 05 2021
-# Last modified on Mon Jun 07 2021
+# Last modified on Sun Oct 18 2026
 # Copyright (c) CaMOS Development Team. All Rights Reserved.
 # Distributed under a MIT License. See LICENSE for more info.
 
 import numpy as np
-from collections import defaultdict
 
 from camos.tasks.analysis import Analysis
+from camos.utils.isi import Intervals
 from camos.utils.generategui import (
     DatasetInput,
     NumericInput,
@@ -40,31 +40,13 @@ class InterspikeIntervalMask(Analysis):
         if not ("Active" in data.dtype.names):
             return
 
-        ROIs = np.unique(data[:]["CellID"])
+        # Intervals of all cells at once, from the events sorted by cell and time
+        intervals = Intervals(self.signal.get_events(_i_data))
 
         # Create the output matrix
-        self.output = np.zeros(shape=(len(ROIs), 1), dtype=output_type)
+        self.output = np.zeros(shape=(len(intervals), 1), dtype=output_type)
 
-        # Save Cell IDs in the output matrix
-        self.output[:]["CellID"] = ROIs.reshape(-1, 1)
-
-        # Calculate a dictionary of the input, faster computation
-        IDs_all = data[:]["CellID"]
-        dict_events = defaultdict(list)
-
-        # This explores all events
-        if type(IDs_all[0]) == np.ndarray:
-            for i in range(len(IDs_all)):
-                dict_events[IDs_all[i][0]] += [data[i]["Active"][0]]
-                self.intReady.emit(i * 100 / len(IDs_all))
-
-        else:
-            for i in range(len(IDs_all)):
-                dict_events[IDs_all[i]] += [data[i]["Active"]]
-                self.intReady.emit(i * 100 / len(IDs_all))
-
-        ISI = np.zeros(len(ROIs))
-        for i, ROI in enumerate(ROIs):
-            ISI[i] = np.average(np.diff(dict_events[ROI]))
-
-        self.output[:]["ISI"] = ISI.reshape(-1, 1)
+        # Save Cell IDs and their mean ISI in the output matrix
+        self.output[:]["CellID"] = intervals.cells.reshape(-1, 1)
+        self.output[:]["ISI"] = intervals.mean().reshape(-1, 1)
+        self.progress(100)
@@ -1,6 +1,6 @@
 # -*- coding: utf-8 -*-
 # Created on Sat Jun 05 2021
-# Last modified on Mon Jun 07 2021
+# Last modified on Sun Oct 18 2026
 # Copyright (c) CaMOS Development Team. All Rights Reserved.
 # Distributed under a MIT License. See LICENSE for more info.
 
@@ -53,14 +53,11 @@ class MeanFiringRate(Analysis):
         data = self.signal.data[_i_data]
         self.dataname = self.signal.names[_i_data]
 
-        # Calculate mean firing rate per cell
-        ROIs = np.unique(data[:]["CellID"])
-        self.output = np.zeros(shape=(len(ROIs), 1), dtype=output_type)
-
-        # get the event counts and make CellID unique
-        unique, counts = np.unique(data[:]["CellID"], return_counts=True)
-        self.output[:]["CellID"] = unique.reshape(-1, 1)
-        self.output[:]["MFR"] = counts.reshape(-1, 1)
+        # Calculate mean firing rate per cell, from the event counts of the index
+        events = self.signal.get_events(_i_data)
+        self.output = np.zeros(shape=(len(events), 1), dtype=output_type)
+        self.output[:]["CellID"] = events.cells.reshape(-1, 1)
+        self.output[:]["MFR"] = events.counts.reshape(-1, 1)
         self.output[:]["MFR"] = self.output[:]["MFR"] / self.duration
 
         # Store the parameters
@@ -0,0 +1,157 @@
+# -*- coding: utf-8 -*-
+# Created on Sun Oct 18 2026
+# Last modified on Sun Oct 18 2026
+# Copyright (c) CaMOS Development Team. All Rights Reserved.
+# Distributed under a MIT License. See LICENSE for more info.
+
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import scipy.signal
+
+# Maximum number of samples (frames times channels) of a chunk
+CHUNK_VALUES = 2 ** 24
+
+# Frames read before and after every chunk, in seconds, so the edges of the
+# filter and the crossings at the borders of the chunks are computed as in one pass
+OVERLAP_SECONDS = 0.01
+
+# Ratio between the MAD and the standard deviation of Gaussian noise
+MAD_SCALE = 0.6745
+
+
+def _refractory(channels, frames, refractory):
+    """Keeps the spikes of every channel separated by at least refractory frames,
+    from the earliest one on. Spikes are sorted by channel and frame.
+    """
+    keep = np.ones(len(frames), dtype=bool)
+    same = channels[1:] == channels[:-1]
+    close = np.flatnonzero(same & (np.diff(frames) < refractory)) + 1
+    # Only spikes close to the previous one of their channel are checked, in order
+    for i in close:
+        j = i - 1
+        while j >= 0 and channels[j] == channels[i] and not keep[j]:
+            j -= 1
+        if j >= 0 and channels[j] == channels[i] and frames[i] - frames[j] < refractory:
+            keep[i] = False
+    return keep
+
+
+class SpikeDetector:
+    """Detection of spikes in raw recordings of many channels, streamed in chunks of frames.
+    Every chunk (and some overlap with its neighbours) is band-pass filtered for all
+    channels at once; the noise of every channel is the running mean of the MAD of the
+    chunks read so far, and spikes are the crossings of a multiple of the noise below
+    zero, separated by a refractory period. Chunks are filtered in a pool of threads,
+    and detected in order, so at most a chunk per thread is held in memory.
+    """
+
+    def __init__(
+        self, fs, threshold=5, low=300, high=3000, refractory=1e-3, order=2, workers=1
+    ):
+        """Initialization of the object
+
+        Args:
+            fs (float): sampling rate, in Hz
+            threshold (float, optional): threshold, in multiples of the noise. Defaults to 5.
+            low (float, optional): lower cut-off frequency, in Hz. Defaults to 300.
+            high (float, optional): upper cut-off frequency, in Hz, below fs / 2. Defaults to 3000.
+            refractory (float, optional): minimum time between spikes of a channel, in seconds. Defaults to 1e-3.
+            order (int, optional): order of the Butterworth filter. Defaults to 2.
+            workers (int, optional): number of threads filtering chunks. Defaults to 1.
+        """
+        self.fs = float(fs)
+        self.threshold = float(threshold)
+        self.refractory = max(1, int(round(refractory * self.fs)))
+        self.workers = max(1, int(workers))
+        high = min(high, 0.45 * self.fs)
+        if not 0 < low < high:
+            raise ValueError("The cut-off frequencies must be 0 < low < high < fs / 2")
+        self.sos = scipy.signal.butter(
+            order, [low, high], btype="bandpass", fs=self.fs, output="sos"
+        )
+        self.overlap = max(1, int(OVERLAP_SECONDS * self.fs))
+
+    def _filter(self, reader, start, stop):
+        """Filtered samples of the frames start to stop, and the MAD of every channel
+
+        Returns:
+            tuple: the filtered frames, from start - 1 to stop, and the MAD
+        """
+        a = max(0, start - self.overlap)
+        b = min(reader.frames, stop + self.overlap)
+        x = scipy.signal.sosfiltfilt(self.sos, reader.read(a, b), axis=0, padtype=None)
+        # The frame before the chunk is kept to find the crossings at its beginning
+        first = start - a - (1 if start > 0 else 0)
+        x = x[first : stop - a]
+        mad = np.median(np.abs(x[start - a - first :]), axis=0) / MAD_SCALE
+        return x.astype(np.float32), mad, start > 0
+
+    def detect(self, reader, start=0, stop=None, progress=None):
+        """Detects the spikes of a range of frames of a recording
+
+        Args:
+            reader (BRWFile): the recording, read with read(start, stop) as (frames, channels)
+            start (int, optional): first frame. Defaults to 0.
+            stop (int, optional): frame after the last one. Defaults to the end of the recording.
+            progress (callable, optional): receives the percentage of frames processed. Defaults to None.
+
+        Returns:
+            tuple: channel and frame of every spike, in time order
+        """
+        stop = reader.frames if stop is None else min(stop, reader.frames)
+        channels = max(1, reader.n_channels)
+        step = max(self.overlap, CHUNK_VALUES // channels - 2 * self.overlap)
+        bounds = list(range(start, stop, step)) + [stop]
+        chunks = list(zip(bounds[:-1], bounds[1:]))
+
+        mad_sum = np.zeros(channels)
+        last = np.full(channels, -self.refractory, dtype=np.int64)
+        found_channels, found_frames = [], []
+
+        def handle(k, result):
+            x, mad, previous = result
+            mad_sum[:] += mad
+            noise = mad_sum / (k + 1)
+            below = x < -self.threshold * noise
+            # Flat channels (i.e., disconnected electrodes) have no spikes
+            below[:, noise == 0] = False
+            if previous:
+                # Crossings of the first frame are found against the frame before
+                crossings = below[1:] & ~below[:-1]
+            else:
+                crossings = below.copy()
+                crossings[1:] &= ~below[:-1]
+            ch, t = np.nonzero(crossings.T)
+            t = t + chunks[k][0]
+            # The refractory period continues from the last spike of the previous chunk
+            keep = t - last[ch] >= self.refractory
+            ch, t = ch[keep], t[keep]
+            keep = _refractory(ch, t, self.refractory)
+            ch, t = ch[keep], t[keep]
+            if len(ch) > 0:
+                ends = np.r_[np.flatnonzero(ch[1:] != ch[:-1]), len(ch) - 1]
+                last[ch[ends]] = t[ends]
+            order = np.argsort(t, kind="stable")
+            found_channels.append(ch[order])
+            found_frames.append(t[order])
+            if progress is not None:
+                progress(int((k + 1) * 100 / len(chunks)))
+
+        if self.workers > 1 and len(chunks) > 1:
+            with ThreadPoolExecutor(max_workers=self.workers) as pool:
+                # A bounded number of chunks is in flight; results are handled in order
+                pending = {}
+                for k, (a, b) in enumerate(chunks):
+                    pending[k] = pool.submit(self._filter, reader, a, b)
+                    if k - self.workers in pending:
+                        handle(k - self.workers, pending.pop(k - self.workers).result())
+                for k in sorted(pending):
+                    handle(k, pending.pop(k).result())
+        else:
+            for k, (a, b) in enumerate(chunks):
+                handle(k, self._filter(reader, a, b))
+
+        if len(found_channels) == 0:
+            return np.zeros(0, dtype=np.intp), np.zeros(0, dtype=np.int64)
+        return np.concatenate(found_channels), np.concatenate(found_frames)
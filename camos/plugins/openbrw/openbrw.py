@@ -0,0 +1,82 @@
+# -*- coding: utf-8 -*-
+# Created on Sun Oct 18 2026
+# Last modified on Sun Oct 18 2026
+# Copyright (c) CaMOS Development Team. All Rights Reserved.
+# Distributed under a MIT License. See LICENSE for more info.
+
+from camos.tasks.opening import Opening
+from camos.model.events import CompactEvents
+from camos.tasks.parallel import get_workers
+from camos.model.bxr import BRWFile
+from camos.plotter.raster import Raster
+from camos.utils.generategui import NumericInput
+
+from .detection import SpikeDetector
+
+
+class OpenBRW(Opening):
+    """This is the plugin to detect spikes in the raw recordings of BRW files (3Brain),
+    streaming the samples in chunks, with our own thresholds
+    """
+
+    analysis_name = "Detect spikes in brw file"
+
+    def __init__(self, *args, **kwargs):
+        super(OpenBRW, self).__init__(
+            extensions="BRW File (*.brw)", show=True, *args, **kwargs
+        )
+        self.output = None
+        # Read here, in the GUI thread, as the preferences cannot be read from the task
+        self.workers = get_workers()
+        self.finished.connect(self.output_to_signalmodel)
+
+    def open(self):
+        """Files dropped into CaMOS show the parameters of the detection first
+        """
+        assert self.filename != ""
+        self.buildUI()
+        self.show()
+
+    def _run(
+        self,
+        threshold: NumericInput("Threshold (times the MAD noise)", 5),
+        low: NumericInput("Low cut-off frequency (Hz)", 300),
+        high: NumericInput("High cut-off frequency (Hz)", 3000),
+        refractory: NumericInput("Refractory period (ms)", 1),
+    ):
+        brw = BRWFile(self.filename)
+        try:
+            detector = SpikeDetector(
+                brw.sampling_rate,
+                threshold=threshold,
+                low=low,
+                high=high,
+                refractory=refractory / 1000,
+                workers=self.workers,
+            )
+            channels, frames = detector.detect(brw, progress=self.progress)
+        finally:
+            brw.close()
+
+        self.output = CompactEvents(channels, frames, brw.sampling_rate)
+        self.samplingRate = brw.sampling_rate
+        self.duration = brw.duration
+        self.electrodeX = brw.n_cols
+
+    def output_to_signalmodel(self):
+        if self.output is None:
+            return
+        self.parent.signalmodel.add_data(
+            self.output,
+            "Spikes from BRW",
+            None,
+            self.samplingRate,
+            plotter=Raster,
+            colname="Active",
+            properties={
+                "samplingRate": self.samplingRate,
+                "duration": self.duration,
+                "timeUnits": "s",
+                "electrodeX": self.electrodeX,
+            },
+        )
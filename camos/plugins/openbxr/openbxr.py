@@ -1,6 +1,6 @@
 # -*- coding: utf-8 -*-
 # Created on Sat Jun 05 2021
-# Last modified on Mon Jun 07 2021
+# Last modified on Sun Oct 18 2026
 # Copyright (c) CaMOS Development Team. All Rights Reserved.
 # Distributed under a MIT License. See LICENSE for more info.
 
@@ -10,8 +10,10 @@ import numpy as np
 import h5py
 
 from camos.tasks.opening import Opening
+from camos.model.bxr import BXRFile
 from camos.plotter.raster import Raster
 from camos.viewport.signalviewer2 import SignalViewer2
+from camos.utils.generategui import NumericInput
 
 
 class OpenBXR(Opening):
@@ -33,31 +35,44 @@ class OpenBXR(Opening):
             file ([type], optional): [description]. Defaults to None.
         """
         super(OpenBXR, self).__init__(
-            extensions="BXR File (*.bxr)", show=False, *args, **kwargs
+            extensions="BXR File (*.bxr)", show=True, *args, **kwargs
         )
 
-    def _run(self):
-        filehdf5_bxr = h5py.File(self.filename)
-        samplingRate = np.asarray(
-            filehdf5_bxr["3BRecInfo"]["3BRecVars"]["SamplingRate"]
-        )[0]
-
-        lastFrame = int(
-            np.asarray(filehdf5_bxr["3BUserInfo"]["TimeIntervals"])[0][3][0][1]
-        )
-        duration = lastFrame / samplingRate
-        SpikeChIDs = np.asarray(filehdf5_bxr["3BResults"]["3BChEvents"]["SpikeChIDs"])
-        SpikeTimes = (
-            np.asarray(filehdf5_bxr["3BResults"]["3BChEvents"]["SpikeTimes"])
-            / samplingRate
-        )
-
-        NCols = int(np.array(filehdf5_bxr["3BRecInfo"]["3BMeaChip"]["NCols"]))
-
-        output_type = [("CellID", "int"), ("Active", "float")]
-        self.output = np.zeros(shape=(len(SpikeChIDs), 1), dtype=output_type)
-        self.output[:]["CellID"] = SpikeChIDs.reshape(-1, 1)
-        self.output[:]["Active"] = SpikeTimes.reshape(-1, 1)
+    def open(self):
+        """Files dropped into CaMOS show the time window and channels to load first
+        """
+        assert self.filename != ""
+        self.buildUI()
+        self.show()
+
+    def _run(
+        self,
+        start: NumericInput("Start time (s)", 0),
+        end: NumericInput("End time (s), 0 for the whole recording", 0),
+        first: NumericInput("First channel", 0),
+        last: NumericInput("Last channel, -1 for all of them", -1),
+    ):
+        # Metadata is read first; spikes are read in blocks, only within the time
+        # window and of the selected channels
+        bxr = BXRFile(self.filename)
+        start = max(0, start)
+        # The whole recording is read up to its last spike
+        end = None if end <= 0 else end
+        n_channels = bxr.n_cols * bxr.n_rows
+        last = n_channels - 1 if last < 0 else min(n_channels - 1, int(last))
+        first = max(0, int(first))
+        if first == 0 and last == n_channels - 1:
+            channels = None
+        else:
+            channels = np.arange(first, last + 1)
+        try:
+            self.output = bxr.read(start, end, channels, progress=self.progress)
+        finally:
+            bxr.close()
+        samplingRate = bxr.sampling_rate
+        end = bxr.duration if end is None else min(bxr.duration, end)
+        duration = max(0, end - start)
+        NCols = bxr.n_cols
 
         _sv = SignalViewer2(
             self.parent, self.output, title="Events from BXR", plotter=Raster
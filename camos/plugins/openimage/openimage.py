@@ -1,6 +1,6 @@
 # -*- coding: utf-8 -*-
 # Created on Sat Jun 05 2021
-# Last modified on Mon Jun 07 2021
+# Last modified on Sun Oct 18 2026
 # Copyright (c) CaMOS Development Team. All Rights Reserved.
 # Distributed under a MIT License. See LICENSE for more info.
 
@@ -27,11 +27,11 @@ class OpenImage(Opening):
         if type(self.filename) == list:
             for single in self.filename:
                 image = InputData(single)
-                image.loadImage()
+                image.loadImage(progress=self.progress)
                 self.model.add_image(image)
         elif type(self.filename) == str:
             image = InputData(self.filename)
-            image.loadImage()
+            image.loadImage(progress=self.progress)
             self.model.add_image(image)
         else:
             raise NotImplementedError("Could not understand the input path")
@@ -1,6 +1,6 @@
 # -*- coding: utf-8 -*-
 # Created on Sat Jun 05 2021
-# Last modified on Mon Jun 07 2021
+# Last modified on Sun Oct 18 2026
 # Copyright (c) CaMOS Development Team. All Rights Reserved.
 # Distributed under a MIT License. See LICENSE for more info.
 
@@ -27,7 +27,7 @@ class OpenImageStack(Opening):
         # Added so we can load CMOS chip image
         PIL.Image.MAX_IMAGE_PIXELS = 933120000
         image = InputData(self.filename)
-        image.loadImage()
+        image.loadImage(progress=self.progress)
         self.model.add_image(image)
 
     def show_filemenu(self):
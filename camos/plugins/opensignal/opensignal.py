@@ -1,6 +1,6 @@
 # -*- coding: utf-8 -*-
 # Created on Sat Jun 05 2021
-# Last modified on Mon Jun 07 2021
+# Last modified on Sun Oct 18 2026
 # Copyright (c) CaMOS Development Team. All Rights Reserved.
 # Distributed under a MIT License. See LICENSE for more info.
 
@@ -10,6 +10,7 @@ import h5py
 from camos.tasks.opening import Opening
 from camos.viewport.signalviewer2 import SignalViewer2
 from camos.model.inputdata import InputData
+from camos.model.lazydata import LazyDataset
 
 
 class OpenSignal(Opening):
@@ -19,21 +20,25 @@ class OpenSignal(Opening):
         super(OpenSignal, self).__init__(extensions="hdf5 File (*.h5)", *args, **kwargs)
 
     def _run(self):
-        h5f = h5py.File(self.filename, "r")
-        for name in list(h5f.keys()):
-            if hasattr(h5f[name], "keys"):
-                mask = None
-                keys = list(h5f[name].keys())
-                if "mask" in list(h5f[name].keys()):
-                    mask = self.load_mask(
-                        np.array(h5f[name]["mask"]), "Mask of {}".format(name)
-                    )
-                    self.load_signal(np.array(h5f[name][keys[0]]), name, mask)
+        # Signals are read from disk when they are used, see LazyDataset
+        with h5py.File(self.filename, "r") as h5f:
+            for name in list(h5f.keys()):
+                if hasattr(h5f[name], "keys"):
+                    mask = None
+                    keys = list(h5f[name].keys())
+                    if "mask" in list(h5f[name].keys()):
+                        mask = self.load_mask(
+                            np.array(h5f[name]["mask"]), "Mask of {}".format(name)
+                        )
+                        self.load_signal(
+                            LazyDataset(self.filename, "{}/{}".format(name, keys[0])),
+                            name,
+                            mask,
+                        )
+                    else:
+                        raise ValueError
                 else:
-                    raise ValueError
-            else:
-                self.load_signal(np.array(h5f[name]), name)
-        h5f.close()
+                    self.load_signal(LazyDataset(self.filename, name), name)
 
     def load_signal(self, data, name, mask=[]):
         self.signal.add_data(data, name, mask=mask)
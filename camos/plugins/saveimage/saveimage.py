@@ -1,10 +1,11 @@
 # -*- coding: utf-8 -*-
 # Created on Sat Jun 05 2021
-# Last modified on Mon Jun 07 2021
+# Last modified on Sun Oct 18 2026
 # Copyright (c) CaMOS Development Team. All Rights Reserved.
 # Distributed under a MIT License. See LICENSE for more info.
 
 from PIL import Image
+from PIL.TiffImagePlugin import AppendingTiffWriter
 import numpy as np
 
 from camos.tasks.saving import Saving
@@ -19,25 +20,21 @@ class SaveImage(Saving):
 
     def _run(self):
         currentlayer = self.model.currentlayer
+        # The stack may be lazy (i.e., virtual, TIFF or HDF5 backed), so it is
+        # read and converted one frame at a time
         self.image = self.model.images[currentlayer]._image._imgs
         shape = self.image.shape
         pxs = self.model.pixelsize[currentlayer]
         # Cannot save int64 images with pillow
         # We convert to a different bit depth,
         # uint32 is the highest that works
-        self.image = self.image.astype(np.uint32)
-        if shape[0] == 1:
-            im = Image.fromarray(self.image[0])
-            im.save(self.filename, dpi=(pxs, pxs))
-        else:
-            imlist = []
-            for m in self.image:
-                imlist.append(Image.fromarray(m))
-
-            imlist[0].save(
-                self.filename,
-                compression="tiff_deflate",
-                save_all=True,
-                append_images=imlist[1:],
-                dpi=(pxs, pxs),
-            )
+        # Frames are written as they are read, so only one is in memory at a time
+        options = {"dpi": (pxs, pxs)}
+        if shape[0] > 1:
+            options["compression"] = "tiff_deflate"
+        with open(self.filename, "w+b") as fp, AppendingTiffWriter(fp) as tiff:
+            for i in range(shape[0]):
+                frame = Image.fromarray(np.asarray(self.image[i], dtype=np.uint32))
+                frame.save(tiff, format="TIFF", **options)
+                tiff.newFrame()
+                self.progress.advance(i + 1, shape[0])
@@ -1,6 +1,6 @@
 # -*- coding: utf-8 -*-
 # Created on Sat Jun 05 2021
-# Last modified on Mon Jun 07 2021
+# Last modified on Sun Oct 18 2026
 # Copyright (c) CaMOS Development Team. All Rights Reserved.
 # Distributed under a MIT License. See LICENSE for more info.
 
@@ -34,6 +34,6 @@ class SaveVideo(Saving):
                 self.model.get_layer(self.model.currentlayer)
             ).convert("RGB")
             out.write(np.array(frame))
-            self.intReady.emit(i * 100 / maxframes)
+            self.progress.advance(i, maxframes)
 
         out.release()
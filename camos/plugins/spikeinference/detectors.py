@@ -0,0 +1,98 @@
+# -*- coding: utf-8 -*-
+# Created on Sun Oct 18 2026
+# Last modified on Sun Oct 18 2026
+# Copyright (c) CaMOS Development Team. All Rights Reserved.
+# Distributed under a MIT License. See LICENSE for more info.
+
+import scipy.ndimage
+import scipy.signal
+import numpy as np
+from . import oopsi
+
+# Detection of the events of a single trace. These functions run in worker processes
+# (see camos.tasks.parallel.map_rows), so they are defined at the module level.
+
+
+def oopsi_spikes(F, fps, iter_max):
+    """Times of the spikes of a trace, inferred with fast-oopsi
+    """
+    db, Cz = oopsi.fast(F, dt=1 / fps, iter_max=iter_max)
+    return np.where(db >= 1)[0] / fps
+
+
+def match_templates(X, templates, height):
+    """Normalised cross-correlation (Pearson) of every window of the traces with every
+    template. The sums over the windows come from cumulative sums, and the products
+    with the templates from FFT convolutions, for all traces at once. Windows whose
+    peak-to-peak amplitude does not exceed height are given a correlation of 0.
+
+    Args:
+        X (np.ndarray): traces, with shape (traces, frames)
+        templates (list): 1D arrays, the templates
+        height (np.ndarray): minimum amplitude of the windows of each trace
+
+    Returns:
+        np.ndarray: for every trace and window start, the maximum correlation over
+            the templates, with shape (traces, frames)
+    """
+    X = np.atleast_2d(np.asarray(X, dtype=np.float64))
+    N, T = X.shape
+    # Correlations do not depend on the offset, which is removed to keep the sums accurate
+    X = X - X.mean(axis=1, keepdims=True)
+    S1 = np.zeros((N, T + 1))
+    S2 = np.zeros((N, T + 1))
+    np.cumsum(X, axis=1, out=S1[:, 1:])
+    np.cumsum(X ** 2, axis=1, out=S2[:, 1:])
+    height = np.asarray(height, dtype=np.float64).reshape(-1, 1)
+
+    best = np.zeros((N, T))
+    for template in templates:
+        t = np.asarray(template, dtype=np.float64).ravel()
+        L = len(t)
+        # Windows start at 0...T - L - 2, as in the original loop
+        nwin = T - (L + 1)
+        if nwin <= 0:
+            continue
+        tc = t - t.mean()
+        num = scipy.signal.fftconvolve(X, tc[None, ::-1], mode="valid", axes=1)[:, :nwin]
+        sx = S1[:, L : L + nwin] - S1[:, :nwin]
+        sxx = S2[:, L : L + nwin] - S2[:, :nwin] - sx ** 2 / L
+        den = np.sqrt(np.clip(sxx, 0, None) * np.dot(tc, tc))
+        R = np.divide(num, den, out=np.zeros_like(num), where=den > 0)
+
+        # Peak-to-peak amplitude of the windows, from running maxima and minima
+        top = scipy.ndimage.maximum_filter1d(X, L, axis=1)[:, L // 2 : L // 2 + nwin]
+        bottom = scipy.ndimage.minimum_filter1d(X, L, axis=1)[:, L // 2 : L // 2 + nwin]
+        R[(top - bottom) <= height] = 0
+        np.maximum(best[:, :nwin], R, out=best[:, :nwin])
+    return best
+
+
+def template_spikes(X, fps, thr, event_amplitude, spike_lib):
+    """Times of the spikes of a batch of traces, where they correlate with any template
+    of spike_lib (see match_templates)
+
+    Returns:
+        list: one array of times per trace
+    """
+    X = np.atleast_2d(np.asarray(X, dtype=np.float64))
+    # Sampling rate of the traces being matched, after resampling them
+    rate = fps
+    q = int(np.floor(fps / 10))
+    if q > 1:
+        X = scipy.signal.decimate(X, q, axis=1)
+        rate = fps / q
+    elif fps < 10:
+        # Traces are interpolated to 10 Hz
+        frames = np.arange(X.shape[1])
+        upsampled = np.arange(0, X.shape[1] - 1, fps / 10)
+        X = np.stack([np.interp(upsampled, frames, x) for x in X])
+        rate = 10
+
+    # deltaF/F0 being used; otherwise, either raw trace or intensity above background
+    height = np.where(
+        X.max(axis=1) < 10, event_amplitude, event_amplitude * X.min(axis=1)
+    )
+
+    best = match_templates(X, [snippet[0] for snippet in spike_lib], height)
+    return [np.where(b >= thr)[0] / rate for b in best]
@@ -8,9 +8,10 @@ https://github.com/jovo/oopsi
 """
 import numpy as np
 import numpy.linalg as lp
+from scipy.linalg import solveh_banded
 from scipy.signal import lfilter, detrend
 from scipy.sparse import spdiags, eye
-from scipy.sparse.linalg.dsolve import linsolve
+from scipy.sparse.linalg import spsolve
 
 # generate Fluorescence (F), Calcium2+ (C) and Spikes (N)
 def fcn_generate(T, dt=0.02, lam=0.1, tau=1.5, sigma=0.1):
@@ -44,7 +45,10 @@ util functions are,
     oopsi_m() : generate matric M, where (MC)=n
 this implementation (and jovo's MATLAB) utilize sparse matrix for
 speedup. using scipy.sparse.spdiags and scipy.sparse.eye, Hessian
-equation Hd=g is solved via linsolve.spsolve.
+equation Hd=g is solved via spsolve.
+oopsi_est_map_banded() is a faster equivalent of oopsi_est_map(): the
+Hessian is symmetric tridiagonal, so it is built in banded form and solved
+with scipy.linalg.solveh_banded, reusing the buffers across iterations.
 """
 # return mean absolute deviation MAD of F
 def oopsi_mad(F):
@@ -106,7 +110,7 @@ def oopsi_est_map(F, P):
             g = glik + grad_lnprior - z * (M.T * (1 / n))  # gradient, g
             H2 = spdiags(1 / (n ** 2), 0, T, T)
             H = H1 + z * (M.T * H2 * M)  # Hessian, H
-            d = linsolve.spsolve(H, g)  # direction to step
+            d = spsolve(H, g)  # direction to step
             # find s
             hit = n / (M * d)  # steps within constraint boundaries
             hit = hit[hit > 0]
@@ -134,6 +138,114 @@ def oopsi_est_map(F, P):
     return n, C, post
 
 
+# apply M (bidiagonal, see oopsi_m) to a vector: (MC)[t] = C[t] - gamma*C[t-1]
+def oopsi_m_dot(gamma, C, out=None):
+    out = np.empty_like(C) if out is None else out
+    out[0] = C[0]
+    np.multiply(C[:-1], -gamma, out=out[1:])
+    out[1:] += C[1:]
+    return out
+
+
+# apply M transposed to a vector: (M'v)[t] = v[t] - gamma*v[t+1]
+def oopsi_mt_dot(gamma, v, out=None):
+    out = np.empty_like(v) if out is None else out
+    out[-1] = v[-1]
+    np.multiply(v[1:], -gamma, out=out[:-1])
+    out[:-1] += v[:-1]
+    return out
+
+
+# objective for several steps along d at once, see oopsi_est_map_banded
+def oopsi_line_search(F, C, d, steps, post, gam, a, b, sig, llam, z):
+    C1 = C[None, :] - steps[:, None] * d[None, :]
+    n1 = C1.copy()
+    n1[:, 1:] -= gam * C1[:, :-1]
+    D = F[None, :] - a * C1 - b
+    with np.errstate(invalid="ignore", divide="ignore"):
+        post1 = (
+            1 / (2 * (sig ** 2)) * np.einsum("ij,ij->i", D, D)
+            + n1 @ llam
+            - z * np.sum(np.log(n1), axis=1)
+        )
+    # first step that does not increase the objective (a NaN, from n < 0, also
+    # ends the search), or the last one
+    k = np.flatnonzero(~(post1 > post + 1e-7))
+    k = k[0] if len(k) > 0 else len(steps) - 1
+    return k, C1[k], n1[k], post1[k]
+
+
+# map estimator of F, with a banded solver of the Hessian (see oopsi_est_map)
+def oopsi_est_map_banded(F, P):
+    T, dt, gam, a, b, sig, lam = (
+        P[k] for k in ("T", "dt", "gamma", "alpha", "beta", "sigma", "lambda")
+    )
+    n = 0.01 + np.zeros(T)
+    C = lfilter([1.0], [1.0, -gam], n)
+    llam = (lam * dt) * np.ones(T)
+    grad_lnprior = oopsi_mt_dot(gam, llam)
+    h1 = (a ** 2) / (sig ** 2)
+    # work buffers: Hessian in upper banded form, weights, gradient and M*d
+    ab = np.empty((2, T))
+    w = np.empty(T)
+    g = np.empty(T)
+    Md = np.empty(T)
+    z = 1.0  # weight on barrier function
+    while z > 1e-13:
+        D = F - a * C - b  # residual
+        lik = 1 / (2 * (sig ** 2)) * np.dot(D, D)
+        post = lik + np.dot(llam, n) - z * np.sum(np.log(n))  # calculate L
+        s = 1.0
+        d = 1.0
+        while (lp.norm(d) > 5e-2) and (s > 1e-3):  # conv for z
+            # gradient, g
+            np.divide(1.0, n, out=w)
+            oopsi_mt_dot(gam, w, out=g)
+            g *= -z
+            g += grad_lnprior
+            g -= a / (sig ** 2) * (F - a * C - b)
+            # Hessian, H = H1 + z*M'*diag(1/n^2)*M, which is tridiagonal
+            np.square(w, out=w)
+            ab[1] = w
+            ab[1, :-1] += (gam ** 2) * w[1:]
+            ab[1] *= z
+            ab[1] += h1
+            ab[0, 0] = 0.0
+            np.multiply(w[1:], -z * gam, out=ab[0, 1:])
+            d = solveh_banded(ab, g, overwrite_ab=True, check_finite=False)
+            # find s
+            # steps within constraint boundaries
+            hit = n / oopsi_m_dot(gam, d, out=Md)
+            hit = hit[hit > 0]
+            if any(hit < 1):
+                s = 0.99 * hit.min()
+            else:
+                s = 1.0
+            # steps s, s/5, s/25... as in oopsi_est_map; the first one is usually
+            # accepted, otherwise the rest are evaluated at once
+            steps = [s]
+            while steps[-1] / 5.0 >= 1e-20:
+                steps.append(steps[-1] / 5.0)
+            steps = np.array(steps)
+            k, C1, n1, post1 = oopsi_line_search(
+                F, C, d, steps[:1], post, gam, a, b, sig, llam, z
+            )
+            if post1 > post + 1e-7 and len(steps) > 1:
+                k, C1, n1, post1 = oopsi_line_search(
+                    F, C, d, steps[1:], post, gam, a, b, sig, llam, z
+                )
+                k += 1
+            C = C1  # update C
+            n = n1
+            s = steps[k] / 5.0
+            post = post1  # update post
+        z = z / 10.0  # reduce z (sequence of z reductions is arbitrary)
+    # clearing n[0],n[1] and normalize n between [0,1]
+    n[0:2] = 1e-8
+    n = n / n.max()
+    return n, C, post
+
+
 # parameters update for fast-oopsi
 def oopsi_est_par(n, C, F, P):
     T, dt, gam, a, b, sig, lam = (
@@ -162,18 +274,20 @@ def oopsi_est_par(n, C, F, P):
 
 
 # implement fast-oopsi
-def fast(F, dt=0.02, iter_max=1, update=True):
+def fast(F, dt=0.02, iter_max=1, update=True, banded=True):
     """
     <input:>
     F        - a column vector, fluorescence of a neuron (ROI), Tx1
     dt       - frame sampling interval
     iter_max - maximum iteration
     update   - if we are iterating to estimate parameters
+    banded   - if the banded solver is used, instead of the sparse one
     """
+    est_map = oopsi_est_map_banded if banded else oopsi_est_map
     # initialize parameters
     F, P = oopsi_init_par(F, dt)
     # one-shot Newton-Raphson
-    n, C, post = oopsi_est_map(F, P)
+    n, C, post = est_map(F, P)
     post_max = post
     n_best = n
     C_best = C
@@ -186,7 +300,7 @@ def fast(F, dt=0.02, iter_max=1, update=True):
         if update:
             P = oopsi_est_par(n, C, F, P)
         # update inferred spike train based on new parameters
-        n, C, post = oopsi_est_map(F, P)
+        n, C, post = est_map(F, P)
         if post > post_max:
             n_best = n
             C_best = C
@@ -230,7 +344,7 @@ def wiener(F, dt=0.020, iter_max=20, update=True):
             + (M.T * (M * C) - llam * (M.T * np.ones(T))) / llam
         )
         H = eye(T) / sig ** 2 + M.T * M / llam
-        d = linsolve.spsolve(H, g)
+        d = spsolve(H, g)
         C = C - d
         N = M * C
         #
@@ -1,6 +1,6 @@
 # -*- coding: utf-8 -*-
 # Created on Sat Jun 05 2021
-# Last modified on Mon Jun 07 2021
+# Last modified on Sun Oct 18 2026
 # Copyright (c) CaMOS Development Team. All Rights Reserved.
 # Distributed under a MIT License. See LICENSE for more info.
 
@@ -51,7 +51,7 @@ class StackCorrelation(Processing):
         t = np.linspace(0, n - 1, self.between).astype(int)
         self.output = np.zeros((len(t), len(t)))
         for i in range(len(t)):
-            self.intReady.emit(i * 100 / len(t))
+            self.progress.advance(i, len(t))
             for j in range(i, len(t)):
                 corr = np.corrcoef(image[t[i]], image[t[j]])
                 self.output[i, j] = corr[0, 1]
@@ -1,6 +1,6 @@
 # -*- coding: utf-8 -*-
 # Created on Sat Jun 05 2021
-# Last modified on Mon Jun 07 2021
+# Last modified on Sun Oct 18 2026
 # Copyright (c) CaMOS Development Team. All Rights Reserved.
 # Distributed under a MIT License. See LICENSE for more info.
 
@@ -36,11 +36,15 @@ class CAMOSStackReg(Processing):
         _i_ref: CustomComboInput(_reference, "Reference Frame", 0),
         _i_img: ImageInput("Stack to register", 0),
     ):
+        # Virtual layers are computed in the first stage, and registered in the second
+        registration = self.progress.subtask(20, 100)
+
         # Translational transformation
         def show_progress(current_iteration, end_iteration):
-            self.intReady.emit(current_iteration * 100 / end_iteration)
+            registration.advance(current_iteration, end_iteration)
 
         sr = StackReg(StackReg.RIGID_BODY)
+        self.model.images[_i_img].materialize(progress=self.progress.subtask(0, 20))
         img = self.model.images[_i_img]._image._imgs
         self.imagename = self.model.names[_i_img]
         # register to first image
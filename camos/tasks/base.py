@@ -1,6 +1,6 @@
 # -*- coding: utf-8 -*-
 # Created on Sat Jun 05 2021
-# Last modified on Mon Jun 07 2021
+# Last modified on Sun Oct 18 2026
 # Copyright (c) CaMOS Development Team. All Rights Reserved.
 # Distributed under a MIT License. See LICENSE for more info.
 
@@ -12,6 +12,7 @@ import numpy as np
 import os
 
 from camos.tasks.runtask import RunTask
+from camos.tasks.progress import ProgressReporter
 from camos.model.inputdata import InputData
 from camos.utils.generategui import CreateGUI
 
@@ -35,12 +36,15 @@ class BaseTask(QObject):
         self.paramDict = {}
         self.handler = RunTask(self)
         self.notify.connect(self.handler.on_notify)
+        # Rate-limited progress of the task, forwarded to the progress bar of the handler
+        self.progress = ProgressReporter(self.intReady.emit)
 
     def _run(self, **kwargs):
         pass
 
     @pyqtSlot()
     def run(self):
+        self.progress.reset()
         try:
             self._run(**self.paramDict)
             self.handler.success = True
@@ -48,6 +52,7 @@ class BaseTask(QObject):
         except Exception as e:
             self.exc = e
         finally:
+            self.progress.flush()
             self.finished.emit()
 
     def output_to_signalmodel(self):
@@ -0,0 +1,63 @@
+# -*- coding: utf-8 -*-
+# Created on Sun Oct 18 2026
+# Last modified on Sun Oct 18 2026
+# Copyright (c) CaMOS Development Team. All Rights Reserved.
+# Distributed under a MIT License. See LICENSE for more info.
+
+import numpy as np
+
+from camos.model.events import EVENT_TYPE
+
+
+class EventTable:
+    """Collects the rows of a table of events (or any table keyed by CellID) in chunks,
+    i.e., all the events of a cell at once, and builds the structured array once at the
+    end, instead of copying the whole table for every new row.
+
+    The result has the layout used across the plugins: a structured array with shape
+    (rows, 1), whose first field is CellID.
+    """
+
+    def __init__(self, dtype=EVENT_TYPE):
+        """Initialization of the object
+
+        Args:
+            dtype (list, optional): fields of the table, the first one being CellID. Defaults to EVENT_TYPE.
+        """
+        self.dtype = np.dtype(dtype)
+        self._chunks = []
+        self._rows = 0
+
+    def __len__(self):
+        return self._rows
+
+    def add(self, cells, *columns):
+        """Adds a chunk of rows
+
+        Args:
+            cells (int or np.ndarray): CellID of the rows, a single one for all of them, or one per row
+            columns (np.ndarray): values of the rest of fields, in order, one per row
+        """
+        if len(columns) != len(self.dtype.names) - 1:
+            raise ValueError(
+                "Expected {} columns besides the CellID".format(len(self.dtype.names) - 1)
+            )
+        columns = [np.asarray(c).ravel() for c in columns]
+        rows = len(columns[0]) if len(columns) > 0 else np.size(cells)
+        if rows == 0:
+            return
+        cells = np.broadcast_to(np.asarray(cells).ravel(), (rows,))
+        self._chunks.append([cells] + columns)
+        self._rows += rows
+
+    def to_array(self):
+        """Concatenates all the chunks
+
+        Returns:
+            np.ndarray: structured array with shape (rows, 1)
+        """
+        out = np.zeros(shape=(self._rows, 1), dtype=self.dtype)
+        for k, name in enumerate(self.dtype.names):
+            if self._rows > 0:
+                out[:, 0][name] = np.concatenate([chunk[k] for chunk in self._chunks])
+        return out
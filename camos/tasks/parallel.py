@@ -0,0 +1,155 @@
+# -*- coding: utf-8 -*-
+# Created on Sun Oct 18 2026
+# Last modified on Sun Oct 18 2026
+# Copyright (c) CaMOS Development Team. All Rights Reserved.
+# Distributed under a MIT License. See LICENSE for more info.
+
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+
+try:
+    from multiprocessing import shared_memory
+except ImportError:
+    # Python 3.7 has no shared memory; map_rows runs the serial loop
+    shared_memory = None
+
+import camos.utils.apptools as apptools
+
+# Maximum number of rows processed by a worker per task
+BATCH_ROWS = 16
+
+# Starting a pool of processes (spawning them and importing CaMOS in each) takes some
+# seconds, so rows are processed serially if the serial loop is estimated to take less
+# than SERIAL_SECONDS; the estimate is measured on the first rows, for up to PROBE_SECONDS
+SERIAL_SECONDS = 10
+PROBE_SECONDS = 1
+
+
+def get_workers():
+    """Number of worker processes, from the preferences (0 stands for all the cores).
+    It reads the configuration of the GUI, so it must be called from the GUI thread,
+    i.e., when the task is created, and passed to the code running in the task thread.
+    """
+    try:
+        config = apptools.getGui().configuration.readConfiguration()
+        workers = int(config["Performance/Workers"])
+    except Exception:
+        workers = 0
+    return workers if workers > 0 else os.cpu_count() or 1
+
+
+def _attach(name):
+    """Opens a shared memory block created by the main process, which owns it
+    """
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)
+    except TypeError:
+        # Before Python 3.13, the block is also registered by the worker, in the
+        # resource tracker it shares with the main process
+        return shared_memory.SharedMemory(name=name)
+
+
+def _apply(func, data, rows, args, batched):
+    if batched:
+        return list(func(data[rows.start : rows.stop], *args))
+    return [func(data[i], *args) for i in rows]
+
+
+def _run_rows(name, shape, dtype, rows, func, args, batched):
+    shm = _attach(name)
+    try:
+        data = np.ndarray(shape, dtype=dtype, buffer=shm.buf)
+        results = _apply(func, data, rows, args, batched)
+        # The view must be released before closing the block
+        del data
+        return results
+    finally:
+        shm.close()
+
+
+def map_rows(func, data, args=(), workers=None, progress=None, batched=False):
+    """Applies a function to every row of an array, in a pool of processes. The array
+    is copied once into shared memory, which the workers read without pickling it;
+    rows are sent in batches, and the results are returned in the order of the rows,
+    so they match those of the serial loop. The serial loop is used with a single
+    worker, without shared memory (before Python 3.8), or when it is estimated to
+    take less than SERIAL_SECONDS, from the time taken by the first rows.
+
+    Args:
+        func (callable): module-level function, called as func(row, *args)
+        data (np.ndarray): the rows, along the first axis
+        args (tuple, optional): further arguments of func, pickled once per batch. Defaults to ().
+        workers (int, optional): number of processes, i.e., get_workers() read in the
+            GUI thread. Defaults to the number of CPUs.
+        progress (callable, optional): receives the percentage of rows processed,
+            i.e., the progress reporter of the running task. Defaults to None.
+        batched (bool, optional): whether func takes a batch of rows (2D) at once,
+            returning one result per row. Defaults to False.
+
+    Returns:
+        list: the results of func, one per row
+    """
+    data = np.ascontiguousarray(data)
+    n = len(data)
+    workers = (os.cpu_count() or 1) if workers is None else int(workers)
+    parallel = workers > 1 and n > 1 and shared_memory is not None
+
+    # The first rows are processed here, which measures the time of the serial loop
+    step = BATCH_ROWS if batched else 1
+    results = []
+    start = time.perf_counter()
+    while len(results) < n:
+        elapsed = time.perf_counter() - start
+        if parallel and len(results) > 0 and elapsed > PROBE_SECONDS:
+            if elapsed * (n - len(results)) / len(results) > SERIAL_SECONDS:
+                break
+            parallel = False
+        a = len(results)
+        results += _apply(func, data, range(a, min(n, a + step)), args, batched)
+        if progress is not None:
+            progress(int(len(results) * 100 / n))
+    if len(results) == n:
+        return results
+
+    done = len(results)
+    batch = int(max(1, min(BATCH_ROWS, (n - done) // (workers * 4))))
+    batches = [range(a, min(n, a + batch)) for a in range(done, n, batch)]
+    results += [None] * (n - done)
+    shm = shared_memory.SharedMemory(create=True, size=max(1, data.nbytes))
+    try:
+        shared = np.ndarray(data.shape, dtype=data.dtype, buffer=shm.buf)
+        shared[:] = data
+        del shared
+
+        # Workers are spawned, as forking a process running Qt threads is unsafe
+        context = multiprocessing.get_context("spawn")
+        with ProcessPoolExecutor(
+            max_workers=min(workers, len(batches)), mp_context=context
+        ) as pool:
+            jobs = {
+                pool.submit(
+                    _run_rows,
+                    shm.name,
+                    data.shape,
+                    data.dtype.str,
+                    b,
+                    func,
+                    args,
+                    batched,
+                ): b
+                for b in batches
+            }
+            for job in as_completed(jobs):
+                rows = jobs[job]
+                results[rows.start : rows.stop] = job.result()
+                done += len(rows)
+                if progress is not None:
+                    progress(int(done * 100 / n))
+    finally:
+        shm.close()
+        shm.unlink()
+    return results
@@ -0,0 +1,109 @@
+# -*- coding: utf-8 -*-
+# Created on Sun Oct 18 2026
+# Last modified on Sun Oct 18 2026
+# Copyright (c) CaMOS Development Team. All Rights Reserved.
+# Distributed under a MIT License. See LICENSE for more info.
+
+import threading
+import time
+
+# Maximum number of progress updates sent to the GUI per second
+MAX_RATE = 20
+
+
+class ProgressReporter:
+    """Forwards the progress of a task, as an integer percentage, to a callback (i.e.,
+    BaseTask.intReady.emit, which wakes the GUI thread). Updates are cheap to make in
+    inner loops: only changed percentages are forwarded, at most MAX_RATE times per
+    second, and the latest one is sent when the task ends (see flush).
+
+    It is called with a percentage, as any progress callback; subtask gives the
+    reporter of a stage of the task, which maps its 0-100% into a part of this one.
+    """
+
+    def __init__(self, callback, rate=MAX_RATE):
+        """Initialization of the object
+
+        Args:
+            callback (callable): receives the integer percentage
+            rate (float, optional): maximum number of updates per second. Defaults to MAX_RATE.
+        """
+        self.callback = callback
+        self.interval = 1.0 / rate
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        """Restarts the progress, i.e., when the task is run again
+        """
+        with self._lock:
+            self._value = 0
+            self._sent = None
+            self._time = 0.0
+
+    @property
+    def value(self):
+        """Latest percentage, even if not forwarded yet
+        """
+        return self._value
+
+    def __call__(self, percent):
+        """Updates the progress
+
+        Args:
+            percent (float): percentage of the task done
+        """
+        value = int(min(max(percent, 0), 100))
+        with self._lock:
+            self._value = value
+            if value == self._sent:
+                return
+            now = time.monotonic()
+            if now - self._time < self.interval and value < 100:
+                return
+            self._sent, self._time = value, now
+        self.callback(value)
+
+    def advance(self, done, total):
+        """Updates the progress from a number of steps done, out of total
+        """
+        self(done * 100 / total if total else 100)
+
+    def flush(self):
+        """Forwards the latest percentage, if it was held back by the rate limit
+        """
+        with self._lock:
+            value = self._value
+            if value == self._sent:
+                return
+            self._sent, self._time = value, time.monotonic()
+        self.callback(value)
+
+    def subtask(self, start, end):
+        """Reporter of a stage of the task, which spans from start to end percent of it
+
+        Returns:
+            SubProgress: called with the percentage of the stage
+        """
+        return SubProgress(self, start, end)
+
+
+class SubProgress:
+    """Progress of a stage of a task, mapped into a part of the progress of its parent
+    (a ProgressReporter, or another SubProgress, for nested stages)
+    """
+
+    def __init__(self, parent, start, end):
+        self.parent = parent
+        self.start = start
+        self.end = end
+
+    def __call__(self, percent):
+        percent = min(max(percent, 0), 100)
+        self.parent(self.start + (self.end - self.start) * percent / 100)
+
+    def advance(self, done, total):
+        self(done * 100 / total if total else 100)
+
+    def subtask(self, start, end):
+        return SubProgress(self, start, end)
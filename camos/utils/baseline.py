@@ -0,0 +1,140 @@
+# -*- coding: utf-8 -*-
+# Created on Sun Oct 18 2026
+# Last modified on Sun Oct 18 2026
+# Copyright (c) CaMOS Development Team. All Rights Reserved.
+# Distributed under a MIT License. See LICENSE for more info.
+
+import numpy as np
+from numpy.lib.stride_tricks import as_strided
+
+# Maximum number of values of the windows processed at once
+CHUNK_VALUES = 2 ** 24
+
+# Values of each window used by the approximate mode
+APPROX_VALUES = 256
+
+# Modes of the baseline: every frame, on a decimated grid, or also from subsampled windows
+MODES = ["exact", "decimated", "approximate"]
+
+# Statistics of the values of a window: the percentile, or the mean of the values below it
+STATISTICS = ["percentile", "trimmed_mean"]
+
+
+def _windows(F, window):
+    """Read-only view of the windows preceding every frame, with shape
+    (traces, frames - window, window); window t holds the frames t to t + window - 1
+    """
+    N, T = F.shape
+    s0, s1 = F.strides
+    return as_strided(
+        F, shape=(N, T - window, window), strides=(s0, s1, s1), writeable=False
+    )
+
+
+def _window_statistic(x, percentile, statistic):
+    """Statistic of the values along the last axis of x
+    """
+    p = np.percentile(x, percentile, axis=-1)
+    if statistic == "percentile":
+        return p
+    below = x < p[..., None]
+    count = below.sum(axis=-1)
+    total = np.where(below, x, 0).sum(axis=-1)
+    # Windows with no values below the percentile (i.e., constant) take the percentile
+    return np.divide(total, count, out=p.copy(), where=count > 0)
+
+
+def _sliding(F, window, percentile, statistic, positions, stride=1):
+    """Baseline at the given frames (all >= window), from the preceding window of frames,
+    of which one every stride frames is used
+    """
+    windows = _windows(F, window)[:, :, ::-1][:, :, ::stride]
+    out = np.empty((F.shape[0], len(positions)), dtype=F.dtype)
+    chunk = max(1, CHUNK_VALUES // max(1, F.shape[0] * windows.shape[2]))
+    for a in range(0, len(positions), chunk):
+        idx = positions[a : a + chunk] - window
+        out[:, a : a + chunk] = _window_statistic(windows[:, idx], percentile, statistic)
+    return out
+
+
+def _interpolate(values, positions, frames):
+    """Linearly interpolates the values of every trace, known at positions, onto frames
+    """
+    out = np.empty((values.shape[0], len(frames)), dtype=values.dtype)
+    for n in range(values.shape[0]):
+        out[n] = np.interp(frames, positions, values[n])
+    return out
+
+
+def baseline(
+    F,
+    window,
+    percentile=50,
+    statistic="trimmed_mean",
+    mode="exact",
+    step=None,
+    dtype=np.float32,
+):
+    """Computes the sliding baseline (F0) of many traces at once. The baseline of a frame
+    is a low percentile, or the mean of the values below that percentile, of the preceding
+    window of frames; for the first window, the minimum of the window is used.
+
+    Args:
+        F (np.ndarray): traces, with shape (traces, frames)
+        window (int): number of frames of the window, i.e., the window in seconds times the sampling rate
+        percentile (float, optional): percentile of the window. Defaults to 50.
+        statistic (str, optional): "percentile" or "trimmed_mean", see STATISTICS. Defaults to "trimmed_mean".
+        mode (str, optional): "exact" for every frame; "decimated" to compute it every step frames
+            and interpolate; "approximate" to also use about APPROX_VALUES frames of each window.
+            Defaults to "exact".
+        step (int, optional): frames between computed values, for the decimated and approximate modes.
+            Defaults to a tenth of the window.
+        dtype (np.dtype, optional): type of the computation and of the result. Defaults to np.float32.
+
+    Returns:
+        np.ndarray: the baseline, with the shape of F
+    """
+    if mode not in MODES:
+        raise ValueError("The mode must be one of {}".format(MODES))
+    if statistic not in STATISTICS:
+        raise ValueError("The statistic must be one of {}".format(STATISTICS))
+
+    F = np.ascontiguousarray(np.atleast_2d(F), dtype=dtype)
+    N, T = F.shape
+    if T == 0:
+        return np.empty_like(F)
+    window = int(max(1, min(window, T)))
+    F0 = np.empty_like(F)
+    F0[:, :window] = F[:, :window].min(axis=1, keepdims=True)
+    if window >= T:
+        return F0
+
+    step = int(max(1, window // 10 if step is None else step))
+    frames = np.arange(window, T)
+    if mode == "exact" or step == 1:
+        F0[:, window:] = _sliding(F, window, percentile, statistic, frames)
+    else:
+        # Computed every step frames, and interpolated; the approximate mode
+        # also takes about APPROX_VALUES evenly spaced frames of each window
+        stride = max(1, window // APPROX_VALUES) if mode == "approximate" else 1
+        positions = np.unique(np.r_[frames[::step], T - 1])
+        values = _sliding(F, window, percentile, statistic, positions, stride)
+        F0[:, window:] = _interpolate(values, positions, frames)
+    return F0
+
+
+def dff(F, fps, window, percentile=50, statistic="trimmed_mean", mode="exact", step=None):
+    """Computes dF/F0 of many traces, with a sliding baseline (see baseline)
+
+    Args:
+        F (np.ndarray): traces, with shape (traces, frames)
+        fps (float): sampling rate, in frames per second
+        window (float): duration of the window, in seconds
+
+    Returns:
+        np.ndarray: dF/F0, as float32 with the shape of F
+    """
+    F = np.atleast_2d(np.asarray(F, dtype=np.float32))
+    F0 = baseline(F, int(round(window * fps)), percentile, statistic, mode, step)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return (F - F0) / F0
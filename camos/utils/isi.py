@@ -0,0 +1,118 @@
+# -*- coding: utf-8 -*-
+# Created on Sun Oct 18 2026
+# Last modified on Sun Oct 18 2026
+# Copyright (c) CaMOS Development Team. All Rights Reserved.
+# Distributed under a MIT License. See LICENSE for more info.
+
+import numpy as np
+
+from camos.model.events import EventIndex, TIME_FIELD
+
+# Number of bins of the log-ISI histograms
+LOG_BINS = 50
+
+
+class Intervals:
+    """Interspike intervals (ISI) of every cell of a table of events, from its index
+    (see EventIndex), which holds the events sorted by cell and time; the intervals of
+    the k-th cell are isi[offsets[k]:offsets[k + 1]], so statistics are reduced for all
+    cells at once. Cells with a single event have no intervals, and NaN statistics.
+    """
+
+    def __init__(self, index):
+        """Initialization of the object
+
+        Args:
+            index (EventIndex): index of the events, i.e., from SignalViewModel.get_events
+        """
+        self.cells = index.cells
+        self.events = index.counts
+
+        # Differences between consecutive events of the same cell
+        times = index.times
+        same = np.ones(max(0, len(times) - 1), dtype=bool)
+        same[np.cumsum(self.events)[:-1] - 1] = False
+        self.isi = np.diff(times)[same]
+        self.counts = np.maximum(self.events - 1, 0)
+        self.offsets = np.r_[0, np.cumsum(self.counts)].astype(np.intp)
+
+    @classmethod
+    def from_events(cls, cells, times):
+        """Intervals of events given by columns
+
+        Args:
+            cells (np.ndarray): CellID of every event, i.e., data[:]["CellID"]
+            times (np.ndarray): time of every event, i.e., data[:]["Active"]
+        """
+        cells = np.asarray(cells).ravel()
+        data = np.zeros(len(cells), dtype=[("CellID", cells.dtype), (TIME_FIELD, "f8")])
+        data["CellID"] = cells
+        data[TIME_FIELD] = np.asarray(times, dtype=np.float64).ravel()
+        return cls(EventIndex(data))
+
+    def __len__(self):
+        return len(self.cells)
+
+    def _reduce(self, values):
+        """Sums the values of every cell; NaN for cells without intervals
+        """
+        out = np.full(len(self), np.nan)
+        nonempty = self.counts > 0
+        if nonempty.any():
+            out[nonempty] = np.add.reduceat(values, self.offsets[:-1][nonempty])
+        return out
+
+    def segments(self):
+        """Index of the cell of every interval
+        """
+        return np.repeat(np.arange(len(self)), self.counts)
+
+    def mean(self):
+        with np.errstate(invalid="ignore"):
+            return self._reduce(self.isi) / self.counts
+
+    def std(self):
+        mean = self.mean()
+        deviations = self.isi - np.repeat(mean, self.counts)
+        with np.errstate(invalid="ignore"):
+            return np.sqrt(self._reduce(deviations ** 2) / self.counts)
+
+    def cv(self):
+        """Coefficient of variation (standard deviation over mean) of the intervals of every cell
+        """
+        with np.errstate(invalid="ignore", divide="ignore"):
+            return self.std() / self.mean()
+
+    def median(self):
+        out = np.full(len(self), np.nan)
+        nonempty = self.counts > 0
+        if not nonempty.any():
+            return out
+        # Intervals sorted within every cell; the median is at the middle of each segment
+        isi = self.isi[np.lexsort((self.isi, self.segments()))]
+        start, n = self.offsets[:-1][nonempty], self.counts[nonempty]
+        out[nonempty] = (isi[start + (n - 1) // 2] + isi[start + n // 2]) / 2
+        return out
+
+    def log_histograms(self, bins=LOG_BINS, range=None):
+        """Histograms of the log10 of the intervals of every cell, with common bins
+
+        Args:
+            bins (int, optional): number of bins. Defaults to LOG_BINS.
+            range (tuple, optional): lower and upper log10(ISI). Defaults to the range of all intervals.
+
+        Returns:
+            tuple: counts with shape (cells, bins), and the bin edges (in log10 units)
+        """
+        positive = self.isi > 0
+        logs = np.log10(self.isi[positive])
+        segments = self.segments()[positive]
+        if range is None:
+            range = (logs.min(), logs.max()) if len(logs) > 0 else (0.0, 1.0)
+        edges = np.linspace(range[0], range[1], bins + 1)
+        inside = (logs >= edges[0]) & (logs <= edges[-1])
+        b = np.clip(np.searchsorted(edges, logs[inside], side="right") - 1, 0, bins - 1)
+        counts = np.bincount(
+            segments[inside] * bins + b, minlength=len(self) * bins
+        ).reshape(len(self), bins)
+        return counts, edges
@@ -5,6 +5,8 @@ import sys
 
 import camos.utils.errormessages as cfgexception
 import camos.utils.apptools as apptools
+import camos.model.scratch as scratch
+from camos.model.chunkstore import LAYOUTS
 
 __docformat__ = "restructuredtext"
 __version__ = "0.1a"
@@ -178,6 +180,54 @@ class Config(QtCore.QSettings):
         else:
             return default_value
 
+    def scratchLocation(self):
+        """Returns the folder for the temporary files of the stacks not kept in RAM
+        """
+
+        key = "Performance/Scratch_location"
+        default_value = scratch.default_root()
+        setting_value = self.value(key)
+        if isinstance(setting_value, str) and setting_value != "":
+            return setting_value
+        else:
+            return default_value
+
+    def scratchQuota(self):
+        """Returns the maximum size of the temporary files, in GB (0 for no limit)
+        """
+
+        key = "Performance/Scratch_quota"
+        default_value = 0
+        setting_value = self.value(key)
+        try:
+            return int(setting_value)
+        except (TypeError, ValueError):
+            return default_value
+
+    def chunkLayout(self):
+        """Returns the chunk layout of the stacks not kept in RAM
+        """
+
+        key = "Performance/Chunk_layout"
+        default_value = "None"
+        setting_value = self.value(key)
+        if setting_value in ["None"] + LAYOUTS:
+            return setting_value
+        else:
+            return default_value
+
+    def performanceWorkers(self):
+        """Returns the number of processes of parallel tasks (0 for all the cores)
+        """
+
+        key = "Performance/Workers"
+        default_value = 0
+        setting_value = self.value(key)
+        try:
+            return int(setting_value)
+        except (TypeError, ValueError):
+            return default_value
+
     def writeValue(self, key, value):
         """
         Write an entry to the configuration file.
@@ -214,6 +264,10 @@ class Config(QtCore.QSettings):
         config["Units/Length"] = self.unitsLength()
         config["Units/Time"] = self.unitsTime()
         config["Performance/RAM_persistence"] = self.performanceRAM()
+        config["Performance/Scratch_location"] = self.scratchLocation()
+        config["Performance/Scratch_quota"] = self.scratchQuota()
+        config["Performance/Chunk_layout"] = self.chunkLayout()
+        config["Performance/Workers"] = self.performanceWorkers()
         return config
 
     def applyConfiguration(self, config, gui):
@@ -276,6 +330,27 @@ class Config(QtCore.QSettings):
         if key in config:
             self.RAM_persistence = config[key]
 
+        key = "Performance/Scratch_location"
+        if key in config:
+            self.scratch_location = config[key]
+
+        key = "Performance/Scratch_quota"
+        if key in config:
+            self.scratch_quota = config[key]
+
+        key = "Performance/Chunk_layout"
+        if key in config:
+            self.chunk_layout = config[key]
+
+        key = "Performance/Workers"
+        if key in config:
+            self.workers = config[key]
+
+        scratch.configure(
+            getattr(self, "scratch_location", None),
+            getattr(self, "scratch_quota", 0) * 2 ** 30,
+        )
+
     def saveConfiguration(self):
         """
         Store current application settings on disk.
@@ -296,4 +371,8 @@ class Config(QtCore.QSettings):
         self.writeValue("Units/Length", self.units_length)
         self.writeValue("Units/Time", self.units_time)
         self.writeValue("Performance/RAM_persistence", self.RAM_persistence)
+        self.writeValue("Performance/Scratch_location", self.scratch_location)
+        self.writeValue("Performance/Scratch_quota", self.scratch_quota)
+        self.writeValue("Performance/Chunk_layout", self.chunk_layout)
+        self.writeValue("Performance/Workers", self.workers)
         self.sync()
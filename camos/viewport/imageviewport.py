@@ -1,12 +1,12 @@
 # -*- coding: utf-8 -*-
 # Created on Sat Jun 05 2021
-# Last modified on Mon Jun 07 2021
+# Last modified on Sun Oct 18 2026
 # Copyright (c) CaMOS Development Team. All Rights Reserved.
 # Distributed under a MIT License. See LICENSE for more info.
 
 import pyqtgraph as pg
-from PyQt5 import QtCore
-from PyQt5.QtCore import QPointF
+from PyQt5 import QtCore, QtGui
+from PyQt5.QtCore import QPointF, pyqtSignal
 
 import numpy as np
 
@@ -14,16 +14,43 @@ import camos.viewport.mpl_cmaps_in_ImageItem as cmaps
 import camos.utils.apptools as apptools
 from camos.utils.settings import Config
 from camos.utils.units import get_length
+from camos.model.pyramid import ImagePyramid, pyramid_key
+from camos.model.prefetch import FramePrefetcher
+from camos.model.image import on_disk
+
+# Images with any side larger than this are displayed through a tile pyramid
+LARGE_IMAGE = 10000
+
+# Time a frame must stay displayed before its pyramid is built, in milliseconds,
+# so scrubbing through a stack does not build the pyramids of the frames it passes
+PYRAMID_DELAY = 300
+
+
+def _is_large(image):
+    return image.shape[0] > LARGE_IMAGE or image.shape[1] > LARGE_IMAGE
+
+
+def _prefetched(data):
+    """Whether the frames of a stack are read ahead in the background: stacks on disk
+    or computed, unless their frames are displayed by tiles
+    """
+    in_ram = isinstance(data, np.ndarray) and not on_disk(data)
+    return not in_ram and max(data.shape[1:3]) <= LARGE_IMAGE
 
 
 class ImageViewPort(pg.ImageView):
 
+    # For frames decoded in the background, with the stack and the index
+    sigFrameDecoded = pyqtSignal(object, int)
+
     # constructor which inherit original
     # ImageView
     def __init__(self, model=None, parent=None, *args, **kwargs):
         self.pixelsize = 1
         pg.ImageView.__init__(self, *args, **kwargs)
         self.model = model
+        self.prefetch = FramePrefetcher(callback=self.sigFrameDecoded.emit)
+        self.sigFrameDecoded.connect(self._frame_decoded)
         self.parent = parent
         self.configuration = Config()
         self.current_configuration = self.configuration.readConfiguration()
@@ -64,15 +91,35 @@ class ImageViewPort(pg.ImageView):
         x_min, x_max = event.viewRange()[0]
         new_sz = max(round((x_max - x_min) / 10), 10)
         self._update_scalebar(new_sz)
-        pass
+        self.update_pyramids()
+
+    def update_pyramids(self):
+        """Renders, for every large layer, the tiles and level matching the current view
+        """
+        view_rect = self.view.viewRect()
+        screen = max(1, self.view.width(), self.view.height())
+        for item in self.view.addedItems:
+            if isinstance(item, PyramidImage):
+                item.render_view(
+                    item.mapRectFromItem(self.view.childGroup, view_rect), screen
+                )
 
     # All functions below have similar code now, just as a placeholder
     def load_image(self, layer=-1):
         # Get the image from the model
-        image = self.model.get_layer(layer=layer)
+        image = self.model.get_layer(layer=layer, lazy=True)
 
         # Setup the display object
-        item = DrawingImage(image=image, model=self.model)
+        stats = self.model.get_layer_stats(layer)
+        if _is_large(image):
+            item = PyramidImage(
+                image=image,
+                model=self.model,
+                key=self._pyramid_key(layer),
+                stats=stats,
+            )
+        else:
+            item = DrawingImage(image=np.asarray(image), model=self.model, stats=stats)
 
         # Determine if the layer is the last one, or already exists on the viewport
         if layer == -1:
@@ -85,10 +132,6 @@ class ImageViewPort(pg.ImageView):
         self.view.addItem(self.model.viewitems[layer])
         self.view.addedItems[-1].setOpts(opacity=op / 100, axisOrder="row-major")
 
-        # Do not update other features if the image is larger than...
-        if image.shape[0] > 10000 or image.shape[1] > 10000:
-            return
-
         # Update viewport colormap, scale and translation
         cmap = self.model.colormaps[-1]
         lut = cmaps.cmapToColormap(cmap).getLookupTable()
@@ -103,6 +146,13 @@ class ImageViewPort(pg.ImageView):
             self.model.translation[layer] = [0, 0]
             self.translate_position(layer, (x, y))
 
+        self.update_pyramids()
+
+    def _pyramid_key(self, layer):
+        return pyramid_key(
+            self.model.images[layer].file, self.model.get_layer_frame(layer)
+        )
+
     def center_position(self, **kwargs):
         pass
 
@@ -158,12 +208,41 @@ class ImageViewPort(pg.ImageView):
             self.ui.roiPlot.hide()
 
     def update_viewport_frame(self, layer=0):
-        image = self.model.get_layer(layer=layer)
-        self.view.addedItems[layer + 3].setImage(image)
+        data = self.model.images[layer]._image._imgs
+        if _prefetched(data):
+            # Frames are drawn from the cache; if not decoded yet, the frame is drawn
+            # by _frame_decoded, unless the timeline has moved on meanwhile
+            image = self.prefetch.show(
+                data,
+                self.model.get_layer_frame(layer),
+                owner=self.model.images[layer]._image,
+            )
+            if image is None:
+                return
+        else:
+            # The frames of the previous stack of the layer, if any, are not needed
+            self.prefetch.discard(self.model.images[layer]._image)
+            image = self.model.get_layer(layer=layer, lazy=True)
+        item = self.view.addedItems[layer + 3]
+        if isinstance(item, PyramidImage):
+            item.setImage(image, key=self._pyramid_key(layer), autoLevels=False)
+            self.update_pyramids()
+        else:
+            # The levels of the stack are kept, instead of recomputed for every frame
+            item.setImage(np.asarray(image), autoLevels=False)
         self.model.viewitems[layer] = self.view.addedItems[layer + 3]
 
+    def _frame_decoded(self, data, i):
+        for layer, image in enumerate(self.model.images):
+            if image._image._imgs is data and self.model.get_layer_frame(layer) == i:
+                self.update_viewport_frame(layer)
+
     def remove_image(self, layer=0):
-        self.view.removeItem(self.view.addedItems[layer + 3])
+        item = self.view.addedItems[layer + 3]
+        if isinstance(item, PyramidImage):
+            item.release()
+        self.view.removeItem(item)
+        self.prefetch.retain([image._image for image in self.model.images])
 
     def mouse_moved(self, event):
         if len(self.view.addedItems) <= 3:
@@ -217,9 +296,48 @@ class DrawingImage(pg.ImageItem):
     ctrl_modif = False
     _xi, _yi = 0, 0
 
-    def __init__(self, image, model, **kargs):
-        super().__init__(image=image, **kargs)
+    sigStatsReady = pyqtSignal()
+
+    def __init__(self, image, model, stats=None, **kargs):
+        super().__init__(**kargs)
         self.model = model
+        self.stats = stats
+        self._stats_levels = None
+        if stats is not None:
+            self.sigStatsReady.connect(self._stats_ready)
+            stats.on_ready(self._emit_stats_ready)
+        if image is not None:
+            self.setImage(image)
+
+    def setImage(self, image=None, autoLevels=None, **kargs):
+        # Unless told otherwise, levels come from the statistics of the whole stack
+        stats = getattr(self, "stats", None)
+        if autoLevels is None and "levels" not in kargs and stats is not None:
+            self._stats_levels = stats.levels()
+            kargs["levels"] = self._stats_levels
+            autoLevels = False
+        super().setImage(image, autoLevels=autoLevels, **kargs)
+
+    def getHistogram(self, *args, **kwargs):
+        stats = getattr(self, "stats", None)
+        if stats is None or self.image is None or kwargs.get("perChannel", False):
+            return super().getHistogram(*args, **kwargs)
+        return stats.histogram()
+
+    def _emit_stats_ready(self):
+        # Called from the statistics thread; the signal is queued to the GUI thread
+        try:
+            self.sigStatsReady.emit()
+        except RuntimeError:
+            # The item was removed from the viewport meanwhile
+            pass
+
+    def _stats_ready(self):
+        # Levels are only replaced if the user has not changed the estimated ones
+        if self._stats_levels is not None and list(self.levels) == self._stats_levels:
+            self._stats_levels = self.stats.levels()
+            self.setLevels(self._stats_levels)
+        self.sigImageChanged.emit()
 
     def changeScale(self, s_x, s_y):
         p_x, p_y = self.previous_scale
@@ -285,3 +403,142 @@ class DrawingImage(pg.ImageItem):
 
     def __setstate__(self, d):
         self.__dict__ = d
+
+
+class PyramidImage(DrawingImage):
+    """Display object for images too large to be drawn at once.
+    The item keeps the coordinates of the full resolution image, but only holds a
+    small overview (used for the histogram and levels); a child item shows the tiles
+    of the pyramid level that match the visible region of the viewport.
+    """
+
+    sigPyramidReady = pyqtSignal()
+
+    def __init__(self, image, model, key=None, stats=None, **kargs):
+        super().__init__(image=None, model=model, stats=stats, **kargs)
+        self.pyramid = None
+        self._rendered = None
+        self._last_view = None
+        self.tiles = pg.ImageItem()
+        self.tiles.setOpts(axisOrder="row-major")
+        self.tiles.setAcceptedMouseButtons(QtCore.Qt.NoButton)
+        self.tiles.setParentItem(self)
+        self.sigPyramidReady.connect(self._pyramid_ready)
+        self._build_timer = QtCore.QTimer()
+        self._build_timer.setSingleShot(True)
+        self._build_timer.setInterval(PYRAMID_DELAY)
+        self._build_timer.timeout.connect(self._build_pyramid)
+        self.setImage(image, key=key)
+
+    def _is_source(self, image):
+        """Whether the image is the one the current pyramid was built from
+        """
+        if self.pyramid is None:
+            return False
+        source = self.pyramid.levels[0]
+        if not hasattr(image, "__array_interface__"):
+            # Lazy frames (i.e., VirtualFrame) are identified by their key
+            return getattr(image, "key", None) == getattr(source, "key", False)
+        if not hasattr(source, "__array_interface__"):
+            return False
+        return (
+            image.shape == source.shape
+            and image.__array_interface__["data"][0]
+            == source.__array_interface__["data"][0]
+        )
+
+    def setImage(self, image=None, key=None, **kargs):
+        if image is not None and not self._is_source(image):
+            self.release()
+            self.pyramid = ImagePyramid(image, key=key)
+            self._rendered = None
+            if not self.pyramid.ready:
+                # Meanwhile, the missing levels are read with a stride from the frame
+                self._build_timer.start()
+            image = self.pyramid.overview()
+        super().setImage(image, **kargs)
+        self.tiles.setLevels(self.levels)
+
+    def _build_pyramid(self):
+        if self.pyramid is not None:
+            self.pyramid.build(callback=self._emit_ready)
+
+    def release(self):
+        """Gives back the files of the pyramid, once the item is not displayed
+        """
+        self._build_timer.stop()
+        if self.pyramid is not None:
+            self.pyramid.release()
+            self.pyramid = None
+
+    def _emit_ready(self):
+        # Called from the building thread; the signal is queued to the GUI thread
+        try:
+            self.sigPyramidReady.emit()
+        except RuntimeError:
+            # The item was removed from the viewport meanwhile
+            pass
+
+    def _pyramid_ready(self):
+        self._rendered = None
+        if self._last_view is not None:
+            self.render_view(*self._last_view)
+
+    def width(self):
+        if getattr(self, "pyramid", None) is None:
+            return None
+        return self.pyramid.shape[1]
+
+    def height(self):
+        if getattr(self, "pyramid", None) is None:
+            return None
+        return self.pyramid.shape[0]
+
+    def paint(self, p, *args):
+        # The tiles are drawn by the child item
+        if self.border is not None:
+            p.setPen(self.border)
+            p.drawRect(self.boundingRect())
+
+    def setLevels(self, levels, update=True):
+        super().setLevels(levels, update=update)
+        if hasattr(self, "tiles"):
+            self.tiles.setLevels(levels, update=update)
+
+    def setLookupTable(self, lut, update=True):
+        super().setLookupTable(lut, update=update)
+        if hasattr(self, "tiles"):
+            self.tiles.setLookupTable(lut, update=update)
+
+    def render_view(self, rect, screen):
+        """Shows the tiles covering the visible region, at the level matching the zoom
+
+        Args:
+            rect (QRectF): visible region, in full resolution pixel coordinates
+            screen (int): size of the viewport in screen pixels
+        """
+        self._last_view = (rect, screen)
+        if self.pyramid is None:
+            return
+
+        h, w = self.pyramid.shape
+        y0, y1 = max(0.0, rect.top()), min(float(h), rect.bottom())
+        x0, x1 = max(0.0, rect.left()), min(float(w), rect.right())
+        if y1 <= y0 or x1 <= x0:
+            self.tiles.hide()
+            return
+
+        level = self.pyramid.level_for(max(rect.width(), rect.height()) / screen)
+        tiles = self.pyramid.tile_range(level, y0, y1, x0, x1)
+        if (level, tiles) != self._rendered:
+            self._rendered = (level, tiles)
+            ty0, _, tx0, _ = tiles
+            f = 2 ** level
+            t = self.pyramid.tile
+            self.tiles.setImage(
+                self.pyramid.region(level, *tiles), autoLevels=False, levels=self.levels
+            )
+            self.tiles.setTransform(
+                QtGui.QTransform().translate(tx0 * t * f, ty0 * t * f).scale(f, f)
+            )
+        self.tiles.show()
@@ -1,6 +1,6 @@
 # -*- coding: utf-8 -*-
 # Created on Sat Jun 05 2021
-# Last modified on Mon Jun 07 2021
+# Last modified on Sun Oct 18 2026
 # Copyright (c) CaMOS Development Team. All Rights Reserved.
 # Distributed under a MIT License. See LICENSE for more info.
 
@@ -120,7 +120,7 @@ class SignalViewer(QObject):
     def mask_plot(self, name):
         mask = self.mask
         mask_dict = {}
-        for i in range(1, self.foutput.shape[0]):
+        for i in range(self.foutput.shape[0]):
             mask_dict[int(self.foutput[i]["CellID"][0])] = self.foutput[i][name][0]
 
         k = np.array(list(mask_dict.keys()))
@@ -1,6 +1,6 @@
 # -*- coding: utf-8 -*-
 # Created on Sat Jun 05 2021
-# Last modified on Mon Jun 07 2021
+# Last modified on Sun Oct 18 2026
 # Copyright (c) CaMOS Development Team. All Rights Reserved.
 # Distributed under a MIT License. See LICENSE for more info.
 
@@ -16,6 +16,7 @@ import pyqtgraph.parametertree as ptree
 import inspect
 
 from camos.utils.apptools import getApp
+from camos.model.events import EventIndex
 
 translate = QtCore.QCoreApplication.translate
 
@@ -32,13 +33,17 @@ def get_plotter_index(plotter):
 class SignalViewer2(QObject):
     window_title = "Signal Viewer"
 
-    def __init__(self, parent=None, signal=None, title="", mask=[], plotter=None):
+    def __init__(
+        self, parent=None, signal=None, title="", mask=[], plotter=None, events=None
+    ):
         super(SignalViewer2, self).__init__()
         self.parent = parent
         self.model = self.parent.model
         # self.parent.model.imagetoplot.connect(self.update_values_plot)
         self.output = signal
         self.foutput = self.output
+        # Index of the rows of the data by cell (see EventIndex), if it has a CellID column
+        self.events = events
         self.mask = mask
         self.pixelsize = 1
         self.title = title
@@ -144,7 +149,9 @@ class SignalViewer2(QObject):
             if self.output.dtype.names == None:
                 idx = values
             else:
-                idx = np.isin(self.output[:]["CellID"], np.array(values))
+                if self.events is None:
+                    self.events = EventIndex(self.output)
+                idx = self.events.select(values)
             self.foutput = self.output[idx]
         except Exception as e:
             print(str(e))
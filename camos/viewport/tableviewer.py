@@ -1,9 +1,10 @@
 # -*- coding: utf-8 -*-
 # Created on Sat Jun 05 2021
-# Last modified on Mon Jun 07 2021
+# Last modified on Sun Oct 18 2026
 # Copyright (c) CaMOS Development Team. All Rights Reserved.
 # Distributed under a MIT License. See LICENSE for more info.
 
+import numpy as np
 import pyqtgraph as pg
 
 
@@ -17,8 +18,9 @@ class TableViewer(pg.TableWidget):
         self.setWindowTitle(self.window_title.format(self.name))
 
     def display(self):
+        # Compact and disk-backed datasets are converted to arrays for the table
         if len(self.data) > 500:
-            self.setData(self.data[0:500])
+            self.setData(np.asarray(self.data[0:500]))
         else:
-            self.setData(self.data)
+            self.setData(np.asarray(self.data))
         self.show()
@@ -0,0 +1,19 @@
+# -*- coding: utf-8 -*-
+# Created on Sun Oct 18 2026
+# Last modified on Sun Oct 18 2026
+# Copyright (c) CaMOS Development Team. All Rights Reserved.
+# Distributed under a MIT License. See LICENSE for more info.
+
+import pytest
+
+import camos.model.scratch as scratch
+
+
+@pytest.fixture
+def scratch_space(tmp_path, monkeypatch):
+    """A scratch space of its own for the test, removed afterwards
+    """
+    space = scratch.ScratchSpace(str(tmp_path / "scratch"))
+    monkeypatch.setattr(scratch, "_scratch", space)
+    yield space
+    space.cleanup()
@@ -0,0 +1,69 @@
+# -*- coding: utf-8 -*-
+# Created on Sun Oct 18 2026
+# Last modified on Sun Oct 18 2026
+# Copyright (c) CaMOS Development Team. All Rights Reserved.
+# Distributed under a MIT License. See LICENSE for more info.
+
+import numpy as np
+import pytest
+
+from camos.utils.baseline import baseline, dff
+
+
+def _loop_dff(F, window, percentile=50):
+    """dF/F0 as computed by the loop of Extract Signal, with a window of
+    window frames both for the first block and afterwards
+    """
+    N, frames = F.shape
+    dF = np.zeros(F.shape)
+    F0 = np.min(F[:, 0:window], axis=1)
+    for k in range(window):
+        dF[:, k] = (F[:, k] - F0) / F0
+    for it in range(window, frames):
+        x = F[:, it - window : it]
+        p = np.percentile(x, percentile, axis=1)
+        F0 = np.zeros(N)
+        for n in range(N):
+            F0[n] = np.mean(x[n, np.where(x[n, :] < p[n])])
+        dF[:, it] = (F[:, it] - F0) / F0
+    return dF
+
+
+@pytest.fixture
+def traces():
+    rng = np.random.default_rng(0)
+    return (100 + 10 * rng.random((5, 300))).astype(np.float32)
+
+
+def test_dff_matches_loop(traces):
+    # The window is the duration in seconds times the sampling rate, in frames
+    fps, seconds = 10, 3
+    expected = _loop_dff(traces, fps * seconds)
+    np.testing.assert_allclose(dff(traces, fps, seconds), expected, rtol=1e-4, atol=1e-6)
+
+
+def test_percentile_statistic(traces):
+    F0 = baseline(traces, 20, percentile=30, statistic="percentile")
+    expected = np.percentile(traces[:, 80:100], 30, axis=1)
+    np.testing.assert_allclose(F0[:, 100], expected, rtol=1e-5)
+    np.testing.assert_allclose(F0[:, 0], traces[:, :20].min(axis=1))
+
+
+@pytest.mark.parametrize("mode", ["decimated", "approximate"])
+def test_decimated_modes_are_close(traces, mode):
+    exact = baseline(traces, 40)
+    approx = baseline(traces, 40, mode=mode, step=4)
+    assert approx.shape == exact.shape
+    np.testing.assert_allclose(approx, exact, rtol=0.05)
+
+
+def test_short_and_empty_traces():
+    F = np.arange(1, 7, dtype=np.float32).reshape(2, 3)
+    np.testing.assert_array_equal(baseline(F, 10), [[1, 1, 1], [4, 4, 4]])
+    assert baseline(np.empty((3, 0)), 5).shape == (3, 0)
+    assert dff(np.empty((3, 0)), 10, 1).shape == (3, 0)
+
+
+def test_invalid_mode(traces):
+    with pytest.raises(ValueError):
+        baseline(traces, 10, mode="fast")
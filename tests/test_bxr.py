@@ -0,0 +1,100 @@
+# -*- coding: utf-8 -*-
+# Created on Sun Oct 18 2026
+# Last modified on Sun Oct 18 2026
+# Copyright (c) CaMOS Development Team. All Rights Reserved.
+# Distributed under a MIT License. See LICENSE for more info.
+
+import h5py
+import numpy as np
+import pytest
+
+import camos.model.bxr as bxr
+from camos.model.bxr import BXRFile, _searchsorted
+from camos.model.filepool import FilePool
+
+RATE = 1000.0
+
+
+@pytest.fixture
+def spikes():
+    rng = np.random.default_rng(0)
+    n = 5000
+    frames = np.sort(rng.integers(0, 60 * RATE, n))
+    channels = rng.integers(0, 4096, n).astype(np.int32)
+    return channels, frames
+
+
+@pytest.fixture
+def bxr_file(tmp_path, spikes):
+    channels, frames = spikes
+    path = str(tmp_path / "recording.bxr")
+    with h5py.File(path, "w") as f:
+        info = f.create_group("3BRecInfo")
+        info.create_group("3BRecVars")["SamplingRate"] = [RATE]
+        info["3BRecVars"]["NRecFrames"] = [int(60 * RATE)]
+        info.create_group("3BMeaChip")["NCols"] = [64]
+        info["3BMeaChip"]["NRows"] = [64]
+        events = f.create_group(bxr.EVENTS_GROUP)
+        events.create_dataset("SpikeTimes", data=frames, chunks=(64,))
+        events.create_dataset("SpikeChIDs", data=channels, chunks=(64,))
+    return path
+
+
+@pytest.fixture
+def pool():
+    pool = FilePool()
+    yield pool
+    pool.close_all()
+
+
+def test_searchsorted(bxr_file, spikes, pool):
+    _, frames = spikes
+    with BXRFile(bxr_file, pool) as reader:
+        times = reader.spike_times
+        for value in [-1, 0, frames[100], frames[64 * 10], frames[-1], 10 ** 9]:
+            for side in ["left", "right"]:
+                assert _searchsorted(times, value, side) == np.searchsorted(
+                    frames, value, side
+                )
+
+
+def test_metadata(bxr_file, spikes, pool):
+    with BXRFile(bxr_file, pool) as reader:
+        assert reader.sampling_rate == RATE
+        assert reader.duration == 60
+        assert reader.n_spikes == len(spikes[0])
+
+
+@pytest.mark.parametrize("block", [64 * 3, 2 ** 22])
+def test_read_window_and_channels(monkeypatch, bxr_file, spikes, pool, block):
+    monkeypatch.setattr(bxr, "BLOCK_EVENTS", block)
+    channels, frames = spikes
+    subset = np.arange(100, 1500)
+    reported = []
+    with BXRFile(bxr_file, pool) as reader:
+        events = reader.read(12.5, 40, subset, progress=reported.append)
+    keep = (frames >= 12.5 * RATE) & (frames < 40 * RATE) & np.isin(channels, subset)
+    np.testing.assert_array_equal(events.cells, channels[keep])
+    np.testing.assert_array_equal(events.frames, frames[keep])
+    np.testing.assert_allclose(events[:]["Active"][:, 0], frames[keep] / RATE)
+    assert reported[-1] == 100
+
+
+def test_read_everything(bxr_file, spikes, pool):
+    channels, frames = spikes
+    with BXRFile(bxr_file, pool) as reader:
+        events = reader.read()
+        empty = reader.read(100, 200)
+    np.testing.assert_array_equal(events.cells, channels)
+    np.testing.assert_array_equal(events.frames, frames)
+    assert len(empty) == 0
+
+
+def test_readers_keep_the_file_open(bxr_file, pool):
+    reader = BXRFile(bxr_file, pool)
+    pool.max_files = 0
+    reader.read(0, 1)
+    assert reader._file.id.valid
+    reader.close()
+    reader.close()
+    assert pool._files == {}
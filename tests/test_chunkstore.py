@@ -0,0 +1,124 @@
+# -*- coding: utf-8 -*-
+# Created on Sun Oct 18 2026
+# Last modified on Sun Oct 18 2026
+# Copyright (c) CaMOS Development Team. All Rights Reserved.
+# Distributed under a MIT License. See LICENSE for more info.
+
+import copy
+import os
+import pickle
+
+import h5py
+import numpy as np
+import pytest
+
+from camos.model.chunkstore import ChunkedStack, chunk_shape, create_store, open_store
+from camos.model.image import Stack
+
+
+@pytest.fixture
+def frames():
+    rng = np.random.default_rng(0)
+    return rng.integers(0, 2 ** 16, (30, 40, 50), dtype=np.uint16)
+
+
+def _store(path, frames, layout="pixel", compression=None):
+    store = create_store(str(path), frames.shape, frames.dtype, layout, compression)
+    # Frames written out of order are gathered into whole chunks
+    for i in np.random.default_rng(1).permutation(len(frames)):
+        store[int(i)] = frames[i]
+    return store.reopen("r")
+
+
+def test_chunk_shapes():
+    assert chunk_shape((100, 2048, 2048), np.uint16, "frame") == (1, 724, 724)
+    t, h, w = chunk_shape((100, 2048, 2048), np.uint16, "pixel")
+    assert t > 1 and h == w >= 16
+    with pytest.raises(ValueError):
+        chunk_shape((1, 2, 2), np.uint8, "tile")
+
+
+@pytest.mark.parametrize("layout", ["frame", "pixel"])
+@pytest.mark.parametrize("compression", [None, "lzf"])
+def test_round_trip(tmp_path, frames, layout, compression):
+    store = _store(tmp_path / "stack.h5", frames, layout, compression)
+    np.testing.assert_array_equal(np.asarray(store), frames)
+    np.testing.assert_array_equal(np.stack(list(store)), frames)
+    assert store.max() == frames.max() and store.min() == frames.min()
+    np.testing.assert_array_equal(store.max(axis=0), frames.max(axis=0))
+
+
+def test_indexing(tmp_path, frames):
+    store = _store(tmp_path / "stack.h5", frames)
+    for key in [
+        3,
+        -1,
+        slice(2, 9, 3),
+        (slice(None), 5, slice(10, 20)),
+        (Ellipsis, 7),
+        (4, slice(None, None, -1)),
+        (slice(None, None, -2), slice(3, 30), -4),
+        (np.array([1, 5]), 2),
+    ]:
+        np.testing.assert_array_equal(store[key], frames[key])
+
+
+def test_blocks(tmp_path, frames):
+    store = _store(tmp_path / "stack.h5", frames)
+    starts = []
+    for start, block in store.blocks(5, 25):
+        np.testing.assert_array_equal(block, frames[start : start + len(block)])
+        starts.append(start)
+    assert starts[0] == 5
+
+
+def test_only_stores_are_opened(tmp_path, frames):
+    _store(tmp_path / "stack.h5", frames).close()
+    store = open_store(str(tmp_path / "stack.h5"))
+    np.testing.assert_array_equal(store[2], frames[2])
+
+    with h5py.File(tmp_path / "other.h5", "w") as f:
+        f["data"] = frames
+        f["stack"] = frames
+    assert open_store(str(tmp_path / "other.h5")) is None
+    assert open_store(str(tmp_path / "missing.h5")) is None
+
+
+def test_stack_from_file(tmp_path, frames):
+    _store(tmp_path / "stack.h5", frames).close()
+    lazy = Stack(str(tmp_path / "stack.h5"), 1, 1, lazy=True)
+    assert isinstance(lazy._imgs, ChunkedStack)
+    np.testing.assert_array_equal(lazy[7], frames[7])
+    ram = Stack(str(tmp_path / "stack.h5"), 1, 1, lazy=False)
+    assert isinstance(ram._imgs, np.ndarray)
+
+
+def test_temporary_stores(scratch_space, frames):
+    layer = Stack(frames, 1, 1, persistence=False, layout="pixel")
+    store = layer._imgs
+    assert isinstance(store, ChunkedStack) and store.temporary
+    np.testing.assert_array_equal(layer._imgs[4], frames[4])
+
+    # Pickles hold the pixels, as the file does not outlive the session
+    pickled = pickle.loads(pickle.dumps(store))
+    assert isinstance(pickled, np.ndarray)
+    np.testing.assert_array_equal(pickled, frames)
+
+    # Copies share the file, which is removed (and closed) once both are released
+    duplicate = copy.deepcopy(layer)
+    assert duplicate._imgs is not store and duplicate._imgs.path == store.path
+    layer.release()
+    assert os.path.isfile(store.path)
+    np.testing.assert_array_equal(duplicate[4], frames[4])
+    handle = duplicate._imgs
+    duplicate.release()
+    assert not os.path.exists(store.path)
+    assert not handle._file.id.valid
+
+
+def test_rechunk(tmp_path, frames):
+    layer = Stack(frames, 1, 1)
+    layer.rechunk("frame", path=str(tmp_path / "out.h5"))
+    assert layer._imgs.chunks[0] == 1 and not layer._imgs.temporary
+    np.testing.assert_array_equal(np.asarray(layer._imgs), frames)
+    assert open_store(str(tmp_path / "out.h5")) is not None
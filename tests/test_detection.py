@@ -0,0 +1,128 @@
+# -*- coding: utf-8 -*-
+# Created on Sun Oct 18 2026
+# Last modified on Sun Oct 18 2026
+# Copyright (c) CaMOS Development Team. All Rights Reserved.
+# Distributed under a MIT License. See LICENSE for more info.
+
+import h5py
+import numpy as np
+import pytest
+
+import camos.plugins.openbrw.detection as detection
+from camos.model.bxr import RAW_DATASET, BRWFile
+from camos.model.filepool import FilePool
+from camos.plugins.openbrw.detection import SpikeDetector, _refractory
+
+RATE = 10000.0
+BIT_DEPTH = 12
+
+
+class Recording:
+    """Samples in memory, read as BRWFile does
+    """
+
+    def __init__(self, samples):
+        self.samples = samples
+        self.frames, self.n_channels = samples.shape
+
+    def read(self, start, stop):
+        return self.samples[max(0, start) : min(self.frames, stop)].astype(np.float32)
+
+
+@pytest.fixture
+def recording():
+    rng = np.random.default_rng(0)
+    samples = rng.normal(0, 5, (20000, 6))
+    spikes = {0: [1000, 1010, 5000], 2: [300, 12000, 19000], 5: [7000]}
+    for channel, frames in spikes.items():
+        for t in frames:
+            samples[t : t + 5, channel] -= np.array([20, 80, 120, 80, 20])
+    # A disconnected electrode
+    samples[:, 4] = 0
+    return Recording(samples), spikes
+
+
+def _loop_refractory(channels, frames, refractory):
+    keep = []
+    last = {}
+    for ch, t in zip(channels, frames):
+        ok = ch not in last or t - last[ch] >= refractory
+        keep.append(ok)
+        if ok:
+            last[ch] = t
+    return np.array(keep)
+
+
+def test_refractory_matches_loop():
+    rng = np.random.default_rng(1)
+    channels = np.sort(rng.integers(0, 5, 400))
+    frames = np.concatenate(
+        [np.sort(rng.integers(0, 500, np.sum(channels == c))) for c in range(5)]
+    )
+    np.testing.assert_array_equal(
+        _refractory(channels, frames, 10), _loop_refractory(channels, frames, 10)
+    )
+
+
+def _matches(found, spikes, tolerance=5):
+    channels, frames = found
+    for channel, expected in spikes.items():
+        got = frames[channels == channel]
+        assert len(got) == len(expected)
+        assert np.all(np.abs(got - expected) <= tolerance)
+
+
+@pytest.mark.parametrize("chunk", [2 ** 24, 6 * 3000])
+def test_detects_spikes(monkeypatch, recording, chunk):
+    monkeypatch.setattr(detection, "CHUNK_VALUES", chunk)
+    reader, spikes = recording
+    reported = []
+    detector = SpikeDetector(RATE, threshold=6, refractory=2e-3)
+    channels, frames = detector.detect(reader, progress=reported.append)
+    # Spikes closer than the refractory period (1000 and 1010) count once
+    expected = {**spikes, 0: [1000, 5000]}
+    _matches((channels, frames), expected)
+    assert np.all(np.diff(frames) >= 0)
+    assert 4 not in channels
+    assert reported[-1] == 100
+
+
+def test_threads_match_serial(monkeypatch, recording):
+    monkeypatch.setattr(detection, "CHUNK_VALUES", 6 * 2500)
+    reader, _ = recording
+    serial = SpikeDetector(RATE, threshold=4).detect(reader)
+    threaded = SpikeDetector(RATE, threshold=4, workers=3).detect(reader)
+    np.testing.assert_array_equal(serial[0], threaded[0])
+    np.testing.assert_array_equal(serial[1], threaded[1])
+
+
+def test_range(recording):
+    reader, _ = recording
+    channels, frames = SpikeDetector(RATE, threshold=6).detect(reader, 4000, 13000)
+    _matches((channels, frames), {0: [5000], 2: [12000], 5: [7000]})
+
+
+def test_invalid_band():
+    with pytest.raises(ValueError):
+        SpikeDetector(RATE, low=4000, high=3000)
+
+
+def test_brw_file(tmp_path):
+    raw = np.random.default_rng(2).integers(0, 2 ** BIT_DEPTH, (50, 4)).astype(np.uint16)
+    path = str(tmp_path / "recording.brw")
+    with h5py.File(path, "w") as f:
+        variables = f.create_group("3BRecInfo/3BRecVars")
+        variables["SamplingRate"] = [RATE]
+        variables["NRecFrames"] = [50]
+        variables["BitDepth"] = [BIT_DEPTH]
+        variables["SignalInversion"] = [-1.0]
+        f.create_group("3BRecInfo/3BMeaChip")["NCols"] = [2]
+        f[RAW_DATASET] = raw.ravel()
+
+    pool = FilePool()
+    with BRWFile(path, pool) as reader:
+        assert reader.n_channels == 4 and reader.frames == 50
+        samples = reader.read(10, 60)
+    pool.close_all()
+    np.testing.assert_array_equal(samples, 2 ** (BIT_DEPTH - 1) - raw[10:50].astype(np.float32))
+    assert samples.dtype == np.float32
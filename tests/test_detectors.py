@@ -0,0 +1,68 @@
+# -*- coding: utf-8 -*-
+# Created on Sun Oct 18 2026
+# Last modified on Sun Oct 18 2026
+# Copyright (c) CaMOS Development Team. All Rights Reserved.
+# Distributed under a MIT License. See LICENSE for more info.
+
+import numpy as np
+import pytest
+
+from camos.plugins.spikeinference.detectors import match_templates, template_spikes
+
+
+def _loop_correlation(x, templates, height):
+    """Correlation of every window with the templates, as in the original loop
+    """
+    events = np.zeros((len(templates), len(x)))
+    for i, snippet in enumerate(templates):
+        L = len(snippet)
+        for j in range(len(x) - (L + 1)):
+            x_snippet = x[j : (j + L)]
+            if np.ptp(x_snippet) > height:
+                events[i, j] = np.corrcoef(x_snippet, snippet)[0, 1]
+    return events.max(axis=0)
+
+
+# Frames where a spike starts, in every trace
+STARTS = [[20, 150], [60], [], [100, 200, 280]]
+
+
+def _spike(L=12):
+    t = np.arange(L)
+    return np.exp(-t / 3.0) * (t >= 2)
+
+
+@pytest.fixture
+def traces():
+    rng = np.random.default_rng(0)
+    X = 0.1 * rng.standard_normal((4, 300)) + 100
+    for x, starts in zip(X, STARTS):
+        for s in starts:
+            n = min(12, len(x) - s)
+            x[s : s + n] += 5 * _spike()[:n]
+    return X
+
+
+def test_match_templates_matches_loop(traces):
+    templates = [_spike(), _spike(8)[::-1], np.sin(np.arange(15))]
+    height = np.array([0.5, 0.5, 0.5, 30.0])
+    best = match_templates(traces, templates, height)
+    for x, h, b in zip(traces, height, best):
+        # Windows anticorrelated with every template are 0, which detects the same
+        # spikes for any non-negative threshold
+        expected = np.maximum(_loop_correlation(x, templates, h), 0)
+        np.testing.assert_allclose(b, expected, atol=1e-8)
+
+
+def test_template_spikes(traces):
+    # Intensities above 10 use event_amplitude as a fraction of the minimum
+    times = template_spikes(traces, 10, 0.9, 0.01, [[_spike()]])
+    for t, starts in zip(times, STARTS):
+        np.testing.assert_allclose(t, np.array(starts) / 10)
+
+
+def test_template_spikes_are_in_seconds_after_resampling(traces):
+    # At 20 frames per second, traces are decimated to 10 Hz before matching
+    times = template_spikes(np.repeat(traces, 2, axis=1), 20, 0.9, 0.01, [[_spike()]])
+    for t, starts in zip(times, STARTS):
+        np.testing.assert_allclose(t, np.array(starts) / 10)
@@ -0,0 +1,135 @@
+# -*- coding: utf-8 -*-
+# Created on Sun Oct 18 2026
+# Last modified on Sun Oct 18 2026
+# Copyright (c) CaMOS Development Team. All Rights Reserved.
+# Distributed under a MIT License. See LICENSE for more info.
+
+import numpy as np
+import pytest
+
+from camos.model.events import EVENT_TYPE, CompactEvents, EventIndex, narrowest_dtype
+
+
+@pytest.fixture
+def events():
+    rng = np.random.default_rng(0)
+    n = 200
+    data = np.zeros((n, 1), dtype=EVENT_TYPE)
+    data[:, 0]["CellID"] = rng.integers(0, 15, n)
+    data[:, 0]["Active"] = rng.random(n) * 10
+    return data
+
+
+def test_index_groups_rows_by_cell(events):
+    index = EventIndex(events)
+    cells = events[:, 0]["CellID"]
+    times = events[:, 0]["Active"]
+    np.testing.assert_array_equal(index.cells, np.unique(cells))
+    for cell in np.unique(cells):
+        rows = index.rows_of(cell)
+        np.testing.assert_array_equal(np.sort(rows), np.flatnonzero(cells == cell))
+        np.testing.assert_array_equal(index.events(cell), np.sort(times[cells == cell]))
+        assert np.all(np.diff(times[rows]) >= 0)
+        assert index.count(cell) == np.sum(cells == cell)
+    np.testing.assert_array_equal(index.event_cells(), np.sort(cells))
+
+
+def test_window(events):
+    index = EventIndex(events)
+    cells = events[:, 0]["CellID"]
+    times = events[:, 0]["Active"]
+    cell = index.cells[3]
+    rows = index.window(cell, 2.0, 6.5)
+    expected = np.flatnonzero((cells == cell) & (times >= 2.0) & (times < 6.5))
+    np.testing.assert_array_equal(np.sort(rows), expected)
+
+
+def test_select_keeps_the_table_order(events):
+    index = EventIndex(events)
+    cells = events[:, 0]["CellID"]
+    IDs = [12, 3, 7, 100]
+    rows = index.select(IDs)
+    # The same rows, in the same order, as a boolean mask of the CellID column
+    np.testing.assert_array_equal(rows, np.flatnonzero(np.isin(cells, IDs)))
+    assert len(index.select([])) == 0
+    assert len(index.select([100])) == 0
+
+
+def test_missing_cells(events):
+    index = EventIndex(events)
+    assert 100 not in index and index.position(100) is None
+    with pytest.raises(KeyError):
+        index.events(100)
+
+
+def test_sorted_tables_keep_their_order(events):
+    index = EventIndex(events)
+    # i.e., a dataset filtered from an indexed one
+    sorted_events = events[index.order]
+    again = EventIndex(sorted_events)
+    np.testing.assert_array_equal(again.order, np.arange(len(events)))
+    np.testing.assert_array_equal(again.times, index.times)
+
+
+def test_tables_without_times():
+    data = np.zeros((4,), dtype=[("CellID", "int"), ("ISI", "float")])
+    data["CellID"] = [5, 2, 5, 2]
+    index = EventIndex(data)
+    assert index.times is None
+    np.testing.assert_array_equal(index.rows_of(5), [0, 2])
+
+
+def test_empty():
+    index = EventIndex(np.zeros((0, 1), dtype=EVENT_TYPE))
+    assert len(index) == 0
+    assert len(index.select([1, 2])) == 0
+
+
+def test_narrowest_dtype():
+    assert narrowest_dtype([0, 200]) == np.uint8
+    assert narrowest_dtype([0, 70000]) == np.uint32
+    assert narrowest_dtype([-1, 100]) == np.int8
+    assert narrowest_dtype([-1, 40000]) == np.int32
+    assert narrowest_dtype([]) == np.uint8
+
+
+def test_compact_events_read_as_a_table():
+    cells = np.array([4095, 0, 17, 4095])
+    frames = np.array([10, 99999, 5, 20])
+    compact = CompactEvents(cells, frames, 10000.0)
+    assert compact.cells.dtype == np.uint16 and compact.frames.dtype == np.uint32
+    assert compact.nbytes < np.asarray(compact).nbytes
+    assert compact.shape == (4, 1) and len(compact) == 4
+
+    expected = np.zeros((4, 1), dtype=EVENT_TYPE)
+    expected[:, 0]["CellID"] = cells
+    expected[:, 0]["Active"] = frames / 10000.0
+    np.testing.assert_array_equal(np.asarray(compact), expected)
+    np.testing.assert_array_equal(compact[:]["CellID"], expected[:]["CellID"])
+    np.testing.assert_array_equal(compact[:]["Active"], expected[:]["Active"])
+    # CellIDs are read with the type of the table, so arithmetic does not wrap around
+    assert compact[:]["CellID"].dtype == expected["CellID"].dtype
+    assert (compact[:]["CellID"] - 4096).min() == -4096
+
+    np.testing.assert_array_equal(compact[2], expected[2])
+    np.testing.assert_array_equal(np.asarray(compact[1:3]), expected[1:3])
+    mask = compact[:]["CellID"][:, 0] == 4095
+    np.testing.assert_array_equal(np.asarray(compact[mask, 0]), expected[mask])
+    with pytest.raises(ValueError):
+        compact["Frame"]
+    with pytest.raises(ValueError):
+        CompactEvents([1, 2], [3], 1.0)
+
+
+def test_signed_cells():
+    compact = CompactEvents([-1, 3], [0, 1], 1.0)
+    assert compact.cells.dtype == np.int8
+    np.testing.assert_array_equal(compact[:]["CellID"][:, 0], [-1, 3])
+
+
+def test_compact_events_index_like_tables(events):
+    compact = CompactEvents(events[:, 0]["CellID"], np.arange(len(events)), 50.0)
+    index = EventIndex(compact)
+    expected = EventIndex(np.asarray(compact))
+    np.testing.assert_array_equal(index.order, expected.order)
+    np.testing.assert_array_equal(index.times, expected.times)
@@ -0,0 +1,56 @@
+# -*- coding: utf-8 -*-
+# Created on Sun Oct 18 2026
+# Last modified on Sun Oct 18 2026
+# Copyright (c) CaMOS Development Team. All Rights Reserved.
+# Distributed under a MIT License. See LICENSE for more info.
+
+import numpy as np
+import pytest
+
+from camos.model.events import EVENT_TYPE
+from camos.tasks.events import EventTable
+
+
+def _append_loop(spikes):
+    """Table built row by row with np.append, as the plugins did
+    """
+    output = np.zeros(shape=(1, 1), dtype=EVENT_TYPE)
+    for cell, times in spikes:
+        for t in times:
+            row = np.array([(cell, t)], dtype=EVENT_TYPE)
+            output = np.append(output, [row], axis=0)
+    return output[1:]
+
+
+def test_matches_append_loop():
+    rng = np.random.default_rng(0)
+    spikes = [(cell, np.sort(rng.random(rng.integers(0, 6)) * 10)) for cell in range(8)]
+    table = EventTable()
+    for cell, times in spikes:
+        table.add(cell, times)
+    out = table.to_array()
+    expected = _append_loop(spikes)
+    assert out.shape == expected.shape and out.dtype == expected.dtype
+    np.testing.assert_array_equal(out, expected)
+    assert len(table) == len(out)
+
+
+def test_one_cell_per_row():
+    table = EventTable([("CellID", "int"), ("Nearest", "int")])
+    table.add([4, 2], [7, 9])
+    table.add(5, [1])
+    out = table.to_array()
+    np.testing.assert_array_equal(out[:, 0]["CellID"], [4, 2, 5])
+    np.testing.assert_array_equal(out[:, 0]["Nearest"], [7, 9, 1])
+
+
+def test_empty():
+    table = EventTable()
+    table.add(3, [])
+    out = table.to_array()
+    assert out.shape == (0, 1) and out.dtype == np.dtype(EVENT_TYPE)
+
+
+def test_wrong_columns():
+    with pytest.raises(ValueError):
+        EventTable().add(1, [0.5], [2])
@@ -0,0 +1,130 @@
+# -*- coding: utf-8 -*-
+# Created on Sun Oct 18 2026
+# Last modified on Sun Oct 18 2026
+# Copyright (c) CaMOS Development Team. All Rights Reserved.
+# Distributed under a MIT License. See LICENSE for more info.
+
+import numpy as np
+import pytest
+from PIL import Image
+
+from camos.model.image import Stack, list2stack, on_disk, tiff2nparray
+from camos.model.inputdata import InputData
+
+
+@pytest.fixture
+def frames():
+    rng = np.random.default_rng(0)
+    return rng.integers(0, 2 ** 16, (5, 12, 16), dtype=np.uint16)
+
+
+def _write(path, frames):
+    images = [Image.fromarray(f) for f in frames]
+    images[0].save(path, save_all=True, append_images=images[1:])
+    return str(path)
+
+
+def test_frames_are_streamed_to_disk(tmp_path, scratch_space, frames):
+    path = _write(tmp_path / "stack.tif", frames)
+    reported = []
+    out, _ = tiff2nparray(path, persistence=False, progress=reported.append)
+    assert isinstance(out, np.memmap)
+    assert not out.flags.writeable
+    assert scratch_space.owners(out) != ()
+    np.testing.assert_array_equal(out, frames)
+    assert reported == sorted(reported) and reported[-1] <= 100
+
+
+def test_ram_stack(tmp_path, scratch_space, frames):
+    path = _write(tmp_path / "stack.tif", frames)
+    out, _ = tiff2nparray(path, persistence=True)
+    assert not on_disk(out)
+    assert scratch_space.used == 0
+    np.testing.assert_array_equal(out, frames)
+
+
+def test_failed_load_releases_the_scratch_file(tmp_path, scratch_space, frames):
+    paths = [
+        _write(tmp_path / "a.tif", frames),
+        _write(tmp_path / "b.tif", frames[:, :-1]),
+    ]
+    with pytest.raises(ValueError):
+        list2stack(paths, persistence=False)
+    assert all(refs == 0 for refs in scratch_space._refs.values())
+    assert list(scratch_space._free) == list(scratch_space._sizes)
+
+
+def test_stack_release(tmp_path, scratch_space, frames):
+    path = _write(tmp_path / "stack.tif", frames)
+    stack = Stack(path, 1, 1, persistence=False, lazy=False)
+    assert on_disk(stack._imgs)
+    (file,) = stack._scratch
+    assert scratch_space._refs[file] == 1
+    np.testing.assert_array_equal(stack[3], frames[3])
+    stack.release()
+    assert scratch_space._refs[file] == 0
+
+
+def test_max_can_be_set(frames):
+    data = InputData(frames, memoryPersist=True)
+    assert data.max == 0
+    data.loadImage()
+    assert data.max == frames.max()
+    data.max = 7
+    assert data.max == 7
+
+
+@pytest.mark.parametrize("workers", [1, 4])
+def test_files_keep_their_order(tmp_path, frames, workers):
+    # Files with different numbers of pages, decoded concurrently
+    counts = [2, 1, 3, 1, 2]
+    rng = np.random.default_rng(1)
+    stack = rng.integers(0, 2 ** 16, (sum(counts),) + frames.shape[1:], dtype=np.uint16)
+    starts = np.cumsum([0] + counts)
+    paths = [
+        _write(tmp_path / "{}.tif".format(i), stack[a:b])
+        for i, (a, b) in enumerate(zip(starts[:-1], starts[1:]))
+    ]
+    reported = []
+    out, _ = list2stack(paths, progress=reported.append, workers=workers)
+    np.testing.assert_array_equal(out, stack)
+    assert reported == sorted(reported) and reported[-1] <= 100
+
+
+def test_no_files():
+    with pytest.raises(ValueError):
+        list2stack([])
+
+
+def test_arrays_are_wrapped_without_copy(frames):
+    stack = Stack(frames, 1, 1)
+    assert stack.shared
+    assert np.shares_memory(stack._imgs, frames)
+    assert not stack._imgs.flags.writeable
+    # The original array stays writable
+    assert frames.flags.writeable
+
+    stack.detach()
+    assert not stack.shared and not np.shares_memory(stack._imgs, frames)
+    np.testing.assert_array_equal(stack._imgs, frames)
+
+
+def test_copy_and_single_images(frames):
+    stack = Stack(frames, 1, 1, copy=True)
+    assert not stack.shared and not np.shares_memory(stack._imgs, frames)
+    rgb = np.zeros((12, 16, 3), dtype=np.uint8)
+    assert Stack(rgb, 1, 1)._imgs.shape == (1, 12, 16, 3)
+    assert Stack(frames[0], 1, 1)._imgs.shape == (1, 12, 16)
+
+
+def test_disk_stacks_wrap_memory_maps(tmp_path, scratch_space, frames):
+    path = tmp_path / "frames.npy"
+    np.save(path, frames)
+    mapped = np.load(path, mmap_mode="r")
+    stack = Stack(mapped, 1, 1, persistence=False)
+    assert stack.shared and np.shares_memory(stack._imgs, mapped)
+
+    # Arrays in RAM are copied into the scratch space
+    stack = Stack(frames, 1, 1, persistence=False)
+    assert not stack.shared and on_disk(stack._imgs)
+    np.testing.assert_array_equal(stack._imgs, frames)
@@ -0,0 +1,75 @@
+# -*- coding: utf-8 -*-
+# Created on Sun Oct 18 2026
+# Last modified on Sun Oct 18 2026
+# Copyright (c) CaMOS Development Team. All Rights Reserved.
+# Distributed under a MIT License. See LICENSE for more info.
+
+from collections import defaultdict
+
+import numpy as np
+import pytest
+
+from camos.model.events import EVENT_TYPE, EventIndex
+from camos.utils.isi import Intervals
+
+
+@pytest.fixture
+def events():
+    rng = np.random.default_rng(0)
+    counts = [5, 1, 0, 12, 2, 30]
+    cells = np.repeat([3, 8, 9, 11, 20, 21], counts)
+    times = np.concatenate([np.cumsum(rng.exponential(0.2, n)) for n in counts])
+    # Rows of a recording come in time order, not by cell
+    order = np.argsort(times, kind="stable")
+    data = np.zeros((len(cells), 1), dtype=EVENT_TYPE)
+    data[:, 0]["CellID"] = cells[order]
+    data[:, 0]["Active"] = times[order]
+    return data
+
+
+def _per_cell(data):
+    """Sorted times of the events of every cell, as the plugins gathered them
+    """
+    events = defaultdict(list)
+    for cell, t in zip(data[:, 0]["CellID"], data[:, 0]["Active"]):
+        events[cell].append(t)
+    return {cell: np.diff(sorted(times)) for cell, times in sorted(events.items())}
+
+
+def test_statistics_match_per_cell_loop(events):
+    intervals = Intervals(EventIndex(events))
+    expected = _per_cell(events)
+    np.testing.assert_array_equal(intervals.cells, list(expected))
+    with np.errstate(invalid="ignore"):
+        mean = [np.mean(isi) if len(isi) else np.nan for isi in expected.values()]
+        std = [np.std(isi) if len(isi) else np.nan for isi in expected.values()]
+    median = [np.median(isi) if len(isi) else np.nan for isi in expected.values()]
+    np.testing.assert_allclose(intervals.mean(), mean)
+    np.testing.assert_allclose(intervals.std(), std)
+    np.testing.assert_allclose(intervals.median(), median)
+    np.testing.assert_allclose(intervals.cv(), np.array(std) / np.array(mean))
+    # The cell with a single event has no intervals
+    assert intervals.counts[1] == 0 and np.isnan(intervals.mean()[1])
+
+
+def test_from_events(events):
+    a = Intervals(EventIndex(events))
+    b = Intervals.from_events(events[:]["CellID"], events[:]["Active"])
+    np.testing.assert_array_equal(a.isi, b.isi)
+    np.testing.assert_array_equal(a.offsets, b.offsets)
+
+
+def test_log_histograms(events):
+    intervals = Intervals(EventIndex(events))
+    counts, edges = intervals.log_histograms(bins=10)
+    assert counts.shape == (len(intervals), 10)
+    for k, isi in enumerate(_per_cell(events).values()):
+        expected, _ = np.histogram(np.log10(isi[isi > 0]), bins=edges)
+        np.testing.assert_array_equal(counts[k], expected)
+
+
+def test_no_events():
+    intervals = Intervals(EventIndex(np.zeros((0, 1), dtype=EVENT_TYPE)))
+    assert len(intervals) == 0 and len(intervals.mean()) == 0
+    counts, _ = intervals.log_histograms()
+    assert counts.shape == (0, 50)
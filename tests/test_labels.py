@@ -0,0 +1,99 @@
+# -*- coding: utf-8 -*-
+# Created on Sun Oct 18 2026
+# Last modified on Sun Oct 18 2026
+# Copyright (c) CaMOS Development Team. All Rights Reserved.
+# Distributed under a MIT License. See LICENSE for more info.
+
+import numpy as np
+import pytest
+
+import camos.model.labels as labels
+from camos.model.image import Stack
+from camos.model.labels import LabelIndex
+
+
+@pytest.fixture
+def mask():
+    rng = np.random.default_rng(0)
+    mask = np.zeros((30, 40), dtype=np.uint16)
+    for label in [3, 7, 8, 250]:
+        y, x = rng.integers(0, 25), rng.integers(0, 35)
+        mask[y : y + rng.integers(1, 6), x : x + rng.integers(1, 6)] = label
+    return mask
+
+
+def test_index_matches_the_mask(mask):
+    index = LabelIndex(mask)
+    np.testing.assert_array_equal(index.labels, np.unique(mask))
+    for label in np.unique(mask):
+        rows, cols = np.nonzero(mask == label)
+        np.testing.assert_array_equal(index.flat(label), np.flatnonzero(mask == label))
+        got_rows, got_cols = index.coords(label)
+        np.testing.assert_array_equal(got_rows, rows)
+        np.testing.assert_array_equal(got_cols, cols)
+        assert index.area(label) == len(rows)
+        np.testing.assert_allclose(index.centroid(label), [rows.mean(), cols.mean()])
+        np.testing.assert_array_equal(
+            index.bbox(label), [rows.min(), cols.min(), rows.max() + 1, cols.max() + 1]
+        )
+
+
+def test_missing_labels(mask):
+    index = LabelIndex(mask)
+    assert 7 in index and 5 not in index
+    assert index.position(5) is None
+    with pytest.raises(KeyError):
+        index.bbox(5)
+
+
+def test_select(mask):
+    index = LabelIndex(mask)
+    selected = index.select([7, 250, 1000])
+    np.testing.assert_array_equal(selected, np.where(np.isin(mask, [7, 250]), mask, 0))
+    assert selected.dtype == mask.dtype
+    assert not index.select([]).any()
+
+
+def test_empty():
+    index = LabelIndex(np.zeros((0, 5), dtype=np.uint8))
+    assert len(index) == 0
+    assert index.aggregate(np.zeros((3, 0, 5))).shape == (0, 3)
+
+
+def test_stack_labels(mask):
+    stack = Stack(mask[None], 1, 1)
+    assert stack.labels is stack.labels
+    np.testing.assert_array_equal(stack.labels.labels, np.unique(mask))
+    stack._imgs = np.zeros((1, 30, 40), dtype=np.uint16)
+    np.testing.assert_array_equal(stack.labels.labels, [0])
+
+
+def _loop_traces(mask, frames):
+    """Mean of the pixels of every ROI, as computed by the loop of Extract Signal
+    """
+    rois = np.unique(mask)
+    raw = np.zeros((len(rois), len(frames)))
+    for i, r in enumerate(rois):
+        rows, cols = np.nonzero(mask == r)
+        raw[i, :] = np.average(frames[:, rows, cols], axis=1)
+    return raw
+
+
+@pytest.mark.parametrize("workers", [1, 3])
+def test_aggregate_matches_loop(monkeypatch, mask, workers):
+    # Small chunks, so the stack is read in several of them
+    monkeypatch.setattr(labels, "CHUNK_PIXELS", 3 * mask.size)
+    frames = np.random.default_rng(1).random((10,) + mask.shape) * 1000
+    reported = []
+    traces = LabelIndex(mask).aggregate(frames, workers=workers, progress=reported.append)
+    assert traces.dtype == np.float32
+    np.testing.assert_allclose(traces, _loop_traces(mask, frames), rtol=1e-5)
+    assert reported[-1] == 100
+
+
+def test_aggregate_sums_and_channels(mask):
+    frames = np.ones((4,) + mask.shape + (3,), dtype=np.uint8)
+    index = LabelIndex(mask)
+    sums = index.aggregate(frames, mean=False, dtype=np.float64)
+    assert sums.shape == (len(index), 4, 3)
+    np.testing.assert_array_equal(sums[:, 0, 0], index.areas)
@@ -0,0 +1,134 @@
+# -*- coding: utf-8 -*-
+# Created on Sun Oct 18 2026
+# Last modified on Sun Oct 18 2026
+# Copyright (c) CaMOS Development Team. All Rights Reserved.
+# Distributed under a MIT License. See LICENSE for more info.
+
+import copy
+import pickle
+
+import h5py
+import numpy as np
+import pytest
+
+import camos.model.filepool as filepool
+import camos.model.lazydata as lazydata
+from camos.model.events import EVENT_TYPE
+from camos.model.filepool import FilePool
+from camos.model.lazydata import LazyDataset, SliceCache
+
+
+@pytest.fixture
+def pool(monkeypatch):
+    pool = FilePool(max_files=2)
+    monkeypatch.setattr(filepool, "_pool", pool)
+    monkeypatch.setattr(lazydata, "_cache", SliceCache())
+    yield pool
+    pool.close_all()
+
+
+@pytest.fixture
+def table():
+    rng = np.random.default_rng(0)
+    data = np.zeros((100, 1), dtype=EVENT_TYPE)
+    data[:, 0]["CellID"] = rng.integers(0, 10, 100)
+    data[:, 0]["Active"] = rng.random(100)
+    return data
+
+
+@pytest.fixture
+def h5(tmp_path, table):
+    path = str(tmp_path / "signal.h5")
+    with h5py.File(path, "w") as f:
+        f["events"] = table
+    return path
+
+
+def test_indexing(pool, h5, table):
+    data = LazyDataset(h5, "events")
+    assert data.shape == table.shape and data.dtype == table.dtype
+    for key in [
+        3,
+        slice(10, 20),
+        (slice(None), 0),
+        np.array([5, 2, 2, -1]),
+        table[:, 0]["CellID"] == 3,
+        (np.array([7, 1]), 0),
+        np.array([], dtype=int),
+    ]:
+        np.testing.assert_array_equal(data[key], table[key])
+    np.testing.assert_array_equal(data[:]["CellID"], table[:]["CellID"])
+    np.testing.assert_array_equal(data["Active"], table["Active"])
+    np.testing.assert_array_equal(np.asarray(data), table)
+
+
+def test_cached_slices_are_copies(pool, h5, table):
+    data = LazyDataset(h5, "events")
+    first = data[0:10]
+    first["CellID"] = -1
+    np.testing.assert_array_equal(data[0:10], table[0:10])
+    assert lazydata._cache.nbytes > 0
+    data.release()
+    assert lazydata._cache.nbytes == 0
+
+
+def test_copies_share_the_file(pool, h5, table):
+    data = LazyDataset(h5, "events")
+    duplicate = copy.deepcopy(data)
+    assert duplicate.path == data.path and duplicate.uid != data.uid
+    assert pool._users[data.path] == 2
+    data.release()
+    data.release()
+    np.testing.assert_array_equal(duplicate[5:8], table[5:8])
+    duplicate.release()
+    assert data.path not in pool._users
+
+    pickled = pickle.loads(pickle.dumps(duplicate))
+    assert isinstance(pickled, LazyDataset)
+    pickled.release()
+
+
+def test_arrays(pool, tmp_path, table):
+    path = tmp_path / "events.npy"
+    np.save(path, table)
+    data = LazyDataset(np.load(path, mmap_mode="r"))
+    np.testing.assert_array_equal(data[[3, 1]], table[[3, 1]])
+    duplicate = copy.deepcopy(data)
+    np.testing.assert_array_equal(np.asarray(duplicate), table)
+    assert isinstance(pickle.loads(pickle.dumps(data)), np.ndarray)
+    with pytest.raises(ValueError):
+        LazyDataset(str(path))
+
+
+def test_slice_cache_budget():
+    cache = SliceCache(budget=1000)
+    for k in range(5):
+        cache.put(("a", k), np.zeros(200, dtype=np.uint8))
+    assert cache.nbytes == 1000
+    cache.put(("a", 5), np.zeros(200, dtype=np.uint8))
+    assert cache.get(("a", 0)) is None and cache.get(("a", 5)) is not None
+    # Slices above a quarter of the budget are not kept
+    cache.put(("b", 0), np.zeros(300, dtype=np.uint8))
+    assert cache.get(("b", 0)) is None
+    cache.discard("a")
+    assert cache.nbytes == 0
+
+
+def test_file_pool(tmp_path):
+    paths = []
+    for k in range(4):
+        paths.append(str(tmp_path / "{}.h5".format(k)))
+        with h5py.File(paths[-1], "w") as f:
+            f["x"] = [k]
+    pool = FilePool(max_files=1)
+    used = pool.acquire(paths[0])
+    # Idle files are closed above max_files, the least recently used first
+    for path in paths[1:]:
+        pool.open(path)
+    assert used.id.valid
+    assert list(pool._idle) == [paths[3]]
+    pool.release(paths[0])
+    assert list(pool._idle) == [paths[0]]
+    # Closed files are opened again
+    assert pool.open(paths[1])["x"][0] == 1
+    pool.close_all()
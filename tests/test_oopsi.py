@@ -0,0 +1,37 @@
+# -*- coding: utf-8 -*-
+# Created on Sun Oct 18 2026
+# Last modified on Sun Oct 18 2026
+# Copyright (c) CaMOS Development Team. All Rights Reserved.
+# Distributed under a MIT License. See LICENSE for more info.
+
+import numpy as np
+import pytest
+
+from camos.plugins.spikeinference import oopsi
+
+# The sparse solver of the reference implementation is given a DIA matrix
+pytestmark = pytest.mark.filterwarnings("ignore::scipy.sparse.SparseEfficiencyWarning")
+
+
+@pytest.fixture(params=[0, 1, 2])
+def trace(request):
+    np.random.seed(request.param)
+    F, _, _ = oopsi.fcn_generate(600, dt=0.02, lam=5, tau=0.5, sigma=0.05)
+    return F
+
+
+def test_banded_map_matches_sparse(trace):
+    F, P = oopsi.oopsi_init_par(trace, 0.02)
+    n, C, post = oopsi.oopsi_est_map(F, P)
+    n_b, C_b, post_b = oopsi.oopsi_est_map_banded(F, P)
+    np.testing.assert_allclose(n_b, n, rtol=1e-6, atol=1e-9)
+    np.testing.assert_allclose(C_b, C, rtol=1e-6, atol=1e-9)
+    assert post_b == pytest.approx(post, rel=1e-9)
+
+
+@pytest.mark.parametrize("iter_max", [1, 5])
+def test_fast_banded_matches_sparse(trace, iter_max):
+    n, C = oopsi.fast(trace, dt=0.02, iter_max=iter_max, banded=False)
+    n_b, C_b = oopsi.fast(trace, dt=0.02, iter_max=iter_max, banded=True)
+    np.testing.assert_allclose(n_b, n, rtol=1e-6, atol=1e-9)
+    np.testing.assert_allclose(C_b, C, rtol=1e-6, atol=1e-9)
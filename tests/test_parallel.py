@@ -0,0 +1,69 @@
+# -*- coding: utf-8 -*-
+# Created on Sun Oct 18 2026
+# Last modified on Sun Oct 18 2026
+# Copyright (c) CaMOS Development Team. All Rights Reserved.
+# Distributed under a MIT License. See LICENSE for more info.
+
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pytest
+
+import camos.tasks.parallel as parallel
+from camos.tasks.parallel import map_rows
+
+
+@pytest.fixture
+def data():
+    return np.random.default_rng(0).random((37, 50))
+
+
+@pytest.fixture
+def pool(monkeypatch):
+    """Rows always go to the pool of processes, after the first one. Returns the
+    list of the pools started
+    """
+    monkeypatch.setattr(parallel, "PROBE_SECONDS", 0)
+    monkeypatch.setattr(parallel, "SERIAL_SECONDS", 0)
+    started = []
+
+    def executor(*args, **kwargs):
+        started.append(kwargs["max_workers"])
+        return ProcessPoolExecutor(*args, **kwargs)
+
+    monkeypatch.setattr(parallel, "ProcessPoolExecutor", executor)
+    return started
+
+
+def test_serial(data):
+    reported = []
+    results = map_rows(np.percentile, data, args=(30,), workers=1, progress=reported.append)
+    np.testing.assert_allclose(results, np.percentile(data, 30, axis=1))
+    assert reported == sorted(reported) and reported[-1] == 100
+
+
+def test_short_tasks_stay_serial(monkeypatch, data):
+    def fail(*args, **kwargs):
+        raise AssertionError("The pool must not be started")
+
+    monkeypatch.setattr(parallel.shared_memory, "SharedMemory", fail)
+    results = map_rows(np.sum, data, workers=4)
+    np.testing.assert_allclose(results, data.sum(axis=1))
+
+
+@pytest.mark.skipif(parallel.shared_memory is None, reason="No shared memory")
+def test_pool_matches_serial(pool, data):
+    reported = []
+    results = map_rows(np.percentile, data, args=(30,), workers=2, progress=reported.append)
+    assert pool == [2]
+    assert len(results) == len(data)
+    np.testing.assert_allclose(results, np.percentile(data, 30, axis=1))
+    assert reported[-1] == 100
+
+
+@pytest.mark.skipif(parallel.shared_memory is None, reason="No shared memory")
+def test_pool_batched(pool, data):
+    # np.ptp over the columns of a batch returns one value per row
+    results = map_rows(np.ptp, data, args=(1,), workers=2, batched=True)
+    assert pool == [2]
+    np.testing.assert_allclose(results, np.ptp(data, axis=1))
@@ -0,0 +1,87 @@
+# -*- coding: utf-8 -*-
+# Created on Sun Oct 18 2026
+# Last modified on Sun Oct 18 2026
+# Copyright (c) CaMOS Development Team. All Rights Reserved.
+# Distributed under a MIT License. See LICENSE for more info.
+
+import threading
+import time
+
+import numpy as np
+import pytest
+
+from camos.model.prefetch import FramePrefetcher, FrameRing
+
+
+@pytest.fixture
+def frames():
+    return np.arange(20 * 4 * 4, dtype=np.uint16).reshape(20, 4, 4)
+
+
+def _wait(condition, timeout=10):
+    end = time.time() + timeout
+    while not condition():
+        if time.time() > end:
+            return False
+        time.sleep(0.01)
+    return True
+
+
+def test_ring_follows_the_playback(frames):
+    ring = FrameRing(frames)
+    ring.track(5)
+    assert ring.upcoming(3) == [6, 7, 8]
+    ring.track(3)
+    assert ring.upcoming(3) == [1]
+    ring.track(7)
+    # Scrubbing forwards by 4 frames at a time
+    assert ring.upcoming(3) == [11, 15, 19]
+
+
+def test_ring_capacity_keeps_the_wanted_frame(frames):
+    ring = FrameRing(frames, ring_bytes=3 * frames[0].nbytes)
+    assert ring.capacity == 3
+    ring.track(0)
+    for i in range(6):
+        ring.put(i, frames[i])
+    assert len(ring.frames) == 3
+    assert ring.get(0) is not None and ring.get(1) is None
+
+
+def test_frames_are_read_ahead(frames):
+    ready = threading.Event()
+    prefetcher = FramePrefetcher(lambda data, i: ready.set(), lookahead=4)
+    assert prefetcher.show(frames, 2) is None
+    assert ready.wait(10)
+    np.testing.assert_array_equal(prefetcher.show(frames, 2), frames[2])
+    ring = prefetcher._rings[id(frames)]
+    assert _wait(lambda: all(j in ring.frames for j in [3, 4, 5, 6]))
+    np.testing.assert_array_equal(prefetcher.show(frames, 4), frames[4])
+
+
+def test_new_data_replaces_the_ring(frames):
+    ready = threading.Event()
+    prefetcher = FramePrefetcher(lambda data, i: ready.set(), lookahead=0)
+    owner = object()
+    prefetcher.show(frames, 1, owner)
+    assert ready.wait(10)
+    assert prefetcher.show(frames, 1, owner) is not None
+
+    # The stack of the layer changed, i.e., it was cropped
+    cropped = frames[:, :2, :2]
+    ready.clear()
+    assert prefetcher.show(cropped, 1, owner) is None
+    assert ready.wait(10)
+    np.testing.assert_array_equal(prefetcher.show(cropped, 1, owner), cropped[1])
+
+    prefetcher.discard(owner)
+    assert prefetcher._rings == {}
+
+
+def test_retain(frames):
+    prefetcher = FramePrefetcher(lookahead=0)
+    a, b = object(), object()
+    prefetcher.show(frames, 0, a)
+    prefetcher.show(frames, 0, b)
+    prefetcher.retain([b])
+    assert list(prefetcher._rings) == [id(b)]
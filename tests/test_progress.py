@@ -0,0 +1,72 @@
+# -*- coding: utf-8 -*-
+# Created on Sun Oct 18 2026
+# Last modified on Sun Oct 18 2026
+# Copyright (c) CaMOS Development Team. All Rights Reserved.
+# Distributed under a MIT License. See LICENSE for more info.
+
+import camos.tasks.progress as progress
+from camos.tasks.progress import ProgressReporter
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def _reporter(monkeypatch, rate=10):
+    clock = Clock()
+    monkeypatch.setattr(progress.time, "monotonic", clock)
+    sent = []
+    return ProgressReporter(sent.append, rate=rate), sent, clock
+
+
+def test_rate_limit(monkeypatch):
+    reporter, sent, clock = _reporter(monkeypatch)
+    for i in range(1000):
+        reporter.advance(i, 1000)
+    assert sent == [0]
+    assert reporter.value == 99
+    clock.now += 0.1
+    reporter(99.5)
+    assert sent == [0, 99]
+
+
+def test_unchanged_values_are_not_sent(monkeypatch):
+    reporter, sent, clock = _reporter(monkeypatch)
+    reporter(10)
+    clock.now += 1
+    reporter(10.7)
+    assert sent == [10]
+
+
+def test_completion_and_flush(monkeypatch):
+    reporter, sent, clock = _reporter(monkeypatch)
+    reporter(5)
+    reporter(50)
+    reporter.flush()
+    reporter.flush()
+    # The end of the task is always sent
+    reporter(100)
+    assert sent == [5, 50, 100]
+    reporter.reset()
+    reporter(0)
+    assert sent[-1] == 0
+
+
+def test_subtasks(monkeypatch):
+    reporter, sent, clock = _reporter(monkeypatch)
+    first = reporter.subtask(0, 50)
+    first.advance(1, 2)
+    clock.now += 1
+    nested = reporter.subtask(50, 100).subtask(50, 100)
+    nested(0)
+    clock.now += 1
+    nested(200)
+    assert sent == [25, 75, 100]
+    # A stage without steps is complete
+    reporter.reset()
+    first.advance(3, 0)
+    assert sent[-1] == 50
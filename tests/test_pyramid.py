@@ -0,0 +1,107 @@
+# -*- coding: utf-8 -*-
+# Created on Sun Oct 18 2026
+# Last modified on Sun Oct 18 2026
+# Copyright (c) CaMOS Development Team. All Rights Reserved.
+# Distributed under a MIT License. See LICENSE for more info.
+
+import os
+
+import numpy as np
+import pytest
+
+from camos.model.pyramid import (
+    ImagePyramid,
+    cache_dir,
+    downsample,
+    pyramid_key,
+    trim_cache,
+)
+
+
+@pytest.fixture
+def image():
+    rng = np.random.default_rng(0)
+    return rng.integers(0, 2 ** 16, (301, 203), dtype=np.uint16)
+
+
+def _halve(a):
+    h, w = a.shape[0] // 2, a.shape[1] // 2
+    mean = a[: 2 * h, : 2 * w].astype(np.float32).reshape(h, 2, w, 2).mean(axis=(1, 3))
+    return np.rint(mean).astype(a.dtype)
+
+
+def test_downsample(image):
+    dst = np.empty((150, 101), dtype=image.dtype)
+    # Small blocks, so the image is read in several bands
+    downsample(image, dst, block_pixels=4 * 101 * 7)
+    np.testing.assert_array_equal(dst, _halve(image))
+
+
+def test_levels(scratch_space, image):
+    pyramid = ImagePyramid(image, tile=64)
+    assert pyramid.shapes == [(301, 203), (150, 101), (75, 50), (37, 25)]
+    pyramid.build(background=False)
+    assert pyramid.ready
+    expected = image
+    for level in pyramid.levels[1:]:
+        expected = _halve(expected)
+        np.testing.assert_array_equal(level, expected)
+    np.testing.assert_array_equal(pyramid.overview(), expected)
+
+    # Levels of arrays are files of the scratch space, given back on release
+    files = list(scratch_space._sizes)
+    assert len(files) == 3 and all(os.path.isfile(f) for f in files)
+    pyramid.release()
+    assert not pyramid.ready and len(pyramid.levels) == 1
+    assert not any(os.path.isfile(f) for f in files)
+
+
+def test_tiles(scratch_space, image):
+    pyramid = ImagePyramid(image, tile=64, cache_tiles=4)
+    # Tiles of levels not built yet are read with a stride
+    np.testing.assert_array_equal(pyramid.region(1, 0, 1, 0, 1), image[0:128:2, 0:128:2])
+    pyramid.build(background=False)
+    assert pyramid.tile_range(0, 10, 150, 70, 203) == (0, 3, 1, 4)
+    assert pyramid.tile_range(1, 0, 301, 0, 203) == (0, 3, 0, 2)
+    np.testing.assert_array_equal(pyramid.region(0, 1, 3, 1, 4), image[64:192, 64:203])
+    np.testing.assert_array_equal(pyramid.region(1, 0, 3, 0, 2), pyramid.levels[1])
+    assert len(pyramid._tiles) <= 4
+    assert pyramid.level_for(0.5) == 0
+    assert pyramid.level_for(4.5) == 2
+    assert pyramid.level_for(100) == 3
+
+
+def test_key(tmp_path, image):
+    path = tmp_path / "image.npy"
+    np.save(path, image)
+    assert pyramid_key(image) is None
+    assert pyramid_key(str(path)) == pyramid_key(str(path))
+    assert pyramid_key(str(path), 0) != pyramid_key(str(path), 1)
+
+
+def test_disk_cache(tmp_path, scratch_space, image):
+    path = tmp_path / "image.npy"
+    np.save(path, image)
+    key = pyramid_key(str(path))
+    pyramid = ImagePyramid(image, key=key, tile=64)
+    pyramid.build(background=False)
+    pyramid.release()
+    assert os.path.isdir(os.path.join(cache_dir(), key))
+
+    # Another pyramid of the same file reads the cached levels, without building them
+    cached = ImagePyramid(image, key=key, tile=64)
+    assert cached.ready
+    for a, b in zip(cached.levels[1:], pyramid.shapes[1:]):
+        assert a.shape == b
+    np.testing.assert_array_equal(cached.levels[1], _halve(image))
+
+
+def test_trim_cache(scratch_space, image):
+    for name, mtime in [("old", 1), ("kept", 2), ("new", 3)]:
+        folder = os.path.join(cache_dir(), name)
+        os.makedirs(folder)
+        with open(os.path.join(folder, "level_1.npy"), "wb") as f:
+            f.write(bytes(100))
+        os.utime(folder, (mtime, mtime))
+    assert trim_cache(keep="kept", limit=150) == 2
+    assert os.listdir(cache_dir()) == ["kept"]
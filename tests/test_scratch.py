@@ -0,0 +1,105 @@
+# -*- coding: utf-8 -*-
+# Created on Sun Oct 18 2026
+# Last modified on Sun Oct 18 2026
+# Copyright (c) CaMOS Development Team. All Rights Reserved.
+# Distributed under a MIT License. See LICENSE for more info.
+
+import os
+
+import numpy as np
+import pytest
+
+from camos.model.image import Stack
+from camos.model.scratch import SESSION_PREFIX, ScratchSpace
+
+
+def test_refcounts(scratch_space):
+    arr = scratch_space.allocate((4, 8, 8), np.uint16)
+    (path,) = scratch_space.owners(arr)
+    # Views share the file of the array
+    assert scratch_space.owners(arr[1:3]) == (path,)
+    first = scratch_space.acquire(arr)
+    second = scratch_space.acquire(arr[::2])
+    assert scratch_space._refs[path] == 2
+
+    scratch_space.release(first)
+    assert scratch_space._refs[path] == 1 and path not in scratch_space._free
+    scratch_space.release(second)
+    assert scratch_space._refs[path] == 0 and path in scratch_space._free
+    assert os.path.isfile(path)
+
+
+def test_released_files_are_reused(scratch_space):
+    arr = scratch_space.allocate((4, 8, 8), np.uint16)
+    (path,) = scratch_space.owners(arr)
+    scratch_space.release(scratch_space.acquire(arr))
+
+    # The file is still mapped, so it is not reused
+    other = scratch_space.allocate((4, 8, 8), np.uint16)
+    assert scratch_space.owners(other) != (path,)
+
+    del arr
+    again = scratch_space.allocate((4, 8, 8), np.uint16)
+    assert scratch_space.owners(again) == (path,)
+    assert path not in scratch_space._free
+    # Only files of the same size are reused
+    assert scratch_space.owners(scratch_space.allocate((2, 8, 8), np.uint16)) != (path,)
+
+
+def test_acquire_takes_files_out_of_the_free_list(scratch_space):
+    arr = scratch_space.allocate((4, 8, 8), np.uint8)
+    paths = scratch_space.acquire(arr)
+    scratch_space.release(paths)
+    assert paths[0] in scratch_space._free
+    scratch_space.acquire(arr)
+    assert paths[0] not in scratch_space._free
+
+
+def test_new_files_are_removed_on_release(scratch_space):
+    path = scratch_space.new_file(100)
+    with open(path, "wb") as f:
+        f.write(bytes(100))
+    scratch_space._refs[path] += 1
+    scratch_space.release((path,))
+    assert not os.path.exists(path)
+    assert scratch_space.used == 0
+
+
+def test_quota(tmp_path):
+    space = ScratchSpace(str(tmp_path), quota=1000)
+    a = space.allocate((600,), np.uint8)
+    with pytest.raises(MemoryError):
+        space.allocate((600,), np.uint8)
+    # Released files are removed to make room
+    space.release(space.acquire(a))
+    del a
+    space.allocate((700,), np.uint8)
+    assert space.used == 700
+    space.cleanup()
+
+
+def test_reclaim(tmp_path):
+    stale = tmp_path / "{}{}".format(SESSION_PREFIX, 2 ** 22 + 12345)
+    stale.mkdir()
+    other = tmp_path / "pyramids"
+    other.mkdir()
+    space = ScratchSpace(str(tmp_path))
+    assert not stale.exists() and other.exists()
+    space.allocate((10,), np.uint8)
+    assert os.path.isdir(space.path)
+    space.cleanup()
+    assert not os.path.exists(space.path)
+
+
+def test_stacks_share_files(scratch_space):
+    arr = scratch_space.allocate((3, 4, 4), np.uint8)
+    arr[:] = 1
+    (path,) = scratch_space.owners(arr)
+    a = Stack(arr, 1, 1, persistence=False)
+    b = Stack(arr[1:], 1, 1, persistence=False)
+    assert scratch_space._refs[path] == 2
+    a.release()
+    assert scratch_space._refs[path] == 1
+    # Replacing the pixels of a stack gives back its previous file
+    b._imgs = np.zeros((3, 4, 4), dtype=np.uint8)
+    assert scratch_space._refs[path] == 0
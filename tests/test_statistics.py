@@ -0,0 +1,103 @@
+# -*- coding: utf-8 -*-
+# Created on Sun Oct 18 2026
+# Last modified on Sun Oct 18 2026
+# Copyright (c) CaMOS Development Team. All Rights Reserved.
+# Distributed under a MIT License. See LICENSE for more info.
+
+import pickle
+import threading
+
+import numpy as np
+import pytest
+
+from camos.model.image import Stack
+from camos.model.statistics import LayerStatistics
+
+
+@pytest.fixture
+def stack():
+    rng = np.random.default_rng(0)
+    data = rng.integers(100, 4000, (20, 64, 48), dtype=np.uint16)
+    # An extreme value outside of the sampled frames
+    data[3, 5, 7] = 60000
+    return data
+
+
+def test_refined_statistics_are_exact(stack):
+    stats = LayerStatistics(stack)
+    stats.refine(background=False)
+    assert stats.exact
+    assert stats.min == stack.min() and stats.max == stack.max()
+    edges, counts = stats.histogram()
+    assert counts.sum() == stack.size
+    assert edges[0] == stack.min() and stats._edges[-1] >= stack.max()
+    expected, _ = np.histogram(stack, bins=stats._edges)
+    np.testing.assert_array_equal(counts, expected)
+
+
+def test_percentiles(stack):
+    stats = LayerStatistics(stack)
+    stats.refine(background=False)
+    assert stats.percentile(0) == stack.min()
+    assert stats.percentile(100) == stack.max()
+    width = stats._edges[1] - stats._edges[0]
+    for q in [1, 50, 99]:
+        assert abs(stats.percentile(q) - np.percentile(stack, q)) <= width
+    lo, hi = stats.levels(1, 99)
+    assert lo < hi
+
+
+def test_estimate_then_background_refine(stack):
+    stats = LayerStatistics(stack)
+    ready = threading.Event()
+    stats.on_ready(ready.set)
+    # The first request returns an estimate, and starts the refine pass
+    assert stats.max <= stack.max()
+    assert ready.wait(10)
+    assert stats.exact and stats.max == stack.max()
+
+
+def test_nan(stack):
+    data = stack.astype(np.float32)
+    data[:, :, :10] = np.nan
+    stats = LayerStatistics(data)
+    stats.refine(background=False)
+    assert stats.min == np.nanmin(data) and stats.max == np.nanmax(data)
+    assert stats.histogram()[1].sum() == np.isfinite(data).sum()
+
+
+def test_all_nan():
+    stats = LayerStatistics(np.full((3, 4, 4), np.nan, dtype=np.float32))
+    stats.refine(background=False)
+    assert not stats.exact
+    assert stats.levels() == [0.0, 1.0]
+
+
+def test_constant():
+    stats = LayerStatistics(np.full((3, 4, 4), 7, dtype=np.uint8))
+    stats.refine(background=False)
+    assert stats.min == stats.max == 7
+    assert stats.levels() == [7.0, 8.0]
+
+
+def test_invalidate(stack):
+    data = stack.copy()
+    stats = LayerStatistics(data)
+    stats.refine(background=False)
+    data[0, 0, 0] = 65000
+    assert stats.max == stack.max()
+    stats.invalidate()
+    stats.refine(background=False)
+    assert stats.max == 65000
+
+
+def test_stack_resets_statistics(stack):
+    layer = Stack(stack, 1, 1)
+    layer.stats.refine(background=False)
+    assert layer.stats.max == stack.max()
+    layer._imgs = stack[:, :10, :10]
+    layer.stats.refine(background=False)
+    assert layer.stats.max == stack[:, :10, :10].max()
+
+    copy = pickle.loads(pickle.dumps(layer))
+    assert copy.stats.exact and copy.stats.max == layer.stats.max
@@ -0,0 +1,56 @@
+# -*- coding: utf-8 -*-
+# Created on Sun Oct 18 2026
+# Last modified on Sun Oct 18 2026
+# Copyright (c) CaMOS Development Team. All Rights Reserved.
+# Distributed under a MIT License. See LICENSE for more info.
+
+import copy
+import os
+import threading
+
+import numpy as np
+import pytest
+
+from camos.model.image import Stack
+from camos.model.thumbnails import ThumbnailCache, thumbnail
+
+
+@pytest.fixture
+def stack():
+    frames = np.zeros((3, 300, 600), dtype=np.uint16)
+    frames[0, :, 300:] = 1000
+    return Stack(frames, 1, 1)
+
+
+def test_thumbnail_keeps_the_aspect_ratio(stack):
+    thumb = thumbnail(stack._imgs, [0, 1000], size=64)
+    assert thumb.shape == (32, 64, 3) and thumb.dtype == np.uint8
+    assert thumb[:, :20].max() == 0
+    assert thumb[:, -20:].min() == 255
+
+
+def test_cache(tmp_path, stack):
+    cache = ThumbnailCache(str(tmp_path), size=64)
+    first = cache.get(stack, [0, 1000])
+    key = cache.key(stack, [0, 1000])
+    assert os.path.isfile(os.path.join(str(tmp_path), key + ".png"))
+    assert cache.get(stack, [0, 1000]) is first
+
+    # Another cache (i.e., once evicted from memory) reads the file
+    again = ThumbnailCache(str(tmp_path), size=64).get(stack, [0, 1000])
+    np.testing.assert_array_equal(again, first)
+
+    # Duplicated stacks share the thumbnail; other levels, or new pixels, do not
+    assert cache.key(copy.deepcopy(stack), [0, 1000]) == key
+    assert cache.key(stack, [0, 500]) != key
+    stack._imgs = stack._imgs[:, :10]
+    assert cache.key(stack, [0, 1000]) != key
+
+
+def test_request(tmp_path, stack):
+    cache = ThumbnailCache(str(tmp_path), size=64)
+    result = []
+    done = threading.Event()
+    cache.request(stack, lambda thumb: (result.append(thumb), done.set()), [0, 1000])
+    assert done.wait(10)
+    assert result[0].shape == (32, 64, 3)
@@ -0,0 +1,103 @@
+# -*- coding: utf-8 -*-
+# Created on Sun Oct 18 2026
+# Last modified on Sun Oct 18 2026
+# Copyright (c) CaMOS Development Team. All Rights Reserved.
+# Distributed under a MIT License. See LICENSE for more info.
+
+import pickle
+
+import numpy as np
+import pytest
+import tifffile
+from PIL import Image
+
+from camos.model.image import tiff2nparray
+from camos.model.tiffstack import LazyTiffStack, open_tiff
+
+
+@pytest.fixture
+def frames():
+    rng = np.random.default_rng(0)
+    return rng.integers(0, 2 ** 16, (6, 40, 50), dtype=np.uint16)
+
+
+def _write_pil(path, frames, **kwargs):
+    images = [Image.fromarray(f) for f in frames]
+    images[0].save(path, save_all=True, append_images=images[1:], **kwargs)
+
+
+@pytest.fixture(params=["contiguous", "pages", "tiles", "compressed"])
+def tiff(request, tmp_path, frames):
+    path = str(tmp_path / "stack.tif")
+    if request.param == "contiguous":
+        tifffile.imwrite(path, frames)
+    elif request.param == "pages":
+        # Descriptions of different lengths, so the pages are not at a constant stride
+        with tifffile.TiffWriter(path) as tif:
+            for i, frame in enumerate(frames):
+                tif.write(frame, rowsperstrip=7, description="-" * 3 * i, contiguous=False)
+    elif request.param == "tiles":
+        tifffile.imwrite(path, frames, tile=(16, 16))
+    else:
+        _write_pil(path, frames, compression="tiff_lzw")
+    return path
+
+
+def test_lazy_frames_match_ram(tiff, frames):
+    lazy = open_tiff(tiff)
+    ram, _ = tiff2nparray(tiff)
+    assert isinstance(lazy, LazyTiffStack)
+    assert lazy.shape == ram.shape == frames.shape
+    assert lazy.dtype == ram.dtype
+    for i in range(len(frames)):
+        np.testing.assert_array_equal(lazy[i], ram[i])
+    np.testing.assert_array_equal(np.asarray(lazy), frames)
+
+
+def test_indexing(tiff, frames):
+    lazy = open_tiff(tiff)
+    np.testing.assert_array_equal(lazy[-1], frames[-1])
+    np.testing.assert_array_equal(lazy[1:5:2], frames[1:5:2])
+    np.testing.assert_array_equal(lazy[2, 3:9, ::4], frames[2, 3:9, ::4])
+    np.testing.assert_array_equal(lazy[..., 5], frames[..., 5])
+    np.testing.assert_array_equal(list(lazy)[3], frames[3])
+    with pytest.raises(IndexError):
+        lazy.frame(len(frames))
+
+
+def test_reductions(tiff, frames):
+    lazy = open_tiff(tiff)
+    assert lazy.max() == frames.max()
+    assert lazy.min() == frames.min()
+    np.testing.assert_array_equal(lazy.max(axis=0), frames.max(axis=0))
+    np.testing.assert_array_equal(lazy.min(axis=1), frames.min(axis=1))
+
+
+def test_cache_is_bounded(tmp_path, frames):
+    path = str(tmp_path / "stack.tif")
+    _write_pil(path, frames, compression="tiff_lzw")
+    lazy = open_tiff(path, cache_size=2)
+    for i in range(len(frames)):
+        lazy.frame(i)
+    assert len(lazy._cache) == 2
+    assert lazy.frame(0).flags.writeable is False
+
+
+def test_rgb(tmp_path):
+    rgb = np.random.default_rng(1).integers(0, 255, (3, 20, 30, 3), dtype=np.uint8)
+    path = str(tmp_path / "rgb.tif")
+    tifffile.imwrite(path, rgb, photometric="rgb")
+    lazy = open_tiff(path)
+    assert lazy.shape == rgb.shape
+    np.testing.assert_array_equal(np.asarray(lazy), rgb)
+
+
+def test_pickle_reopens(tiff, frames):
+    lazy = pickle.loads(pickle.dumps(open_tiff(tiff)))
+    np.testing.assert_array_equal(lazy[4], frames[4])
+
+
+def test_not_a_tiff(tmp_path):
+    path = tmp_path / "image.png"
+    Image.fromarray(np.zeros((4, 4), dtype=np.uint8)).save(path)
+    assert open_tiff(str(path)) is None
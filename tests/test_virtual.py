@@ -0,0 +1,108 @@
+# -*- coding: utf-8 -*-
+# Created on Sun Oct 18 2026
+# Last modified on Sun Oct 18 2026
+# Copyright (c) CaMOS Development Team. All Rights Reserved.
+# Distributed under a MIT License. See LICENSE for more info.
+
+import numpy as np
+import pytest
+
+from camos.model.image import Stack, on_disk
+from camos.model.virtual import CombineStack, CropStack, FlipStack, RotateStack
+
+KEYS = [
+    0,
+    -1,
+    slice(1, 4),
+    slice(None, None, -2),
+    (2, 3),
+    (1, slice(2, 9), slice(None, None, 3)),
+    (slice(None), slice(None, None, -1), 4),
+    (3, slice(8, 1, -3), slice(-2, None)),
+    (Ellipsis, 1),
+    (np.array([0, 2]), 1),
+]
+
+
+@pytest.fixture
+def frames():
+    rng = np.random.default_rng(0)
+    return rng.integers(0, 200, (5, 11, 13), dtype=np.uint8)
+
+
+def _check(virtual, expected):
+    assert virtual.shape == expected.shape
+    assert virtual.dtype == expected.dtype
+    for key in KEYS:
+        np.testing.assert_array_equal(virtual[key], expected[key])
+    np.testing.assert_array_equal(np.asarray(virtual), expected)
+    np.testing.assert_array_equal(np.asarray(virtual.view(2)), expected[2])
+    np.testing.assert_array_equal(virtual.view(2)[3:7, 1], expected[2, 3:7, 1])
+    assert virtual.max() == expected.max()
+    np.testing.assert_array_equal(virtual.min(axis=0), expected.min(axis=0))
+
+
+def test_crop(frames):
+    _check(CropStack(frames, 2, 10, 3, 12), frames[:, 2:10, 3:12])
+
+
+@pytest.mark.parametrize("axis", [1, 2])
+def test_flip(frames, axis):
+    _check(FlipStack(frames, axis), np.flip(frames, axis))
+
+
+@pytest.mark.parametrize("k", [0, 1, 2, 3])
+def test_rotate(frames, k):
+    _check(RotateStack(frames, k), np.rot90(frames, k, axes=(1, 2)))
+
+
+def test_consecutive_rotations_are_folded(frames):
+    rotated = RotateStack(RotateStack(frames, 1), 2)
+    assert rotated.k == 3 and rotated.sources[0] is frames
+    _check(rotated, np.rot90(frames, 3, axes=(1, 2)))
+
+
+def test_nested(frames):
+    virtual = RotateStack(FlipStack(CropStack(frames, 1, 10, 2, 12), 1), 1)
+    expected = np.rot90(np.flip(frames[:, 1:10, 2:12], 1), 1, axes=(1, 2))
+    _check(virtual, expected)
+
+
+def test_combine(frames):
+    other = frames[::-1] // 2
+    _check(CombineStack(frames, other, "sum"), frames + other)
+    _check(CombineStack(frames, other, "subtract"), np.abs(frames - other))
+    _check(
+        CombineStack(frames, other, "intersect"),
+        np.where(np.multiply(frames, other) != 0, frames, 0),
+    )
+
+
+def test_combine_different_lengths(frames):
+    single = frames[:1] * 0 + 1
+    combined = CombineStack(frames, single, "sum")
+    assert len(combined) == len(frames)
+    np.testing.assert_array_equal(np.asarray(combined), frames + 1)
+    with pytest.raises(ValueError):
+        CombineStack(frames, frames[:, 1:], "sum")
+    with pytest.raises(ValueError):
+        CombineStack(frames, frames, "divide")
+
+
+def test_materialize(scratch_space, frames):
+    layer = Stack(CropStack(frames, 0, 5, 0, 5), 1, 1)
+    assert layer.virtual
+    layer.materialize(persistence=False)
+    assert not layer.virtual and on_disk(layer._imgs)
+    np.testing.assert_array_equal(layer._imgs, frames[:, :5, :5])
+
+
+def test_sources_keep_scratch_files(scratch_space, frames):
+    source = Stack(frames, 1, 1, persistence=False)
+    (path,) = source._scratch
+    derived = Stack(FlipStack(source._imgs), 1, 1)
+    assert derived._scratch == (path,)
+    source.release()
+    assert scratch_space._refs[path] == 1
+    derived.release()
+    assert scratch_space._refs[path] == 0